@@ -0,0 +1,98 @@
+"""
+Асинхронне та паралельне жеребкування.
+
+Усі draw_* приймають rng — власний генератор, тож кілька жеребкувань можна виконувати
+одночасно в потоках (або процесах) без спільного стану модуля random.
+draw_many роздає кожному завданню окремий підпотік DrawStream(seed): результат завдання
+залежить лише від seed і його позиції в списку, а не від порядку завершення чи кількості потоків.
+
+Приклад:
+    jobs = [DrawJob(draw_knockout, players), DrawJob(draw_round_robin, players, {"num_rounds": 2})]
+    results = await draw_many(jobs, seed=42)
+    results = draw_many_sync(jobs, seed=42)  # те саме без asyncio
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from models import Participant
+from draw_utils import DrawStream
+
+
+@dataclass
+class DrawJob:
+    """Одне жеребкування: функція формату, учасники та додаткові параметри."""
+    draw_fn: Callable[..., Any]
+    participants: list[Participant]
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+def _job_calls(jobs: list[DrawJob], seed: Optional[int]) -> list[functools.partial]:
+    streams = DrawStream(seed).spawn(len(jobs))
+    return [
+        functools.partial(job.draw_fn, job.participants, **{**job.params, "rng": stream})
+        for job, stream in zip(jobs, streams)
+    ]
+
+
+async def draw_async(
+    draw_fn: Callable[..., Any],
+    participants: list[Participant],
+    executor: Optional[Executor] = None,
+    **params: Any,
+) -> Any:
+    """
+    Виконати draw_fn(participants, **params) у пулі, не блокуючи цикл подій.
+    executor: None — стандартний пул потоків циклу подій.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(draw_fn, participants, **params))
+
+
+async def draw_many(
+    jobs: list[DrawJob],
+    seed: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    max_concurrency: Optional[int] = None,
+) -> list[Any]:
+    """
+    Провести кілька жеребкувань паралельно; результати — у порядку jobs.
+    Кожне завдання отримує власний rng (підпотік DrawStream(seed)), тож при тому самому seed
+    результати відтворювані. max_concurrency: скільки завдань виконується одночасно.
+    """
+    loop = asyncio.get_running_loop()
+    calls = _job_calls(jobs, seed)
+    if max_concurrency is None:
+        return list(await asyncio.gather(*(loop.run_in_executor(executor, c) for c in calls)))
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(call: functools.partial) -> Any:
+        async with semaphore:
+            return await loop.run_in_executor(executor, call)
+
+    return list(await asyncio.gather(*(run(c) for c in calls)))
+
+
+def draw_many_sync(
+    jobs: list[DrawJob],
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> list[Any]:
+    """
+    Синхронний варіант draw_many (без asyncio). Результати ідентичні draw_many з тим самим seed.
+    executor: власний пул (наприклад, ProcessPoolExecutor для важких форматів);
+    за замовчуванням — ThreadPoolExecutor(max_workers).
+    """
+    calls = _job_calls(jobs, seed)
+    if executor is not None:
+        futures = [executor.submit(c) for c in calls]
+        return [f.result() for f in futures]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(c) for c in calls]
+        return [f.result() for f in futures]
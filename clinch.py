@@ -0,0 +1,688 @@
+"""
+Калькулятор «ще може / вже гарантував» для таблиці етапу ліги або групи.
+
+Для кожної команди X рахується діапазон місць [best, worst] з урахуванням усіх матчів, що лишилися:
+  - best: X виграє всі свої матчі (M очок); скільки суперників мінімум опиняться строго вище M?
+    Команди, яким дозволено «перевищити» M, обираються так, щоб решта вмістилася під M —
+    перевірка місткості — максимальний потік: джерело → матч (очки матчу) → дві команди → стік
+    (ємність = скільки ще очок команда може набрати, не обігнавши X).
+  - worst: X програє всі матчі (m очок); скільки суперників максимум можуть набрати ≥ m?
+    Той самий граф, ємність команди → стік = скільки очок їй бракує до m.
+
+Нічиї за очками: best рахується з вигідним для X розв'язанням, worst — з невигідним
+(додаткові показники, як-от різниця м'ячів, наперед невідомі).
+
+Точність: при системі очок, де перемога = 2 × нічия (2-1-0, шахові 1-½-0) або нічия = поразка,
+кожен матч роздає сталу кількість очок і потік точний. При 3-1-0 потік — релаксація (матч
+роздає 2 «одиниці»): «не вміщається» — доведено, «вміщається» перевіряється побудовою реальних
+результатів. Вибір множини команд, що обганяють X (для місць нижче першого), — комбінаторний:
+жадібна оцінка + межа з мінімального розрізу; розрив закривається перебором множин і точним
+пошуком у глибину по результатах матчів з лімітом search_budget. Якщо ліміт вичерпано —
+exact=False, а best_bound / worst_bound дають гарантовані межі.
+
+Інкрементальність: для кожної команди зберігаються «свідки» — повні набори результатів,
+на яких досягаються best і worst. Новий результат, що збігається зі свідком, відповідь не змінює
+(обмежень стало більше, а свідок лишився допустимим), тож перераховуються лише решта команд.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Iterable, Optional, Union
+
+from models import Participant, Match, DrawResult
+
+Number = Union[int, float, Fraction]
+
+_BIG = 1 << 30
+
+
+@dataclass
+class PositionRange:
+    """Досяжні місця команди (1 — перше)."""
+    participant_id: str
+    points: Number
+    best: int  # найкраще місце, досяжне за знайденим продовженням (нічиї за очками — на користь)
+    worst: int  # найгірше місце за знайденим продовженням (нічиї за очками — не на користь)
+    exact: bool = True
+    best_bound: int = 0  # вище цього місця команда точно не підніметься (== best, якщо exact)
+    worst_bound: int = 0  # нижче цього місця команда точно не опуститься (== worst, якщо exact)
+
+    def can_reach(self, k: int) -> bool:
+        """Чи ще може фінішувати в топ-k (є продовження, де це стається)."""
+        return self.best <= k
+
+    def has_clinched(self, k: int) -> bool:
+        """Чи гарантовано фінішує в топ-k за будь-яких результатів."""
+        return self.worst_bound <= k
+
+    def is_eliminated(self, k: int) -> bool:
+        """Чи гарантовано не потрапляє в топ-k."""
+        return self.best_bound > k
+
+
+class _Allocation:
+    """
+    Розподіл «одиниць» очок матчів між командами — потік у двочастковій мережі
+    матч → команда (ємність команди = cap) шляхами, що доповнюються.
+    Стан зберігається між викликами, тож збільшення ємності чи нова команда лише доповнюють
+    наявний розподіл (теплий старт), а не рахують потік заново.
+    """
+
+    def __init__(self, fixtures: list[tuple[str, int, int]], n: int, per_match: int, cap: list[int]):
+        self.ends = [(a, b) for _, a, b in fixtures]
+        self.units = [[0, 0] for _ in fixtures]
+        self.free = [per_match] * len(fixtures)
+        self.cap = list(cap)
+        self.load = [0] * n
+        self.matches_of: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+        for m, (a, b) in enumerate(self.ends):
+            self.matches_of[a].append((m, 0))
+            self.matches_of[b].append((m, 1))
+
+    def _give(self, m: int, side: int) -> None:
+        self.free[m] -= 1
+        self.units[m][side] += 1
+        self.load[self.ends[m][side]] += 1
+
+    def _move(self, m: int, side: int) -> None:
+        """Перекласти одиницю матчу m від учасника side до суперника."""
+        self.units[m][side] -= 1
+        self.units[m][1 - side] += 1
+        self.load[self.ends[m][side]] -= 1
+        self.load[self.ends[m][1 - side]] += 1
+
+    def make_room(self, t: int, seen: set[int]) -> bool:
+        """Звільнити одну одиницю ємності команди t, переклавши одиницю її матчу суперникові."""
+        for m, side in self.matches_of[t]:
+            if not self.units[m][side]:
+                continue
+            u = self.ends[m][1 - side]
+            if u in seen:
+                continue
+            seen.add(u)
+            if self.load[u] < self.cap[u] or self.make_room(u, seen):
+                self._move(m, side)
+                return True
+        return False
+
+    def place(self, m: int, seen: set[int]) -> bool:
+        """
+        Віддати одну вільну одиницю матчу m одному з учасників. Якщо не вдалося, seen —
+        команди, усі одиниці яких можуть лежати лише всередині seen (сторона мінімального розрізу).
+        """
+        for side in (0, 1):
+            t = self.ends[m][side]
+            if self.load[t] < self.cap[t]:
+                self._give(m, side)
+                return True
+        for side in (0, 1):
+            t = self.ends[m][side]
+            if t not in seen:
+                seen.add(t)
+                if self.make_room(t, seen):
+                    self._give(m, side)
+                    return True
+        return False
+
+    def fill(self, t: int, seen: set[int]) -> bool:
+        """Дати команді t ще одну одиницю: вільну або забрану в команди, що знайде собі заміну."""
+        for m, side in self.matches_of[t]:
+            if self.free[m]:
+                self._give(m, side)
+                return True
+        for m, side in self.matches_of[t]:
+            u = self.ends[m][1 - side]
+            if self.units[m][1 - side] and u not in seen:
+                seen.add(u)
+                if self.fill(u, seen):
+                    self._move(m, 1 - side)
+                    return True
+        return False
+
+    def release(self, t: int) -> None:
+        """Повернути всі одиниці команди t у вільні."""
+        for m, side in self.matches_of[t]:
+            self.free[m] += self.units[m][side]
+            self.units[m][side] = 0
+        self.load[t] = 0
+
+    def outcomes(self, fixtures: list[tuple[str, int, int]], per_match: int) -> dict[str, str]:
+        """
+        Одиниці → результати: усі одиниці матчу в одного — перемога, інакше нічия
+        (нерозподілені одиниці нікого не підводять: перемога ≥ 2 нічиї, нічия ≥ одна одиниця).
+        """
+        out = {}
+        for (mid, _, _), (ua, ub) in zip(fixtures, self.units):
+            if per_match == 1:
+                out[mid] = "a" if ua else "b" if ub else "d"
+            else:
+                out[mid] = "a" if ua >= 2 else "b" if ub >= 2 else "d"
+        return out
+
+
+class ClinchCalculator:
+    """
+    Таблиця з матчами, що лишилися, і відповіді «ще може / вже гарантував» для кожної команди.
+
+    points: очки за (перемогу, нічию, поразку); за замовчуванням футбольні 3-1-0.
+    search_budget: скільки перевірок дозволено на перебір множин для однієї відповіді
+    (і ×20 вузлів точного пошуку по результатах); більше — точніше при 3-1-0, але повільніше.
+    """
+
+    def __init__(
+        self,
+        participants: list[Participant],
+        fixtures: Iterable[Match],
+        points: tuple[Number, Number, Number] = (3, 1, 0),
+        search_budget: int = 10,
+    ):
+        self.participants = list(participants)
+        self._index = {p.id: i for i, p in enumerate(self.participants)}
+        win, draw, loss = (Fraction(x).limit_denominator(1000) for x in points)
+        if win - loss < 2 * (draw - loss) or draw < loss or win <= loss:
+            raise ValueError(
+                "Підтримуються системи очок, де перемога ≥ 2 × нічия ≥ поразка (3-1-0, 2-1-0, 1-½-0)"
+            )
+        scale = 1
+        for x in (win, draw, loss):
+            scale = scale * x.denominator // math.gcd(scale, x.denominator)
+        self._scale = scale
+        self._win, self._draw, self._loss = (int(x * scale) for x in (win, draw, loss))
+        w, d = self._win - self._loss, self._draw - self._loss
+        if d == 0:
+            self._unit, self._per_match = w, 1
+        else:
+            self._unit, self._per_match = d, 2
+        self.exact_scoring = d == 0 or w == 2 * d
+        self.search_budget = search_budget
+
+        self._earned = [0] * len(self.participants)
+        self._remaining: dict[str, tuple[int, int]] = {}
+        for m in fixtures:
+            if m.participant_a is None or m.participant_b is None:
+                continue
+            self._remaining[m.match_id] = (self._index[m.participant_a.id], self._index[m.participant_b.id])
+        # Кеш: команда → (діапазон, свідок best, свідок worst); свідок — match_id → "a" / "b" / "d"
+        self._cache: dict[int, tuple[PositionRange, Optional[dict], Optional[dict]]] = {}
+
+    @classmethod
+    def from_draw(
+        cls,
+        result: DrawResult,
+        group_id: Optional[str] = None,
+        points: tuple[Number, Number, Number] = (3, 1, 0),
+        search_budget: int = 10,
+    ) -> "ClinchCalculator":
+        """
+        Калькулятор для жеребкування (етап ліги) або однієї групи (group_id) — усі матчі ще не зіграні.
+        """
+        if group_id is not None:
+            group = next((g for g in result.groups if g.group_id == group_id), None)
+            if group is None:
+                raise ValueError(f"Групи {group_id} немає в жеребкуванні")
+            return cls(group.participants, group.matches, points, search_budget)
+        seen: dict[str, Participant] = {}
+        for m in result.matches:
+            for p in (m.participant_a, m.participant_b):
+                if p is not None:
+                    seen.setdefault(p.id, p)
+        return cls(list(seen.values()), result.matches, points, search_budget)
+
+    # --- Результати ---
+
+    def record_outcome(self, match_id: str, outcome: str) -> None:
+        """Записати результат: outcome "a" (перемога participant_a), "b" або "d" (нічия)."""
+        if match_id not in self._remaining:
+            raise ValueError(f"Матчу {match_id} немає серед незіграних")
+        if outcome not in ("a", "b", "d"):
+            raise ValueError(f"Невідомий результат {outcome!r}: очікується 'a', 'b' або 'd'")
+        a, b = self._remaining.pop(match_id)
+        if outcome == "d":
+            self._earned[a] += self._draw
+            self._earned[b] += self._draw
+        else:
+            winner, loser = (a, b) if outcome == "a" else (b, a)
+            self._earned[winner] += self._win
+            self._earned[loser] += self._loss
+        for t, (cached, best_w, worst_w) in list(self._cache.items()):
+            keep_best = cached.exact and best_w is not None and best_w.get(match_id) == outcome
+            keep_worst = cached.exact and worst_w is not None and worst_w.get(match_id) == outcome
+            if keep_best and keep_worst:
+                cached.points = self.points(self.participants[t].id)
+            else:
+                del self._cache[t]
+
+    def record_result(self, match_id: str, score_a: int, score_b: int) -> None:
+        """Записати рахунок матчу."""
+        self.record_outcome(match_id, "a" if score_a > score_b else "b" if score_b > score_a else "d")
+
+    def points(self, participant_id: str) -> Number:
+        value = Fraction(self._earned[self._index[participant_id]], self._scale)
+        return int(value) if value.denominator == 1 else float(value)
+
+    def standings(self) -> list[tuple[Participant, Number]]:
+        """Поточна таблиця за очками (без додаткових показників)."""
+        order = sorted(range(len(self.participants)), key=lambda i: -self._earned[i])
+        return [(self.participants[i], self.points(self.participants[i].id)) for i in order]
+
+    # --- Відповіді ---
+
+    def position_range(self, participant_id: str) -> PositionRange:
+        x = self._index[participant_id]
+        if x not in self._cache:
+            above, above_lb, best_w, best_exact = self._min_above(x)
+            if not best_exact:
+                settled = self._exhaustive(x, True, above, best_w)
+                if settled is not None:
+                    above, best_w = settled
+                    above_lb, best_exact = above, True
+            at_or_above, at_or_above_ub, worst_w, worst_exact = self._max_at_or_above(x)
+            if not worst_exact:
+                settled = self._exhaustive(x, False, at_or_above, worst_w)
+                if settled is not None:
+                    at_or_above, worst_w = settled
+                    at_or_above_ub, worst_exact = at_or_above, True
+            cached = PositionRange(
+                participant_id=participant_id,
+                points=self.points(participant_id),
+                best=1 + above,
+                worst=1 + at_or_above,
+                exact=best_exact and worst_exact,
+                best_bound=1 + above_lb,
+                worst_bound=1 + at_or_above_ub,
+            )
+            self._cache[x] = (cached, best_w, worst_w)
+        return self._cache[x][0]
+
+    def ranges(self) -> list[PositionRange]:
+        """Діапазони для всіх команд у порядку поточної таблиці."""
+        return [self.position_range(p.id) for p, _ in self.standings()]
+
+    def can_reach(self, participant_id: str, k: int) -> bool:
+        return self.position_range(participant_id).can_reach(k)
+
+    def has_clinched(self, participant_id: str, k: int) -> bool:
+        return self.position_range(participant_id).has_clinched(k)
+
+    # --- Спільне ---
+
+    def _split(self, x: int, x_wins: bool) -> tuple[dict[str, str], list[tuple[str, int, int]], list[int], list[int]]:
+        """
+        Матчі X фіксуються (усі виграні або всі програні), решта — fixtures.
+        base: очки кожної команди з урахуванням матчів X і гарантованих «поразкових» очок у решті.
+        """
+        n = len(self.participants)
+        x_outcomes: dict[str, str] = {}
+        fixtures: list[tuple[str, int, int]] = []
+        base = list(self._earned)
+        for mid, (a, b) in self._remaining.items():
+            if x in (a, b):
+                opponent = b if a == x else a
+                if x_wins:
+                    x_outcomes[mid] = "a" if a == x else "b"
+                    base[x] += self._win
+                    base[opponent] += self._loss
+                else:
+                    x_outcomes[mid] = "b" if a == x else "a"
+                    base[x] += self._loss
+                    base[opponent] += self._win
+            else:
+                fixtures.append((mid, a, b))
+        games = [0] * n
+        for _, a, b in fixtures:
+            games[a] += 1
+            games[b] += 1
+        for t in range(n):
+            base[t] += self._loss * games[t]
+        return x_outcomes, fixtures, base, games
+
+    def _final_points(self, outcomes: dict[str, str]) -> list[int]:
+        """Очки після результатів outcomes (матчі поза outcomes не враховуються)."""
+        pts = list(self._earned)
+        for mid, (a, b) in self._remaining.items():
+            o = outcomes.get(mid)
+            if o is None:
+                continue
+            if o == "d":
+                pts[a] += self._draw
+                pts[b] += self._draw
+            else:
+                winner, loser = (a, b) if o == "a" else (b, a)
+                pts[winner] += self._win
+                pts[loser] += self._loss
+        return pts
+
+    def _exhaustive(
+        self, x: int, x_wins: bool, incumbent: int, witness: Optional[dict],
+    ) -> Optional[tuple[int, Optional[dict]]]:
+        """
+        Точний пошук у глибину по реальних результатах матчів (відсікання за межами) з лімітом
+        search_budget × 20 вузлів. x_wins: мінімізувати кількість команд строго вище X,
+        інакше максимізувати кількість команд з очками ≥ X. None — ліміт вичерпано.
+        """
+        n = len(self.participants)
+        x_outcomes, fixtures, _, games = self._split(x, x_wins)
+        pts = self._final_points(x_outcomes)
+        target = pts[x]
+        left = list(games)
+        # Межа по команді: x_wins — вже напевно вище X (навіть з поразками в решті);
+        # інакше — ще може набрати ≥ X (з перемогами в решті). Межа — сума по командах.
+        extra = self._loss if x_wins else self._win
+
+        def counts(t: int) -> int:
+            if t == x:
+                return 0
+            reach = pts[t] + extra * left[t]
+            return int(reach > target) if x_wins else int(reach >= target)
+
+        bound = [sum(counts(t) for t in range(n))]
+        choice: list[str] = [""] * len(fixtures)
+        best = [incumbent, witness]
+        nodes = [self.search_budget * 20]
+        scores = {"a": (self._win, self._loss), "b": (self._loss, self._win), "d": (self._draw, self._draw)}
+
+        def rec(i: int) -> bool:
+            nodes[0] -= 1
+            if nodes[0] < 0:
+                return False
+            if (bound[0] >= best[0]) if x_wins else (bound[0] <= best[0]):
+                return True
+            if i == len(fixtures):
+                outcomes = {fixtures[k][0]: choice[k] for k in range(len(fixtures))}
+                outcomes.update(x_outcomes)
+                best[0], best[1] = bound[0], outcomes
+                return True
+            _, a, b = fixtures[i]
+            before = counts(a) + counts(b)
+            left[a] -= 1
+            left[b] -= 1
+            ok = True
+            for o in ("d", "a", "b") if x_wins else ("a", "b", "d"):
+                pa, pb = scores[o]
+                pts[a] += pa
+                pts[b] += pb
+                delta = counts(a) + counts(b) - before
+                bound[0] += delta
+                choice[i] = o
+                ok = rec(i + 1)
+                bound[0] -= delta
+                pts[a] -= pa
+                pts[b] -= pb
+                if not ok:
+                    break
+            left[a] += 1
+            left[b] += 1
+            return ok
+
+        if not rec(0):
+            return None
+        return best[0], best[1]
+
+    # --- Найкраще місце ---
+
+    def _min_above(self, x: int) -> tuple[int, int, Optional[dict], bool]:
+        """(мінімум команд строго вище X, нижня межа, свідок, точність)."""
+        n = len(self.participants)
+        x_outcomes, fixtures, base, games = self._split(x, x_wins=True)
+        best_x = base[x]
+
+        def count_above(outcomes: dict[str, str]) -> int:
+            pts = self._final_points(outcomes)
+            return sum(1 for t in range(n) if t != x and pts[t] > best_x)
+
+        forced = {t for t in range(n) if t != x and base[t] > best_x}
+        if self._per_match == 1:
+            # Нічия не дає очок понад поразку: усі нічиї — найкраще продовження для X
+            witness = {mid: "d" for mid, _, _ in fixtures}
+            witness.update(x_outcomes)
+            return len(forced), len(forced), witness, True
+
+        max_units = [2 * g for g in games]
+        caps = [
+            max_units[t] if t == x or t in forced else min((best_x - base[t]) // self._unit, max_units[t])
+            for t in range(n)
+        ]
+
+        def allocate(promoted: set[int]) -> tuple[_Allocation, list[int], set[int]]:
+            alloc = _Allocation(fixtures, n, 2, [max_units[t] if t in promoted else caps[t] for t in range(n)])
+            return alloc, *self._place(alloc, [m for m in range(len(fixtures)) for _ in range(2)])
+
+        def witness_of(alloc: _Allocation, promoted: set[int]) -> tuple[Optional[dict], Optional[int]]:
+            outcomes = alloc.outcomes(fixtures, 2)
+            outcomes.update(x_outcomes)
+            if self.exact_scoring:
+                return outcomes, None
+            return self._repair_under(outcomes, best_x, forced | promoted, x)
+
+        alloc, unplaced, side = allocate(set())
+        if not unplaced:
+            outcomes, _ = witness_of(alloc, set())
+            if outcomes is not None:
+                return len(forced), len(forced), outcomes, True
+
+        def gain(t: int, within: set[int]) -> int:
+            internal = sum(1 for m, s in alloc.matches_of[t] if alloc.ends[m][1 - s] in within)
+            return max(0, 2 * internal - caps[t])
+
+        # Нижня межа: нестачу в замкненій множині side покривають лише підвищені команди з side
+        lb = 0
+        if unplaced:
+            gains = sorted((gain(t, side) for t in side if t not in forced), reverse=True)
+            acc = 0
+            while acc < len(unplaced) and lb < len(gains):
+                acc += gains[lb]
+                lb += 1
+
+        # Верхня межа: жадібно підвищуємо команду з найбільшим приростом, потім прибираємо зайві
+        promoted: set[int] = set()
+        while unplaced:
+            pool = [t for t in side if t not in forced and t not in promoted]
+            if not pool:
+                pool = [t for t in range(n) if t != x and t not in forced and t not in promoted]
+            pick = max(pool, key=lambda t: (gain(t, side), -t))
+            promoted.add(pick)
+            alloc.cap[pick] = max_units[pick]
+            unplaced, side = self._place(alloc, unplaced)
+        for t in sorted(promoted, key=lambda t: gain(t, set(range(n)))):
+            alloc.cap[t] = caps[t]
+            while alloc.load[t] > alloc.cap[t] and alloc.make_room(t, {t}):
+                pass
+            if alloc.load[t] > alloc.cap[t]:
+                alloc.cap[t] = max_units[t]
+            else:
+                promoted.discard(t)
+        while True:
+            witness, violator = witness_of(alloc, promoted)
+            if witness is not None:
+                break
+            promoted.add(violator)
+        ub = count_above(witness)
+        lb = min(len(forced) + lb, ub)
+        if lb == ub:
+            return ub, lb, witness, True
+
+        # Перебір множин підвищених команд розміру lb..ub-1 з лімітом перевірок
+        candidates = sorted(
+            (t for t in range(n) if t != x and t not in forced),
+            key=lambda t: (t not in side, -gain(t, set(range(n))), t),
+        )
+        budget = self.search_budget
+        for size in range(lb - len(forced), ub - len(forced)):
+            disproved = True
+            for combo in itertools.combinations(candidates, size):
+                if budget <= 0:
+                    return ub, lb, witness, False
+                budget -= 1
+                trial, left, _ = allocate(set(combo))
+                if left:
+                    continue
+                outcomes, _ = witness_of(trial, set(combo))
+                if outcomes is None:
+                    disproved = False
+                    continue
+                found = count_above(outcomes)
+                if found < ub:
+                    return found, min(lb, found), outcomes, found <= lb
+            if disproved and lb == len(forced) + size:
+                lb += 1
+        return ub, lb, witness, lb >= ub
+
+    @staticmethod
+    def _place(alloc: _Allocation, pending: list[int]) -> tuple[list[int], set[int]]:
+        """Розмістити одиниці матчів pending; повертає (нерозміщені, сторона розрізу)."""
+        left: list[int] = []
+        side: set[int] = set()
+        for m in pending:
+            seen: set[int] = set()
+            if not alloc.place(m, seen):
+                left.append(m)
+                side |= seen
+        return left, side
+
+    def _repair_under(
+        self, outcomes: dict[str, str], limit: int, free: set[int], x: int,
+    ) -> tuple[Optional[dict[str, str]], Optional[int]]:
+        """
+        Для 3-1-0: одиниці 2:0 стали перемогами (3 очки, а не 2). Команда з обмеженням, що
+        перевищила limit, міняє перемоги на нічиї, поки суперник має запас.
+        Повертає (результати, None) або (None, команда, яку не вдалося вмістити).
+        """
+        outcomes = dict(outcomes)
+        pts = self._final_points(outcomes)
+        gain = self._draw - self._loss
+        for t in range(len(self.participants)):
+            if t == x or t in free or pts[t] <= limit:
+                continue
+            for mid, (a, b) in self._remaining.items():
+                if pts[t] <= limit:
+                    break
+                if t not in (a, b) or outcomes[mid] != ("a" if a == t else "b"):
+                    continue
+                other = b if a == t else a
+                if other != x and (other in free or pts[other] + gain <= limit):
+                    outcomes[mid] = "d"
+                    pts[t] -= self._win - self._draw
+                    pts[other] += gain
+            if pts[t] > limit:
+                return None, t
+        return outcomes, None
+
+    # --- Найгірше місце ---
+
+    def _greedy_wins(
+        self, x_outcomes: dict[str, str], fixtures: list[tuple[str, int, int]], order: list[int], target: int,
+    ) -> dict[str, str]:
+        """
+        Команди з order по черзі добирають очки до target перемогами (нічиєю, якщо її досить)
+        у ще не розподілених матчах; спершу — матчі проти команд, яким очки вже не потрібні.
+        Нерозподілені матчі — нічиї (очки отримують обидві команди).
+        """
+        outcomes = dict(x_outcomes)
+        pts = self._final_points(x_outcomes)
+        by_team: dict[int, list[tuple[str, int, int]]] = {}
+        for f in fixtures:
+            by_team.setdefault(f[1], []).append(f)
+            by_team.setdefault(f[2], []).append(f)
+        for t in order:
+            if pts[t] >= target:
+                continue
+            open_matches = [f for f in by_team.get(t, []) if f[0] not in outcomes]
+            open_matches.sort(key=lambda f: pts[f[1] if f[2] == t else f[2]] < target)
+            taken = []
+            for mid, a, b in open_matches:
+                if pts[t] >= target:
+                    break
+                opponent = b if a == t else a
+                if target - pts[t] <= self._draw:
+                    outcomes[mid] = "d"
+                    taken.append((mid, t, self._draw, opponent, self._draw))
+                else:
+                    outcomes[mid] = "a" if a == t else "b"
+                    taken.append((mid, t, self._win, opponent, self._loss))
+                pts[t] += taken[-1][2]
+                pts[opponent] += taken[-1][4]
+            if pts[t] < target:
+                for mid, team, p_team, opponent, p_opp in taken:
+                    del outcomes[mid]
+                    pts[team] -= p_team
+                    pts[opponent] -= p_opp
+        for mid, _, _ in fixtures:
+            outcomes.setdefault(mid, "d")
+        return outcomes
+
+    def _max_at_or_above(self, x: int) -> tuple[int, int, Optional[dict], bool]:
+        """(максимум команд з очками ≥ X, верхня межа, свідок, точність)."""
+        n = len(self.participants)
+        x_outcomes, fixtures, base, games = self._split(x, x_wins=False)
+        worst_x = base[x]
+        w = self._win - self._loss
+        already = {t for t in range(n) if t != x and base[t] >= worst_x}
+        need_pts = {t: worst_x - base[t] for t in range(n) if t != x and t not in already}
+        need = {t: -(-p // self._unit) for t, p in need_pts.items()}
+        possible = sorted(
+            (t for t in need if need_pts[t] <= w * games[t]),
+            key=lambda t: (need[t], -games[t], t),
+        )
+
+        def allocate(chosen) -> tuple[_Allocation, list[int]]:
+            alloc = _Allocation(fixtures, n, self._per_match, [_BIG] * n)
+            kept = []
+            for t in chosen:
+                if all(alloc.fill(t, {t}) for _ in range(need[t])):
+                    kept.append(t)
+                else:
+                    alloc.release(t)
+            return alloc, kept
+
+        def count(alloc: _Allocation) -> tuple[int, dict[str, str]]:
+            outcomes = alloc.outcomes(fixtures, self._per_match)
+            outcomes.update(x_outcomes)
+            pts = self._final_points(outcomes)
+            return sum(1 for t in range(n) if t != x and pts[t] >= worst_x), outcomes
+
+        # Жадібно: за зростанням нестачі, поки розподіл покриває всіх обраних
+        alloc, _ = allocate(possible)
+        found, witness = count(alloc)
+        if not self.exact_scoring:
+            # При 3-1-0 одна перемога дає 3 очки, а не 2 одиниці — окремий жадібний свідок по перемогах
+            outcomes = self._greedy_wins(x_outcomes, fixtures, possible, worst_x)
+            pts = self._final_points(outcomes)
+            cnt = sum(1 for t in range(n) if t != x and pts[t] >= worst_x)
+            if cnt > found:
+                found, witness = cnt, outcomes
+
+        # Верхня межа: s найменших нестач не перевищують одиниць матчів s найзавантаженіших команд
+        if self.exact_scoring:
+            costs = sorted(need[t] for t in possible)
+            per_match = self._per_match
+        else:
+            costs = sorted(need_pts[t] for t in possible)
+            per_match = w
+        loads = sorted((games[t] for t in possible), reverse=True)
+        ub, cost, load = 0, 0, 0
+        for c, g in zip(costs, loads):
+            cost += c
+            load += g
+            if cost > per_match * min(len(fixtures), load):
+                break
+            ub += 1
+        ub += len(already)
+        if found >= ub:
+            return found, found, witness, True
+
+        budget = self.search_budget
+        for size in range(ub - len(already), found - len(already), -1):
+            for combo in itertools.combinations(possible, size):
+                if budget <= 0:
+                    return found, ub, witness, False
+                budget -= 1
+                trial, kept = allocate(combo)
+                if len(kept) == size:
+                    cnt, outcomes = count(trial)
+                    return cnt, max(ub, cnt), outcomes, cnt >= ub
+            if self.exact_scoring:
+                ub = len(already) + size - 1
+        return found, ub, witness, found >= ub
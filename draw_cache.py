@@ -0,0 +1,204 @@
+"""
+Персистентний кеш результатів жеребкування (SQLite).
+
+При фіксованому seed кожен формат детермінований (скрізь random.Random(shuffle_seed)),
+тож результат однозначно визначається форматом, параметрами, списком учасників і seed.
+Ключ кешу — SHA-256 від цих даних разом з ALGORITHM_VERSION: після зміни алгоритму
+старі записи автоматично стають недійсними й видаляються при відкритті сховища.
+
+Розмір сховища обмежений (max_bytes): при переповненні видаляються записи,
+до яких найдовше не зверталися (LRU). Читання blob-ів іде через memory-mapped I/O SQLite.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from models import Participant, DrawResult
+from metrics import phase
+
+# Збільшувати при кожній зміні алгоритмів жеребкування, що змінює результат для того ж seed.
+ALGORITHM_VERSION = "2"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    format TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    blob BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+
+def draw_cache_key(
+    format_name: str,
+    params: dict[str, Any],
+    participants: list[Participant],
+    seed: int,
+) -> str:
+    """Ключ кешу: SHA-256 від версії алгоритму, формату, параметрів, учасників і seed."""
+    payload = {
+        "version": ALGORITHM_VERSION,
+        "format": format_name,
+        "params": params,
+        "participants": [dataclasses.asdict(p) for p in participants],
+        "seed": seed,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DrawCache:
+    """
+    Кеш DrawResult на диску з LRU-витісненням.
+
+    path: файл SQLite (":memory:" — лише в пам'яті процесу).
+    max_bytes: максимальний сумарний розмір збережених результатів.
+    """
+
+    def __init__(self, path: str = "draw_cache.sqlite3", max_bytes: int = 256 * 1024 * 1024):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes має бути додатним")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA mmap_size = {int(max_bytes) * 2}")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+        self._invalidate_old_versions()
+
+    def _invalidate_old_versions(self) -> None:
+        """Видалити записи, створені іншою версією алгоритму."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is not None and row[0] == ALGORITHM_VERSION:
+                return
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM entries WHERE version != ?", (ALGORITHM_VERSION,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (ALGORITHM_VERSION,)
+            )
+            self._conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[DrawResult]:
+        """Повернути збережений результат (і позначити його як щойно використаний) або None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob FROM entries WHERE key = ? AND version = ?", (key, ALGORITHM_VERSION)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        with phase("cache", "deserialisation"):
+            return pickle.loads(row[0])
+
+    def put(self, key: str, result: DrawResult, format_name: str = "") -> None:
+        """Зберегти результат; за потреби витіснити найдавніше використані записи."""
+        with phase("cache", "serialisation"):
+            blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return  # завеликий запис не поміститься навіть у порожній кеш
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, version, format, size, last_access, blob) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, ALGORITHM_VERSION, format_name, len(blob), time.time(), blob),
+            )
+            self._evict_locked()
+            self._conn.execute("COMMIT")
+
+    def _evict_locked(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims: list[tuple[str]] = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def get_or_compute(
+        self,
+        format_name: str,
+        params: dict[str, Any],
+        participants: list[Participant],
+        seed: Optional[int],
+        compute: Callable[[], DrawResult],
+    ) -> DrawResult:
+        """
+        Завантажити результат з кешу або обчислити й зберегти.
+        Без seed жеребкування не відтворюване — кеш не використовується.
+        """
+        if seed is None:
+            return compute()
+        key = draw_cache_key(format_name, params, participants, seed)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        result = compute()
+        self.put(key, result, format_name)
+        return result
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "DrawCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def cached_draw(
+    cache: DrawCache,
+    draw_fn: Callable[..., DrawResult],
+    participants: list[Participant],
+    shuffle_seed: Optional[int] = None,
+    **params: Any,
+) -> DrawResult:
+    """
+    Викликати draw_fn(participants, shuffle_seed=..., **params) через кеш.
+    Наприклад: cached_draw(cache, draw_uefa_league_phase, teams, shuffle_seed=7, rounds=8).
+    """
+    return cache.get_or_compute(
+        draw_fn.__name__,
+        params,
+        participants,
+        shuffle_seed,
+        lambda: draw_fn(participants, shuffle_seed=shuffle_seed, **params),
+    )
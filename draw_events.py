@@ -0,0 +1,140 @@
+"""
+Потік подій жеребкування для живих церемоній і трансляцій.
+
+iter_knockout, iter_groups_by_pots та iter_uefa_league_phase (formats) — генератори, що віддають
+кожен крок жеребкування одразу, як він відбувся: відкрито кошик, витягнуто кулю, команду
+поставлено в позицію сітки чи групу, bye. Останньою йде DrawCompleted з результатом.
+Відповідні draw_* — це ті самі генератори, вичерпані run_events, тож результат потоку
+збігається з пакетним при тому самому seed / rng.
+
+Приклад:
+    for event in iter_groups_by_pots(teams, 8, shuffle_seed=1):
+        show(event.to_dict())
+
+    async for event in aiter_events(iter_knockout(players, shuffle_seed=1), pace=1.5):
+        await websocket.send_json(event.to_dict())
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass, fields
+from typing import Any, AsyncIterator, ClassVar, Iterator, Optional
+
+from models import Participant, Match, DrawResult
+
+
+@dataclass
+class DrawEvent:
+    """Базова подія; kind — тип для серіалізації."""
+    kind: ClassVar[str] = "event"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Плоский словник для JSON: учасники — {id, name}, матчі — {id, a, b, round}."""
+        out: dict[str, Any] = {"kind": self.kind}
+        for f in fields(self):
+            out[f.name] = _plain(getattr(self, f.name))
+        return out
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Participant):
+        return {"id": value.id, "name": value.name}
+    if isinstance(value, Match):
+        return {
+            "id": value.match_id,
+            "a": value.participant_a.name if value.participant_a else None,
+            "b": value.participant_b.name if value.participant_b else None,
+            "round": value.round_index,
+        }
+    if isinstance(value, DrawResult):
+        return {"description": value.description, "matches": len(value.matches)}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+@dataclass
+class PotOpened(DrawEvent):
+    """Відкрито кошик: pot — номер з 0, participants — кулі в ньому."""
+    kind: ClassVar[str] = "pot_opened"
+    pot: int
+    participants: tuple[Participant, ...]
+
+
+@dataclass
+class BallDrawn(DrawEvent):
+    """З кошика витягнуто кулю."""
+    kind: ClassVar[str] = "ball_drawn"
+    participant: Participant
+    pot: int
+
+
+@dataclass
+class SlotAssigned(DrawEvent):
+    """Учасника поставлено в позицію: слот сітки нокауту або позицію в кошику етапу ліги."""
+    kind: ClassVar[str] = "slot_assigned"
+    participant: Participant
+    slot: int
+    seeded: bool = False
+
+
+@dataclass
+class GroupAssigned(DrawEvent):
+    """Учасник потрапив у групу (номер з 0)."""
+    kind: ClassVar[str] = "group_assigned"
+    participant: Participant
+    group: int
+    pot: int
+
+
+@dataclass
+class ByeGranted(DrawEvent):
+    """Учасник проходить коло без гри."""
+    kind: ClassVar[str] = "bye_granted"
+    participant: Participant
+    round_index: int = 1
+
+
+@dataclass
+class OpponentsDrawn(DrawEvent):
+    """Суперники команди етапу ліги: matches — її матчі в порядку турів."""
+    kind: ClassVar[str] = "opponents_drawn"
+    participant: Participant
+    matches: tuple[Match, ...]
+
+
+@dataclass
+class DrawCompleted(DrawEvent):
+    """Жеребкування завершено; result — те, що повертає відповідна draw_*."""
+    kind: ClassVar[str] = "draw_completed"
+    result: Any
+
+
+def run_events(events: Iterator[DrawEvent]) -> Any:
+    """Вичерпати потік і повернути результат з DrawCompleted."""
+    for event in events:
+        if isinstance(event, DrawCompleted):
+            return event.result
+    raise RuntimeError("Потік подій завершився без DrawCompleted")
+
+
+async def aiter_events(
+    events: Iterator[DrawEvent],
+    pace: float = 0.0,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[DrawEvent]:
+    """
+    Асинхронний міст: кожен крок генератора виконується в пулі (executor; None — стандартний
+    пул потоків циклу подій), тож довгі кроки (look-ahead, шаблон розкладу) не блокують цикл подій.
+    pace: пауза в секундах після кожної події (темп церемонії).
+    """
+    loop = asyncio.get_running_loop()
+    done = object()
+    while True:
+        event = await loop.run_in_executor(executor, next, events, done)
+        if event is done:
+            return
+        yield event
+        if pace:
+            await asyncio.sleep(pace)
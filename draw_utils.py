@@ -1,6 +1,12 @@
 """
 Допоміжні функції для жеребкування: перемішування, сіяння, розподіл по групах.
+
+Випадковість: кожне жеребкування працює з власним генератором (make_rng / DrawStream),
+глобальний модуль random не використовується — паралельні жеребкування в потоках
+не ділять стан і відтворювані незалежно від порядку виконання.
 """
+import hashlib
+import os
 import random
 from typing import TypeVar
 
@@ -9,14 +15,57 @@ from models import Participant
 T = TypeVar("T")
 
 
-def shuffle_participants(participants: list[Participant], seed: int | None = None) -> list[Participant]:
-    """Перемішати учасників (з опційним seed для відтворюваності)."""
-    if seed is not None:
-        rng = random.Random(seed)
-    else:
-        rng = random
+class DrawStream(random.Random):
+    """
+    Детермінований потік випадковості з незалежними підпотоками.
+    Це звичайний random.Random (його можна передавати як rng у будь-який draw_*),
+    а spawn(n) дає n дочірніх потоків, зерна яких виводяться з (seed, шлях) через SHA-256:
+    результат кожного підпотоку не залежить від того, в якому потоці й порядку його використано.
+    Викликати spawn слід з одного потоку (лічильник дочірніх потоків не захищений).
+    """
+
+    def __init__(self, seed: int | None = None, _path: tuple[int, ...] = ()):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(16), "big")
+        self.root_seed = seed
+        self.path = _path
+        self._spawned = 0
+        digest = hashlib.sha256(repr((seed, _path)).encode("utf-8")).digest()
+        super().__init__(int.from_bytes(digest, "big"))
+
+    def spawn(self, n: int = 1) -> list["DrawStream"]:
+        """n нових незалежних підпотоків (наступний виклик дає наступні n)."""
+        children = [DrawStream(self.root_seed, self.path + (self._spawned + i,)) for i in range(n)]
+        self._spawned += n
+        return children
+
+    def __reduce__(self):
+        # Зберегти зерно й шлях при передачі в інший процес (ProcessPoolExecutor)
+        return _restore_stream, (self.root_seed, self.path, self._spawned, self.getstate())
+
+
+def _restore_stream(seed: int, path: tuple[int, ...], spawned: int, state: tuple) -> DrawStream:
+    stream = DrawStream(seed, path)
+    stream._spawned = spawned
+    stream.setstate(state)
+    return stream
+
+
+def make_rng(seed: int | None = None, rng: random.Random | None = None) -> random.Random:
+    """Генератор для одного жеребкування: переданий rng або власний random.Random(seed)."""
+    if rng is not None:
+        return rng
+    return random.Random(seed)
+
+
+def shuffle_participants(
+    participants: list[Participant],
+    seed: int | None = None,
+    rng: random.Random | None = None,
+) -> list[Participant]:
+    """Перемішати учасників (з опційним seed або власним rng для відтворюваності)."""
     out = list(participants)
-    rng.shuffle(out)
+    make_rng(seed, rng).shuffle(out)
     return out
 
 
@@ -30,6 +79,7 @@ def distribute_into_groups(
     num_groups: int,
     seeded: bool = True,
     shuffle_seed: int | None = None,
+    rng: random.Random | None = None,
 ) -> list[list[Participant]]:
     """
     Розподілити учасників по групах «змією» (як у УЄФА):
@@ -39,7 +89,7 @@ def distribute_into_groups(
     if seeded:
         ordered = sort_by_seed(participants)
     else:
-        ordered = shuffle_participants(participants, shuffle_seed)
+        ordered = shuffle_participants(participants, shuffle_seed, rng=rng)
     groups: list[list[Participant]] = [[] for _ in range(num_groups)]
     for i, p in enumerate(ordered):
         # змійка: 0,1,2,3,3,2,1,0,0,1,2,3...
@@ -0,0 +1,281 @@
+"""
+Допустимі конфігурації форматів — одне джерело правил для draw_*, CLI та веб-форми.
+
+Правило формату перевіряє (учасники, тури, кошики, матчів з кошика, групи, вихід з групи)
+і повертає нормалізовану Configuration або ValueError з поясненням. Для етапу ліги
+арифметики замало (напр. 30 команд / 5 турів проходять подільність, але матчі не
+розкладаються по турах), тож конфігурація додатково перевіряється побудовою шаблону
+розкладу (_league_template, кешований).
+
+valid_configurations перебирає всі конфігурації до меж LIMITS і кешується (lru_cache),
+тож nearest — «що допустимо поруч з моїм n?» — після першого запиту миттєвий.
+
+Приклад:
+    nearest("league_phase", 40)            # 36 / 8 турів, 34 / 16 турів, …
+    valid_participant_counts("league_phase", rounds=8)   # (18, 36)
+    check("uefa_style", 20, groups=8)      # ValueError: потрібно мінімум 16 … (ок) / пояснення
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Межі перебору valid_configurations."""
+    max_participants: int = 256
+    max_rounds: int = 16
+    max_groups: int = 32
+
+
+LIMITS = Limits()
+
+
+@dataclass(frozen=True)
+class Configuration:
+    """Допустима конфігурація; поля, що не стосуються формату, — None."""
+    format: str
+    participants: int
+    rounds: Optional[int] = None  # турів (колова, етап ліги) або кіл нокауту
+    pots: Optional[int] = None
+    per_pot: Optional[int] = None  # матчів з кожного кошика (етап ліги)
+    groups: Optional[int] = None
+    advancers: Optional[int] = None  # виходять з кожної групи
+
+    def describe(self) -> str:
+        parts = [f"{self.participants} учасників"]
+        if self.format == "league_phase":
+            parts.append(f"{self.rounds} турів, {self.pots} кошиків по {self.participants // self.pots}")
+        elif self.groups is not None:
+            parts.append(f"{self.groups} груп, по {self.advancers} виходять")
+        elif self.rounds is not None:
+            parts.append(f"{self.rounds} турів")
+        return ", ".join(parts)
+
+
+def league_phase_layout(n_teams: int, rounds: int) -> tuple[int, int, int]:
+    """
+    Арифметика етапу ліги: (команд у кошику, кошиків, матчів з кошика).
+    ValueError з поясненням, якщо комбінація неможлива.
+    """
+    if n_teams % 2 == 1:
+        raise ValueError(
+            f"League Phase: кількість учасників має бути парною (кожен тур по n/2 матчів). Отримано {n_teams}."
+        )
+    teams_per_pot = rounds + 1
+    n_pots = n_teams // teams_per_pot
+
+    if n_teams % teams_per_pot != 0 or n_pots == 0:
+        raise ValueError(
+            f"League Phase: кількість учасників має ділитися на (турів+1) = {teams_per_pot}. "
+            f"Отримано {n_teams} учасників."
+        )
+    if rounds % n_pots != 0:
+        raise ValueError(
+            f"League Phase: кількість турів ({rounds}) має ділитися на кількість кошиків ({n_pots})."
+        )
+    k_per_pot = rounds // n_pots
+    if (teams_per_pot * k_per_pot) % 2 == 1:
+        # Кількість матчів всередині кошика = (команд × матчів на команду) / 2. Щоб було цілим, добуток має бути парним.
+        raise ValueError(
+            f"League Phase: комбінація {n_teams} учасників і {rounds} турів неможлива: "
+            f"у кошику по {teams_per_pot} команд кожна грає {k_per_pot} матчів всередині кошика — "
+            f"разом це {teams_per_pot * k_per_pot} «напівматчів», тобто {teams_per_pot * k_per_pot / 2} матчів (неціле). "
+            f"Потрібно, щоб (команд у кошику)×(матчів з кошика) було парним: оберіть кількість турів, кратну {2 * n_pots} "
+            f"(напр. {2 * n_pots} або {4 * n_pots}), або іншу кількість учасників (наприклад 18, 36)."
+        )
+    if k_per_pot == 1 and teams_per_pot % 2 == 1:
+        raise ValueError(
+            "League Phase: при одному матчі з кожного кошика розмір кошика (турів+1) має бути парним. "
+            f"Зараз турів={rounds}, кошик={teams_per_pot}."
+        )
+    return teams_per_pot, n_pots, k_per_pot
+
+
+def _min_participants(fmt: str, n: int, minimum: int) -> None:
+    if n < minimum:
+        raise ValueError(f"{fmt}: потрібно щонайменше {minimum} учасників, отримано {n}")
+
+
+def _knockout(n: int, rounds: Optional[int] = None, **_: object) -> Configuration:
+    _min_participants("Нокаут", n, 2)
+    depth = (n - 1).bit_length()
+    if rounds is not None and rounds != depth:
+        raise ValueError(
+            f"Нокаут: {n} учасників — сітка з {depth} кіл, а не {rounds} "
+            f"(для {rounds} кіл потрібно {2 ** (rounds - 1) + 1}–{2 ** rounds} учасників)"
+        )
+    return Configuration("knockout", n, rounds=depth)
+
+
+def _round_robin(n: int, cycles: int = 1, fmt: str = "round_robin", **_: object) -> Configuration:
+    _min_participants("Колова система", n, 2)
+    if cycles < 1:
+        raise ValueError("Кількість кіл має бути додатною")
+    return Configuration(fmt, n, rounds=cycles * (n - 1 + n % 2))
+
+
+def _berger(n: int, cycles: int = 1, **_: object) -> Configuration:
+    return _round_robin(n, cycles, fmt="berger")
+
+
+def _uefa_style(n: int, groups: int = 8, advancers: int = 2, **_: object) -> Configuration:
+    if groups < 1:
+        raise ValueError("Кількість груп має бути додатною")
+    if n < groups * 2:
+        raise ValueError(f"Потрібно мінімум {groups * 2} учасників для {groups} груп")
+    smallest = n // groups
+    if not 1 <= advancers <= smallest:
+        raise ValueError(
+            f"З групи може вийти від 1 до {smallest} учасників (найменша група з {n} на {groups}), а не {advancers}"
+        )
+    return Configuration("uefa_style", n, groups=groups, advancers=advancers)
+
+
+def _groups_chain(n: int, group_size: int = 4, advancers: int = 2, **_: object) -> Configuration:
+    """groups(N).round_robin().top(K).knockout(): групи приблизно по N, з кожної виходять K."""
+    if group_size < 2:
+        raise ValueError("groups(N): у групі має бути щонайменше 2 учасники")
+    _min_participants("groups(N)", n, group_size)
+    groups = -(-n // group_size)
+    smallest = n // groups
+    if not 1 <= advancers <= smallest:
+        raise ValueError(f"top(K): з групи може вийти від 1 до {smallest} учасників, а не {advancers}")
+    return Configuration("groups", n, groups=groups, advancers=advancers)
+
+
+def _league_phase(n: int, rounds: int = 8, verify: bool = True, **_: object) -> Configuration:
+    teams_per_pot, n_pots, k_per_pot = league_phase_layout(n, rounds)
+    if verify:
+        from formats.uefa_league_phase import _league_template
+
+        try:
+            _league_template(n, rounds)
+        except RuntimeError as e:
+            raise ValueError(f"League Phase: {n} учасників і {rounds} турів — {e}") from None
+    return Configuration("league_phase", n, rounds=rounds, pots=n_pots, per_pot=k_per_pot)
+
+
+# Формат → правило (n, **параметри) → Configuration | ValueError
+RULES: dict[str, Callable[..., Configuration]] = {
+    "knockout": _knockout,
+    "round_robin": _round_robin,
+    "berger": _berger,
+    "uefa_style": _uefa_style,
+    "groups": _groups_chain,
+    "league_phase": _league_phase,
+}
+
+
+def _rule(fmt: str) -> Callable[..., Configuration]:
+    if fmt not in RULES:
+        raise ValueError(f"Невідомий формат {fmt!r}. Доступні: {', '.join(RULES)}")
+    return RULES[fmt]
+
+
+def check(fmt: str, participants: int, **params: object) -> Configuration:
+    """
+    Перевірити конфігурацію. Параметри: rounds (етап ліги; нокаут — кількість кіл сітки), cycles (колова, Бергер),
+    groups / advancers (УЄФА), group_size / advancers (groups-формула); verify=False — без побудови
+    шаблону етапу ліги. ValueError з поясненням, якщо неможлива.
+    """
+    return _rule(fmt)(participants, **params)
+
+
+def is_valid(fmt: str, participants: int, **params: object) -> bool:
+    try:
+        check(fmt, participants, **params)
+    except ValueError:
+        return False
+    return True
+
+
+def _candidates(fmt: str, limits: Limits, fixed: dict[str, object]) -> list[tuple[int, dict[str, object]]]:
+    """(n, параметри) для перебору; зафіксовані параметри не перебираються."""
+    p_max = limits.max_participants
+    if fmt == "league_phase":
+        rounds_range = [fixed["rounds"]] if "rounds" in fixed else range(2, limits.max_rounds + 1)
+        out = []
+        for r in rounds_range:
+            for n in range(r + 1, p_max + 1, r + 1):
+                out.append((n, {"rounds": r}))
+        return out
+    if fmt == "uefa_style":
+        groups_range = [fixed["groups"]] if "groups" in fixed else range(1, limits.max_groups + 1)
+        out = []
+        for g in groups_range:
+            for n in range(2 * g, p_max + 1):
+                for a in ([fixed["advancers"]] if "advancers" in fixed else range(1, n // g + 1)):
+                    out.append((n, {"groups": g, "advancers": a}))
+        return out
+    if fmt == "groups":
+        sizes = [fixed["group_size"]] if "group_size" in fixed else range(2, 9)
+        out = []
+        for size in sizes:
+            for n in range(size, p_max + 1):
+                for a in ([fixed["advancers"]] if "advancers" in fixed else range(1, size + 1)):
+                    out.append((n, {"group_size": size, "advancers": a}))
+        return out
+    if fmt == "knockout":
+        rounds = {"rounds": fixed["rounds"]} if "rounds" in fixed else {}
+        return [(n, rounds) for n in range(2, p_max + 1)]
+    cycles = {"cycles": fixed["cycles"]} if "cycles" in fixed else {}
+    return [(n, cycles) for n in range(2, p_max + 1)]
+
+
+@lru_cache(maxsize=256)
+def _valid_configurations(
+    fmt: str, limits: Limits, fixed: tuple[tuple[str, object], ...], verify: bool = True,
+) -> tuple[Configuration, ...]:
+    rule = _rule(fmt)
+    found = []
+    for n, params in _candidates(fmt, limits, dict(fixed)):
+        try:
+            found.append(rule(n, verify=verify, **params))
+        except ValueError:
+            continue
+    return tuple(found)
+
+
+def valid_configurations(
+    fmt: str, limits: Limits = LIMITS, verify: bool = True, **fixed: object,
+) -> tuple[Configuration, ...]:
+    """
+    Усі допустимі конфігурації формату в межах limits (кешовано); fixed — зафіксовані параметри.
+    verify=False — без побудови шаблонів етапу ліги (лише арифметика кошиків, у рази швидше).
+    """
+    return _valid_configurations(fmt, limits, tuple(sorted(fixed.items())), verify)
+
+
+def valid_participant_counts(fmt: str, limits: Limits = LIMITS, **fixed: object) -> tuple[int, ...]:
+    """Відсортовані допустимі кількості учасників, напр. valid_participant_counts("league_phase", rounds=8)."""
+    return tuple(sorted({c.participants for c in valid_configurations(fmt, limits, **fixed)}))
+
+
+def nearest(fmt: str, participants: int, count: int = 5, limits: Limits = LIMITS, **fixed: object) -> list[Configuration]:
+    """
+    До count допустимих конфігурацій з кількістю учасників, найближчою до participants
+    (за рівної відстані — менша кількість, потім менше турів/груп).
+    Кандидати перебираються без побудови шаблонів; шаблон етапу ліги будується лише для тих,
+    що потрапляють у відповідь.
+    """
+    configs = valid_configurations(fmt, limits, verify=False, **fixed)
+    ranked = sorted(
+        configs,
+        key=lambda c: (abs(c.participants - participants), c.participants, c.rounds or 0, c.groups or 0, c.advancers or 0),
+    )
+    seen: set[Configuration] = set()
+    out = []
+    for c in ranked:
+        key = replace(c, advancers=None) if "advancers" not in fixed else c
+        if key in seen:
+            continue
+        if fmt == "league_phase" and not is_valid(fmt, c.participants, rounds=c.rounds):
+            continue
+        seen.add(key)
+        out.append(c)
+        if len(out) == count:
+            break
+    return out
@@ -1,13 +1,35 @@
-from .knockout import draw_knockout
+from .knockout import draw_knockout, iter_knockout
 from .round_robin import draw_round_robin
 from .uefa_style import draw_uefa_style
-from .uefa_league_phase import draw_uefa_league_phase
-from .custom import draw_custom
+from .uefa_league_phase import draw_uefa_league_phase, iter_uefa_league_phase
+from .custom import draw_custom, StagePipeline
+from .group_draw import draw_groups_by_pots, iter_groups_by_pots
+from .league_phase_repair import repair_league_phase, RepairReport
+from .league_phase_sampler import sample_league_phase, MixingStats
+from .travel import optimize_travel, TravelReport
+from .berger import draw_berger, berger_table, BergerSchedule
+from .strength_balance import strength_of_schedule, StrengthOfSchedule
 
 __all__ = [
     "draw_knockout",
+    "iter_knockout",
     "draw_round_robin",
     "draw_uefa_style",
     "draw_uefa_league_phase",
+    "iter_uefa_league_phase",
     "draw_custom",
+    "StagePipeline",
+    "draw_groups_by_pots",
+    "iter_groups_by_pots",
+    "repair_league_phase",
+    "RepairReport",
+    "sample_league_phase",
+    "MixingStats",
+    "optimize_travel",
+    "TravelReport",
+    "draw_berger",
+    "berger_table",
+    "BergerSchedule",
+    "strength_of_schedule",
+    "StrengthOfSchedule",
 ]
@@ -0,0 +1,208 @@
+"""
+Колова система за таблицями Бергера (FIDE, Handbook C.05, Annex 1) з розподілом кольорів.
+
+Таблиця для парного n (непарне — додається номер n+1, «вільний від гри»):
+  тур r, дошка k: верхній номер top = ((k - 1) + (r - 1) · n/2) mod (n - 1) + 1;
+  дошка 1 — top проти n; інші — top проти b, де top + b ≡ r + 1 (mod n - 1).
+  Кольори: на дошці 1 номер n білими в парних турах, інші дошки — top білими
+  (це те саме правило, що й у FIDE: сума номерів непарна — білі в меншого, парна — в більшого).
+Таблиці будуються один раз на n і кешуються (lru_cache): (тур, дошка) → (білі, чорні) за O(1).
+
+Подвійна колова: друге коло — та сама таблиця з переставленими кольорами (BergerSchedule
+лише перераховує номер туру й міняє місцями білі/чорні, без копіювання таблиці). За
+рекомендацією FIDE два останні тури першого кола міняються місцями, щоб на стику кіл
+ніхто не грав тим самим кольором тричі поспіль.
+
+Номери за жеребом; assign_berger_numbers ставить одноклубників (чи співвітчизників) на номери,
+що зустрічаються в перших турах.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from models import Participant, Match, DrawResult
+from draw_utils import make_rng, sort_by_seed
+from metrics import instrument, phase
+
+
+def _table_size(n: int) -> int:
+    return n + (n % 2)
+
+
+@lru_cache(maxsize=None)
+def berger_table(n: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    """
+    Таблиця Бергера для n учасників: table[r][k] = (білі, чорні), номери з 1, тури й дошки з 0.
+    Для непарного n номер n+1 — вільний від гри (пара з ним — bye).
+    """
+    size = _table_size(n)
+    if size < 2:
+        return ()
+    half, mod = size // 2, size - 1
+    table = []
+    for r in range(1, size):
+        boards = []
+        for k in range(1, half + 1):
+            top = ((k - 1) + (r - 1) * half) % mod + 1
+            if k == 1:
+                boards.append((size, top) if r % 2 == 0 else (top, size))
+            else:
+                bottom = (r + 1 - top) % mod or mod
+                boards.append((top, bottom))
+        table.append(tuple(boards))
+    return tuple(table)
+
+
+def berger_pairing(n: int, round_no: int, board: int) -> tuple[int, int]:
+    """(білі, чорні) у турі round_no на дошці board (обидва з 1) за таблицею Бергера для n."""
+    return berger_table(n)[round_no - 1][board - 1]
+
+
+def meeting_round(n: int, a: int, b: int) -> int:
+    """Тур (з 1), у якому номери a і b зустрічаються в таблиці Бергера для n (O(1), без таблиці)."""
+    size = _table_size(n)
+    mod = size - 1
+    if a == b:
+        raise ValueError("Номер не грає сам із собою")
+    if size in (a, b):
+        other = b if a == size else a
+        return (2 * other - 2) % mod + 1
+    return (a + b - 2) % mod + 1
+
+
+@dataclass(frozen=True)
+class BergerSchedule:
+    """
+    Розклад на cycles кіл поверх кешованої таблиці: номер туру → (коло, тур таблиці),
+    у парних колах кольори міняються місцями. Таблиця не копіюється.
+    swap_last_rounds: у непарних колах (крім останнього) два останні тури міняються місцями.
+    """
+    n: int
+    cycles: int = 1
+    swap_last_rounds: bool = True
+
+    @property
+    def rounds_per_cycle(self) -> int:
+        return _table_size(self.n) - 1
+
+    @property
+    def num_rounds(self) -> int:
+        return self.rounds_per_cycle * self.cycles
+
+    @property
+    def boards(self) -> int:
+        return _table_size(self.n) // 2
+
+    def _source(self, round_no: int) -> tuple[int, bool]:
+        """(тур таблиці з 1, чи обернені кольори) для туру розкладу round_no (з 1)."""
+        if not 1 <= round_no <= self.num_rounds:
+            raise ValueError(f"Тур {round_no} поза межами 1..{self.num_rounds}")
+        per = self.rounds_per_cycle
+        cycle, r = divmod(round_no - 1, per)
+        r += 1
+        if self.swap_last_rounds and cycle % 2 == 0 and cycle + 1 < self.cycles and per >= 2 and r >= per - 1:
+            r = 2 * per - 1 - r
+        return r, cycle % 2 == 1
+
+    def pairing(self, round_no: int, board: int) -> tuple[int, int]:
+        """(білі, чорні) у турі round_no на дошці board."""
+        r, reverse = self._source(round_no)
+        white, black = berger_table(self.n)[r - 1][board - 1]
+        return (black, white) if reverse else (white, black)
+
+    def round_pairs(self, round_no: int) -> Iterator[tuple[int, int]]:
+        """Пари туру по дошках, без пар з номером «вільний від гри»."""
+        r, reverse = self._source(round_no)
+        for white, black in berger_table(self.n)[r - 1]:
+            if white > self.n or black > self.n:
+                continue
+            yield (black, white) if reverse else (white, black)
+
+
+def assign_berger_numbers(
+    participants: list[Participant],
+    group_by: Optional[str] = "club",
+    shuffle_seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
+) -> list[Participant]:
+    """
+    Жереб номерів для таблиці Бергера: результат[i] отримує номер i+1.
+    group_by: атрибут ("club", "country" або None); учасники з однаковим значенням отримують
+    номери, що зустрічаються якомога раніше (спершу більші групи; кожен наступний член групи —
+    на вільний номер з найменшою сумою турів зустрічей з уже розставленими).
+    Решта номерів — випадково.
+    """
+    rng = make_rng(shuffle_seed, rng)
+    n = len(participants)
+    size = _table_size(n)
+    pool = list(participants)
+    rng.shuffle(pool)
+    free = list(range(1, n + 1))
+    rng.shuffle(free)
+    numbers: dict[int, Participant] = {}
+    if group_by:
+        groups: dict[str, list[Participant]] = {}
+        for p in pool:
+            value = getattr(p, group_by, None)
+            if value is not None:
+                groups.setdefault(value, []).append(p)
+        for members in sorted(groups.values(), key=len, reverse=True):
+            if len(members) < 2:
+                continue
+            placed: list[int] = []
+            for p in members:
+                # Перший член групи — випадковий вільний номер, наступні — найраніші зустрічі
+                best = min(free, key=lambda x: sorted(meeting_round(size, x, y) for y in placed)) if placed else free[0]
+                free.remove(best)
+                placed.append(best)
+                numbers[best] = p
+    assigned = {id(p) for p in numbers.values()}
+    for number, p in zip(free, (p for p in pool if id(p) not in assigned)):
+        numbers[number] = p
+    return [numbers[i] for i in range(1, n + 1)]
+
+
+@instrument("berger")
+def draw_berger(
+    participants: list[Participant],
+    shuffle_seed: Optional[int] = None,
+    num_rounds: int = 1,
+    group_by: Optional[str] = "club",
+    seeded: bool = False,
+    swap_last_rounds: bool = True,
+    rng: Optional[random.Random] = None,
+) -> DrawResult:
+    """
+    Колова система за таблицями Бергера FIDE; participant_a — білі.
+    num_rounds: кількість кіл (2 — подвійна колова з оберненими кольорами в другому колі).
+    group_by: одноклубники (або співвітчизники) зустрічаються в перших турах; None — чистий жереб.
+    seeded: номери за порядком сіяння (без жеребу).
+    rng: власний генератор; має пріоритет над shuffle_seed.
+    """
+    if seeded:
+        ordered = sort_by_seed(participants)
+    else:
+        with phase("berger", "numbering"):
+            ordered = assign_berger_numbers(participants, group_by=group_by, shuffle_seed=shuffle_seed, rng=rng)
+    cycles = max(1, int(num_rounds))
+    schedule = BergerSchedule(len(ordered), cycles=cycles, swap_last_rounds=swap_last_rounds)
+    matches: list[Match] = []
+    rounds: list[list[Match]] = []
+    for r in range(1, schedule.num_rounds + 1 if len(ordered) >= 2 else 1):
+        round_matches = [
+            Match(
+                match_id=f"R{r}-M{board}",
+                participant_a=ordered[white - 1],
+                participant_b=ordered[black - 1],
+                round_index=r,
+            )
+            for board, (white, black) in enumerate(schedule.round_pairs(r), 1)
+        ]
+        matches.extend(round_matches)
+        rounds.append(round_matches)
+    description = f"Колова система за таблицями Бергера ({len(participants)} учасників"
+    description += ", подвійна колова)." if cycles == 2 else (f", {cycles} кола)." if cycles > 2 else ").")
+    return DrawResult(matches=matches, rounds=rounds, description=description)
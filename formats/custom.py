@@ -10,26 +10,41 @@
   uefa(8, 2)          — 8 груп, по 2 виходять
   groups(4).round_robin().top(2).knockout()   — групи по 4, колова в групі, топ-2 далі, потім нокаут
   groups(3).round_robin().top(1).knockout()
+  league_phase().playoff(9, 24).knockout(seeded_by_rank)   — сучасна ЛЧ: етап ліги, 9–24 у плей-оф,
+                                                             топ-8 + переможці плей-оф у сітку
+
+Конвеєр етапів (StagePipeline): кожен етап отримує впорядкований список слотів
+(учасників або заглушок «9-те місце етапу ліги», «переможець плей-оф 3») і віддає наступному
+свої слоти. Слоти обчислюються без побудови матчів; матчі етапу будуються лише на вимогу
+(result(i)), а materialize() підставляє реальних учасників замість заглушок.
 """
+import dataclasses
+import random
 import re
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Optional
 
-from models import Participant, DrawResult
-from draw_utils import distribute_into_groups, next_power_of_two
+from models import Participant, Match, DrawResult
+from draw_utils import distribute_into_groups, next_power_of_two, DrawStream
+from metrics import instrument
 from .knockout import draw_knockout, _build_single_knockout_bracket
 from .round_robin import draw_round_robin, _round_robin_pairs
 from .uefa_league_phase import draw_uefa_league_phase
+from .berger import draw_berger
+from .matchdays import compact_matchdays
 
 
 # Іменовані формати без параметрів
 NAMED = {
-    "knockout": lambda p, **kw: draw_knockout(p, shuffle_seed=kw.get("shuffle_seed"), seeded=kw.get("seeded", True), num_seeded=kw.get("num_seeded"), bracket_type=kw.get("bracket_type", "single")),
-    "double_knockout": lambda p, **kw: draw_knockout(p, shuffle_seed=kw.get("shuffle_seed"), seeded=kw.get("seeded", True), num_seeded=kw.get("num_seeded"), bracket_type="double"),
-    "triple_knockout": lambda p, **kw: draw_knockout(p, shuffle_seed=kw.get("shuffle_seed"), seeded=kw.get("seeded", True), num_seeded=kw.get("num_seeded"), bracket_type="triple"),
-    "round_robin": lambda p, **kw: draw_round_robin(p, shuffle_seed=kw.get("shuffle_seed"), seeded=kw.get("seeded", False), num_seeded=kw.get("num_seeded"), num_rounds=kw.get("num_rounds", 1)),
-    "double_round_robin": lambda p, **kw: draw_round_robin(p, shuffle_seed=kw.get("shuffle_seed"), seeded=kw.get("seeded", False), num_seeded=kw.get("num_seeded"), num_rounds=2),
-    "league_phase": lambda p, **kw: draw_uefa_league_phase(p, shuffle_seed=kw.get("shuffle_seed"), country_lock=False, max_per_country=2),
-    "uefa_league_phase": lambda p, **kw: draw_uefa_league_phase(p, shuffle_seed=kw.get("shuffle_seed"), country_lock=False, max_per_country=2),
+    "knockout": lambda p, **kw: draw_knockout(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), seeded=kw.get("seeded", True), num_seeded=kw.get("num_seeded"), bracket_type=kw.get("bracket_type", "single")),
+    "double_knockout": lambda p, **kw: draw_knockout(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), seeded=kw.get("seeded", True), num_seeded=kw.get("num_seeded"), bracket_type="double"),
+    "triple_knockout": lambda p, **kw: draw_knockout(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), seeded=kw.get("seeded", True), num_seeded=kw.get("num_seeded"), bracket_type="triple"),
+    "round_robin": lambda p, **kw: draw_round_robin(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), seeded=kw.get("seeded", False), num_seeded=kw.get("num_seeded"), num_rounds=kw.get("num_rounds", 1)),
+    "double_round_robin": lambda p, **kw: draw_round_robin(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), seeded=kw.get("seeded", False), num_seeded=kw.get("num_seeded"), num_rounds=2),
+    "berger": lambda p, **kw: draw_berger(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), num_rounds=kw.get("num_rounds", 1)),
+    "double_berger": lambda p, **kw: draw_berger(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), num_rounds=2),
+    "league_phase": lambda p, **kw: draw_uefa_league_phase(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), country_lock=False, max_per_country=2),
+    "uefa_league_phase": lambda p, **kw: draw_uefa_league_phase(p, shuffle_seed=kw.get("shuffle_seed"), rng=kw.get("rng"), country_lock=False, max_per_country=2),
 }
 
 
@@ -75,19 +90,290 @@ def _parse_formula(formula: str) -> list[tuple[str, list]]:
     return steps
 
 
+def _slot(slot_id: str, name: str, seed: int) -> Participant:
+    """Заглушка учасника: місце в таблиці або переможець матчу попереднього етапу."""
+    return Participant(id=slot_id, name=name, seed=seed)
+
+
+@dataclass
+class LeaguePhaseStage:
+    """Етап ліги; на виході — слоти «k-те місце» (k = 1..N)."""
+    rounds: int = 8
+    tag: str = "L"
+
+    def slots(self, incoming: list[Participant], stage_no: int) -> list[Participant]:
+        return [
+            _slot(f"S{stage_no}-P{k}", f"{k}-те місце етапу ліги", k)
+            for k in range(1, len(incoming) + 1)
+        ]
+
+    def build(
+        self, incoming: list[Participant], stage_no: int, rng: random.Random,
+    ) -> tuple[DrawResult, dict[str, str]]:
+        result = draw_uefa_league_phase(
+            incoming, rounds=self.rounds, country_lock=False, max_per_country=2, rng=rng
+        )
+        result.description = f"етап ліги ({self.rounds} турів)"
+        return result, {}
+
+
+@dataclass
+class PlayoffStage:
+    """
+    Плей-оф за рангом: місця first..last грають пари first–last, first+1–(last-1), …
+    block > 1: суперник обирається жеребом усередині блоку (як 9/10 проти 23/24 у ЛЧ).
+    Місця 1..first-1 проходять далі напряму, місця після last вибувають.
+    """
+    first: int
+    last: int
+    block: int = 1
+    tag: str = "PO"
+
+    def _check(self, incoming: list[Participant]) -> None:
+        if not 1 <= self.first < self.last <= len(incoming):
+            raise ValueError(
+                f"playoff({self.first}, {self.last}): місця мають бути в межах 1..{len(incoming)}"
+            )
+        if (self.last - self.first + 1) % 2:
+            raise ValueError(f"playoff({self.first}, {self.last}): непарна кількість учасників плей-оф")
+        if self.block < 1:
+            raise ValueError("playoff: block має бути додатним")
+
+    def slots(self, incoming: list[Participant], stage_no: int) -> list[Participant]:
+        self._check(incoming)
+        direct = list(incoming[: self.first - 1])
+        ties = (self.last - self.first + 1) // 2
+        winners = [
+            _slot(
+                f"S{stage_no}-W{i + 1}",
+                f"Переможець плей-оф {i + 1} ({self.first + i}/{self.last - i})",
+                self.first + i,
+            )
+            for i in range(ties)
+        ]
+        return direct + winners
+
+    def build(
+        self, incoming: list[Participant], stage_no: int, rng: random.Random,
+    ) -> tuple[DrawResult, dict[str, str]]:
+        self._check(incoming)
+        ranked = incoming[self.first - 1 : self.last]
+        half = len(ranked) // 2
+        high, low = ranked[:half], ranked[half:][::-1]
+        if self.block > 1:
+            for b in range(0, half, self.block):
+                segment = low[b : b + self.block]
+                rng.shuffle(segment)
+                low[b : b + self.block] = segment
+        matches = [
+            Match(match_id=f"{self.tag}-M{i + 1}", participant_a=h, participant_b=a, round_index=1)
+            for i, (h, a) in enumerate(zip(high, low))
+        ]
+        feeds = {f"S{stage_no}-W{i + 1}": m.match_id for i, m in enumerate(matches)}
+        desc = f"плей-оф {self.first}–{self.last}"
+        return DrawResult(matches=matches, rounds=[matches], description=desc), feeds
+
+
+@dataclass
+class TopStage:
+    """Перші k слотів проходять далі, решта вибуває (матчів немає)."""
+    k: int
+    tag: str = "TOP"
+
+    def slots(self, incoming: list[Participant], stage_no: int) -> list[Participant]:
+        return list(incoming[: self.k])
+
+    def build(
+        self, incoming: list[Participant], stage_no: int, rng: random.Random,
+    ) -> tuple[DrawResult, dict[str, str]]:
+        return DrawResult(description=f"топ-{self.k}"), {}
+
+
+@dataclass
+class KnockoutStage:
+    """
+    Нокаут серед вхідних слотів.
+    seeding="seeded_by_rank" — жорстка сітка за рангом (1 проти останнього, …);
+    "draw" — перша половина сіяна, суперники для них — жереб.
+    """
+    seeding: str = "draw"
+    tag: str = "KO"
+
+    def slots(self, incoming: list[Participant], stage_no: int) -> list[Participant]:
+        return [_slot(f"S{stage_no}-W1", "Переможець нокауту", 1)]
+
+    def build(
+        self, incoming: list[Participant], stage_no: int, rng: random.Random,
+    ) -> tuple[DrawResult, dict[str, str]]:
+        if self.seeding not in ("seeded_by_rank", "draw"):
+            raise ValueError(f"knockout: невідоме сіяння {self.seeding!r} (seeded_by_rank або draw)")
+        num_seeded = None if self.seeding == "seeded_by_rank" else len(incoming) // 2
+        matches, rounds = _build_single_knockout_bracket(incoming, None, num_seeded, rng=rng)
+        for m in matches:
+            m.match_id = f"{self.tag}-{m.match_id}"
+            if m.winner_advances_to:
+                m.winner_advances_to = f"{self.tag}-{m.winner_advances_to}"
+        feeds = {f"S{stage_no}-W1": rounds[-1][0].match_id} if rounds and rounds[-1] else {}
+        desc = "нокаут (сітка за рангом)" if self.seeding == "seeded_by_rank" else "нокаут"
+        return DrawResult(matches=matches, rounds=rounds, description=desc), feeds
+
+
+class StagePipeline:
+    """
+    Ланцюжок етапів, що передають слоти один одному:
+        StagePipeline(teams, shuffle_seed=1).league_phase().playoff(9, 24, block=2).knockout("seeded_by_rank")
+
+    slots(i) — вхідні слоти етапу i (без побудови матчів);
+    result(i) — матчі етапу i із заглушками (будуються при першому запиті й кешуються);
+    materialize(bindings) — усі етапи одним DrawResult; bindings: id слота → реальний учасник.
+    Кожен етап має власний підпотік випадковості, тож result(i) не залежить від того,
+    чи будувалися попередні етапи.
+    """
+
+    def __init__(
+        self,
+        participants: list[Participant],
+        shuffle_seed: int | None = None,
+        rng: random.Random | None = None,
+    ):
+        self.participants = list(participants)
+        self.stages: list = []
+        if shuffle_seed is None and rng is not None:
+            shuffle_seed = rng.getrandbits(64)
+        self._root_seed = DrawStream(shuffle_seed).root_seed
+        self._slots: list[list[Participant]] = [self.participants]
+        self._results: dict[int, tuple[DrawResult, dict[str, str]]] = {}
+
+    def _add(self, stage) -> "StagePipeline":
+        self.stages.append(stage)
+        return self
+
+    def league_phase(self, rounds: int = 8) -> "StagePipeline":
+        return self._add(LeaguePhaseStage(rounds))
+
+    def playoff(self, first: int, last: int, block: int = 1) -> "StagePipeline":
+        return self._add(PlayoffStage(first, last, block))
+
+    def top(self, k: int) -> "StagePipeline":
+        return self._add(TopStage(k))
+
+    def knockout(self, seeding: str = "draw") -> "StagePipeline":
+        return self._add(KnockoutStage(seeding))
+
+    def slots(self, i: int) -> list[Participant]:
+        """Вхідні слоти етапу i; slots(len(stages)) — вихід останнього етапу."""
+        while len(self._slots) <= i:
+            j = len(self._slots) - 1
+            self._slots.append(self.stages[j].slots(self._slots[j], j + 1))
+        return self._slots[i]
+
+    def result(self, i: int) -> DrawResult:
+        """Матчі етапу i (із заглушками замість ще невідомих учасників)."""
+        if i not in self._results:
+            rng = DrawStream(self._root_seed, (i,))
+            self._results[i] = self.stages[i].build(self.slots(i), i + 1, rng)
+        return self._results[i][0]
+
+    def materialize(self, bindings: Optional[dict[str, Participant]] = None) -> DrawResult:
+        """
+        Зібрати всі етапи в один DrawResult (кешовані результати етапів не змінюються).
+        Ідентифікатори слотів: S<етап>-P<місце> (місце в таблиці), S<етап>-W<n> (переможець).
+        Тури нумеруються наскрізь; переможець матчу, що живить слот наступного етапу,
+        отримує winner_advances_to на матч, де цей слот грає.
+        """
+        bindings = bindings or {}
+        all_matches: list[Match] = []
+        all_rounds: list[list[Match]] = []
+        feeds: dict[str, Match] = {}
+        round_offset = 0
+        parts = []
+        for i, stage in enumerate(self.stages):
+            stage_result = self.result(i)
+            by_id: dict[str, Match] = {}
+            for stage_round in stage_result.rounds:
+                new_round = []
+                for m in stage_round:
+                    copy = dataclasses.replace(
+                        m,
+                        participant_a=self._bind(m.participant_a, bindings),
+                        participant_b=self._bind(m.participant_b, bindings),
+                        round_index=m.round_index + round_offset,
+                    )
+                    for p in (m.participant_a, m.participant_b):
+                        if p is not None and p.id in feeds:
+                            feeds[p.id].winner_advances_to = copy.match_id
+                    by_id[copy.match_id] = copy
+                    new_round.append(copy)
+                all_rounds.append(new_round)
+            all_matches.extend(by_id.values())
+            for slot_id, match_id in self._results[i][1].items():
+                feeds[slot_id] = by_id[match_id]
+            round_offset += len(stage_result.rounds)
+            parts.append(stage_result.description)
+        return DrawResult(
+            matches=all_matches,
+            rounds=all_rounds,
+            description="Кастомна формула: " + " → ".join(parts),
+        )
+
+    @staticmethod
+    def _bind(p: Optional[Participant], bindings: dict[str, Participant]) -> Optional[Participant]:
+        if p is None:
+            return None
+        return bindings.get(p.id, p)
+
+
+# Кроки формули, що будують StagePipeline
+PIPELINE_STAGES = ("league_phase", "playoff", "top", "knockout")
+
+
+def _build_pipeline(
+    participants: list[Participant],
+    steps: list[tuple[str, list]],
+    shuffle_seed: int | None,
+    rng: random.Random | None,
+) -> StagePipeline:
+    pipeline = StagePipeline(participants, shuffle_seed=shuffle_seed, rng=rng)
+    for name, args in steps:
+        pos = [a for a in args if not isinstance(a, tuple)]
+        named = dict(a for a in args if isinstance(a, tuple))
+        if name == "league_phase":
+            pipeline.league_phase(int(named.get("rounds", pos[0] if pos else 8)))
+        elif name == "playoff":
+            if len(pos) < 2:
+                raise ValueError("playoff(A, B): вкажіть перше й останнє місце плей-оф")
+            pipeline.playoff(int(pos[0]), int(pos[1]), int(named.get("block", 1)))
+        elif name == "top":
+            if not pos:
+                raise ValueError("top(K): вкажіть K — скільки слотів проходять далі")
+            pipeline.top(int(pos[0]))
+        elif name == "knockout":
+            pipeline.knockout(str(named.get("seeding", pos[0] if pos else "draw")))
+        else:
+            raise ValueError(f"Крок {name} не підтримується після league_phase()")
+    return pipeline
+
+
+@instrument("custom")
 def draw_custom(
     participants: list[Participant],
     formula: str,
     shuffle_seed: int | None = None,
     seeded: bool = True,
     num_seeded: int | None = None,
+    rng: random.Random | None = None,
+    compact: bool = False,
+    max_matches_per_matchday: int | None = None,
 ) -> DrawResult:
     """
     Провести жеребкування за кастомною формулою.
     num_seeded: кількість сіяних (для нокауту та колової).
+    rng: власний генератор для всіх кроків формули; має пріоритет над shuffle_seed.
+    compact / max_matches_per_matchday: тури груп у спільні ігрові дні (як у draw_uefa_style);
+    у формулі — round_robin(compact) або round_robin(max_per_day=N).
     """
     formula = formula.strip().lower()
-    kw = {"shuffle_seed": shuffle_seed, "seeded": seeded, "num_seeded": num_seeded}
+    kw = {"shuffle_seed": shuffle_seed, "seeded": seeded, "num_seeded": num_seeded, "rng": rng}
 
     # Один іменований формат без дужок
     if formula in NAMED:
@@ -111,12 +397,20 @@ def draw_custom(
                     num_groups = a
                 else:
                     advance = a
-        return draw_uefa_style(participants, num_groups=num_groups, advance_per_group=advance, **kw)
+        return draw_uefa_style(
+            participants, num_groups=num_groups, advance_per_group=advance,
+            shuffle_seed=shuffle_seed, seeded=seeded, rng=rng,
+            compact=compact, max_matches_per_matchday=max_matches_per_matchday,
+        )
 
     steps = _parse_formula(formula)
     if not steps:
         raise ValueError(f"Невідома формула: {formula}")
 
+    # Конвеєр етапів: league_phase().playoff(9,24).knockout(seeded_by_rank)
+    if steps[0][0] == "league_phase" and all(name in PIPELINE_STAGES for name, _ in steps):
+        return _build_pipeline(participants, steps, shuffle_seed, rng).materialize()
+
     # Ланцюжок: groups(N) -> round_robin() -> top(K) -> knockout()
     current: list[Participant] = list(participants)
     all_matches: list = []
@@ -130,7 +424,9 @@ def draw_custom(
                 raise ValueError("groups(N): вкажіть N — кількість учасників у групі")
             group_size = step_args[0]
             num_groups = (len(current) + group_size - 1) // group_size
-            group_lists = distribute_into_groups(current, num_groups, seeded=seeded, shuffle_seed=shuffle_seed)
+            group_lists = distribute_into_groups(
+                current, num_groups, seeded=seeded, shuffle_seed=shuffle_seed, rng=rng
+            )
             description_parts.append(f"групи по {group_size}")
             # Зберігаємо для наступного кроку: список груп (списків учасників)
             current = group_lists  # type: ignore  # тепер current = list[list[Participant]]
@@ -141,6 +437,7 @@ def draw_custom(
                 # current = list of groups
                 groups_data = current
                 current = []
+                group_rounds: list[list[list]] = []
                 for g in groups_data:
                     rounds_here: list[list] = []
                     ms = _round_robin_pairs(g, rounds_here, round_offset)
@@ -148,10 +445,23 @@ def draw_custom(
                     for r in rounds_here:
                         all_rounds.append(r)
                     round_offset += len(rounds_here)
+                    group_rounds.append(rounds_here)
                     # Після кругів "учасники" для наступного етапу — це групи (списки учасників)
                     current.append(g)
+                named = dict(a for a in step_args if isinstance(a, tuple))
+                limit = named.get("max_per_day", max_matches_per_matchday)
+                if compact or "compact" in step_args or limit is not None:
+                    # Тури груп цього кроку → спільні ігрові дні
+                    stage_rounds = sum(len(r) for r in group_rounds)
+                    start = round_offset - stage_rounds
+                    del all_rounds[len(all_rounds) - stage_rounds:]
+                    matchdays = compact_matchdays(
+                        group_rounds, int(limit) if limit is not None else None, first_round=start + 1
+                    )
+                    all_rounds.extend(matchdays)
+                    round_offset = start + len(matchdays)
             else:
-                dr = draw_round_robin(current, shuffle_seed=shuffle_seed, seeded=seeded)
+                dr = draw_round_robin(current, shuffle_seed=shuffle_seed, seeded=seeded, rng=rng)
                 return dr
             description_parts.append("колова система")
             continue
@@ -173,7 +483,10 @@ def draw_custom(
         if step_name == "knockout":
             if isinstance(current, list) and current and isinstance(current[0], Participant):
                 knockout_matches, knockout_rounds = _build_single_knockout_bracket(
-                    current, shuffle_seed=shuffle_seed, seeded=seeded
+                    current,
+                    shuffle_seed=shuffle_seed,
+                    num_seeded=(num_seeded or len(current) // 2) if seeded else None,
+                    rng=rng,
                 )
                 for m in knockout_matches:
                     m.round_index += round_offset
@@ -0,0 +1,185 @@
+"""
+Класичне жеребкування групового етапу по кошиках з обмеженнями (як у програмі УЄФА).
+
+Кошики: за замовчуванням учасники, відсортовані за сіяним номером, по num_groups у кошику
+(кошик 1 — найсильніші). Кошики тягнуться по черзі, кулі в кошику — у випадковому порядку.
+Для кожної кулі обчислюється множина допустимих груп:
+  - у групі ще немає команди з цього кошика;
+  - захист країни: у групі немає команди тієї ж країни;
+  - заборонені пари асоціацій (наприклад, країни, які не можуть потрапити в одну групу);
+  - look-ahead: після розміщення решту жеребкування (залишок кошика і всі наступні кошики)
+    ще можна завершити без порушень.
+Команда потрапляє в першу за алфавітом допустиму групу.
+
+Перевірка look-ahead — пошук з поверненням по канонічному стану (кошик, країни куль, що лишилися,
+відсортовані стани груп), кешований через lru_cache: групи з однаковим набором країн
+взаємозамінні, тож простір станів малий навіть для 8–16 груп.
+"""
+from __future__ import annotations
+
+import random
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+from models import Participant
+from draw_events import DrawEvent, PotOpened, BallDrawn, GroupAssigned, DrawCompleted, run_events
+from draw_utils import sort_by_seed, make_rng
+from metrics import instrument
+
+# Стан групи: (країни в групі, чи вже є команда з поточного кошика)
+_GroupState = tuple[frozenset, bool]
+
+
+def make_pots(participants: list[Participant], num_groups: int) -> list[list[Participant]]:
+    """Розбити учасників на кошики по num_groups за сіяним номером."""
+    ordered = sort_by_seed(participants)
+    return [ordered[i:i + num_groups] for i in range(0, len(ordered), num_groups)]
+
+
+def _make_compatible(
+    country_protection: bool,
+    forbidden: frozenset[frozenset[str]],
+):
+    def compatible(country: str, group_countries: frozenset) -> bool:
+        if not country:
+            return True
+        if country_protection and country in group_countries:
+            return False
+        return not any(frozenset((country, c)) in forbidden for c in group_countries)
+    return compatible
+
+
+def _canonical(groups: Iterable[_GroupState]) -> tuple[_GroupState, ...]:
+    return tuple(sorted(groups, key=lambda s: (sorted(s[0]), s[1])))
+
+
+@lru_cache(maxsize=1 << 18)
+def _feasible(
+    pots_countries: tuple[tuple[str, ...], ...],
+    pot_idx: int,
+    remaining: tuple[str, ...],
+    groups: tuple[_GroupState, ...],
+    country_protection: bool,
+    forbidden: frozenset[frozenset[str]],
+) -> bool:
+    """Чи можна розмістити remaining (поточний кошик) і всі наступні кошики."""
+    if not remaining:
+        if pot_idx + 1 >= len(pots_countries):
+            return True
+        reset = _canonical((c, False) for c, _ in groups)
+        return _feasible(
+            pots_countries, pot_idx + 1, pots_countries[pot_idx + 1], reset, country_protection, forbidden
+        )
+    compatible = _make_compatible(country_protection, forbidden)
+    # Найбільш обмежена куля першою
+    best_ball, best_options = None, None
+    for ball in set(remaining):
+        options = {
+            g for g in groups if not g[1] and compatible(ball, g[0])
+        }
+        if best_options is None or len(options) < len(best_options):
+            best_ball, best_options = ball, options
+            if not options:
+                return False
+    rest = list(remaining)
+    rest.remove(best_ball)
+    rest_t = tuple(rest)
+    for g in _canonical(best_options):
+        new_groups = list(groups)
+        new_groups.remove(g)
+        placed = (g[0] | {best_ball} if best_ball else g[0], True)
+        new_groups.append(placed)
+        if _feasible(
+            pots_countries, pot_idx, rest_t, _canonical(new_groups), country_protection, forbidden,
+        ):
+            return True
+    return False
+
+
+def iter_groups_by_pots(
+    participants: list[Participant],
+    num_groups: int,
+    shuffle_seed: int | None = None,
+    country_protection: bool = True,
+    forbidden_pairs: Optional[list[tuple[str, str]]] = None,
+    pots: Optional[list[list[Participant]]] = None,
+    rng: Optional[random.Random] = None,
+) -> Iterator[DrawEvent]:
+    """
+    Жеребкування по кошиках подіями (draw_events): PotOpened, для кожної кулі BallDrawn і
+    GroupAssigned одразу після вибору групи; DrawCompleted — групи, як у draw_groups_by_pots.
+    """
+    if pots is None:
+        pots = make_pots(participants, num_groups)
+    if any(len(p) > num_groups for p in pots):
+        raise ValueError(f"У кошику не може бути більше команд, ніж груп ({num_groups})")
+    forbidden = frozenset(frozenset(p) for p in (forbidden_pairs or []))
+    compatible = _make_compatible(country_protection, forbidden)
+    pots_countries = tuple(tuple(sorted(p.country or "" for p in pot)) for pot in pots)
+
+    rng = make_rng(shuffle_seed, rng)
+    groups: list[list[Participant]] = [[] for _ in range(num_groups)]
+    group_countries: list[frozenset] = [frozenset() for _ in range(num_groups)]
+
+    if not _feasible(
+        pots_countries, 0, pots_countries[0] if pots_countries else (),
+        _canonical((frozenset(), False) for _ in range(num_groups)), country_protection, forbidden,
+    ):
+        raise ValueError("Жеребкування неможливе: обмеження по країнах не дозволяють скласти групи.")
+
+    for pot_idx, pot in enumerate(pots):
+        yield PotOpened(pot_idx, tuple(pot))
+        balls = list(pot)
+        rng.shuffle(balls)
+        filled = [False] * num_groups
+        remaining = sorted(p.country or "" for p in balls)
+        for team in balls:
+            yield BallDrawn(team, pot_idx)
+            country = team.country or ""
+            remaining.remove(country)
+            chosen = None
+            for gi in range(num_groups):
+                if filled[gi] or not compatible(country, group_countries[gi]):
+                    continue
+                trial = [
+                    (group_countries[i] | {country} if i == gi and country else group_countries[i],
+                     filled[i] or i == gi)
+                    for i in range(num_groups)
+                ]
+                if _feasible(
+                    pots_countries, pot_idx, tuple(remaining), _canonical(trial), country_protection, forbidden
+                ):
+                    chosen = gi
+                    break
+            if chosen is None:
+                raise ValueError(f"Немає допустимої групи для {team.name}")
+            groups[chosen].append(team)
+            filled[chosen] = True
+            if country:
+                group_countries[chosen] = group_countries[chosen] | {country}
+            yield GroupAssigned(team, chosen, pot_idx)
+    yield DrawCompleted(groups)
+
+
+@instrument("groups_by_pots")
+def draw_groups_by_pots(
+    participants: list[Participant],
+    num_groups: int,
+    shuffle_seed: int | None = None,
+    country_protection: bool = True,
+    forbidden_pairs: Optional[list[tuple[str, str]]] = None,
+    pots: Optional[list[list[Participant]]] = None,
+    rng: Optional[random.Random] = None,
+) -> list[list[Participant]]:
+    """
+    Жеребкування по кошиках. Повертає список груп (учасники в порядку кошиків).
+
+    pots: власні кошики; за замовчуванням make_pots(participants, num_groups).
+    forbidden_pairs: пари країн, що не можуть бути в одній групі.
+    rng: власний генератор; має пріоритет над shuffle_seed.
+    ValueError, якщо обмеження роблять жеребкування неможливим.
+    Покроково (для церемонії) — iter_groups_by_pots.
+    """
+    return run_events(iter_groups_by_pots(
+        participants, num_groups, shuffle_seed, country_protection, forbidden_pairs, pots, rng,
+    ))
@@ -0,0 +1,258 @@
+"""
+Оптимізація господар/гість після жеребкування (етап ліги, колова система).
+
+Матчі кожного класу (пара кошиків для етапу ліги; усі матчі для колової) орієнтуються
+вздовж ейлерового циклу — так кожна команда має порівну матчів вдома і на виїзді в класі
+(для етапу ліги: з двох суперників кошика один вдома, один на виїзді → 4H/4A).
+Ейлерів цикл розбивається на прості орієнтовані цикли: розворот будь-якого з них
+не змінює баланс жодної команди. Далі локальний пошук розвертає цикли, якщо це зменшує
+кількість «брейків» (два тури поспіль вдома або на виїзді); зміна вартості рахується
+інкрементально лише за позиціями, яких торкається цикл.
+
+Повторні зустрічі однієї пари (подвійна колова) завжди отримують протилежні орієнтації.
+
+keep_orientation: почати з наявної орієнтації (наприклад, канонічної колової з n − 2 брейками),
+а не з ейлерової: цикли-одиниці — орієнтовані цикли поточної орієнтації, тож їх розворот
+так само зберігає баланс, а пошук лише покращує вхідну орієнтацію.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+from models import Match, DrawResult
+from draw_utils import make_rng
+
+
+@dataclass
+class HomeAwayReport:
+    """Кількість брейків до і після оптимізації."""
+    breaks_before: int
+    breaks_after: int
+    cycles: int
+    passes: int
+
+
+def _euler_cycles(
+    edges: list[tuple[int, int]],
+    edge_ids: list[int],
+    n_vertices: int,
+    directed: bool = False,
+) -> list[list[tuple[int, bool]]]:
+    """
+    Розкласти мультиграф на орієнтовані реберно-неперетинні цикли (через ейлерові цикли).
+    Вершини непарного степеня з'єднуються з фіктивною вершиною n_vertices; її ребра
+    у відповідь не потрапляють. Повертає список циклів: [(edge_id, орієнтація як у edges)].
+    directed: ребра йдуть лише a → b; фіктивні ребра вирівнюють вхідні й вихідні степені,
+    тож усі цикли узгоджені з орієнтацією edges.
+    """
+    dummy = n_vertices
+    adj: list[list[tuple[int, int]]] = [[] for _ in range(n_vertices + 1)]
+    all_edges: list[tuple[int, int]] = []
+    ids: list[int] = []
+
+    def add(a: int, b: int, edge_id: int) -> None:
+        k = len(all_edges)
+        all_edges.append((a, b))
+        ids.append(edge_id)
+        adj[a].append((b, k))
+        if not directed:
+            adj[b].append((a, k))
+
+    for (a, b), edge_id in zip(edges, edge_ids):
+        add(a, b, edge_id)
+    if directed:
+        surplus = [0] * n_vertices
+        for a, b in edges:
+            surplus[a] += 1
+            surplus[b] -= 1
+        for v in range(n_vertices):
+            for _ in range(surplus[v]):
+                add(dummy, v, -1)
+            for _ in range(-surplus[v]):
+                add(v, dummy, -1)
+    else:
+        for v in range(n_vertices):
+            if len(adj[v]) % 2 == 1:
+                add(v, dummy, -1)
+
+    used = [False] * len(all_edges)
+    ptr = [0] * (n_vertices + 1)
+    cycles: list[list[tuple[int, bool]]] = []
+    for start in range(n_vertices + 1):
+        if ptr[start] >= len(adj[start]):
+            continue
+        # Hierholzer: послідовність (вершина, ребро, яким прийшли)
+        stack: list[tuple[int, int]] = [(start, -1)]
+        circuit: list[tuple[int, int]] = []
+        while stack:
+            v, via = stack[-1]
+            while ptr[v] < len(adj[v]) and used[adj[v][ptr[v]][1]]:
+                ptr[v] += 1
+            if ptr[v] == len(adj[v]):
+                circuit.append(stack.pop())
+                continue
+            w, k = adj[v][ptr[v]]
+            used[k] = True
+            stack.append((w, k))
+        circuit.reverse()
+        # Розбити замкнений шлях на прості цикли
+        path: list[tuple[int, int]] = []
+        position: dict[int, int] = {}
+        prev_vertex = -1
+        for v, via in circuit:
+            if via >= 0:
+                path.append((prev_vertex, via))
+            if v in position:
+                k0 = position[v]
+                cyc = path[k0:]
+                del path[k0:]
+                for u, _ in cyc[1:]:
+                    position.pop(u, None)
+                cycle = [
+                    (ids[k], all_edges[k][0] == u) for u, k in cyc if ids[k] >= 0
+                ]
+                if cycle:
+                    cycles.append(cycle)
+            position[v] = len(path)
+            prev_vertex = v
+    return cycles
+
+
+def optimize_home_away(
+    result: DrawResult,
+    pot_of: Optional[dict[str, int]] = None,
+    shuffle_seed: Optional[int] = None,
+    max_passes: int = 50,
+    rng: Optional[random.Random] = None,
+    keep_orientation: bool = False,
+) -> HomeAwayReport:
+    """
+    Переорієнтувати матчі result (participant_a — господар) для мінімуму брейків.
+    Змінює result на місці.
+
+    pot_of: id учасника → кошик. Якщо задано — баланс 1H/1A тримається окремо для кожної
+    пари кошиків (правило 4H/4A етапу ліги); інакше — по всіх матчах команди (±1).
+    rng: власний генератор; має пріоритет над shuffle_seed.
+    keep_orientation: почати з поточної орієнтації (має бути збалансованою) замість ейлерової.
+    """
+    rng = make_rng(shuffle_seed, rng)
+    index_of: dict[str, int] = {}
+    edge_matches: list[Match] = []
+    edge_round: list[int] = []
+    for r, round_matches in enumerate(result.rounds):
+        for m in round_matches:
+            if m.participant_a is None or m.participant_b is None:
+                continue
+            for p in (m.participant_a, m.participant_b):
+                if p.id not in index_of:
+                    index_of[p.id] = len(index_of)
+            edge_matches.append(m)
+            edge_round.append(r)
+    n_teams = len(index_of)
+    ends = [(index_of[m.participant_a.id], index_of[m.participant_b.id]) for m in edge_matches]
+    home = [a for a, _ in ends]  # поточний господар кожного ребра
+
+    # Послідовність матчів кожної команди за турами та позиція ребра в ній
+    team_edges: list[list[int]] = [[] for _ in range(n_teams)]
+    for k in sorted(range(len(ends)), key=lambda k: edge_round[k]):
+        a, b = ends[k]
+        team_edges[a].append(k)
+        team_edges[b].append(k)
+    pos_in_team: list[dict[int, int]] = [{k: i for i, k in enumerate(seq)} for seq in team_edges]
+
+    def is_home(team: int, k: int) -> bool:
+        return home[k] == team
+
+    def count_breaks() -> int:
+        total = 0
+        for t, seq in enumerate(team_edges):
+            for i in range(1, len(seq)):
+                total += is_home(t, seq[i]) == is_home(t, seq[i - 1])
+        return total
+
+    breaks_before = count_breaks()
+
+    # Класи ребер і цикли-одиниці
+    classes: dict[tuple, list[int]] = {}
+    for k, (a, b) in enumerate(ends):
+        if pot_of is not None:
+            pa, pb = pot_of[edge_matches[k].participant_a.id], pot_of[edge_matches[k].participant_b.id]
+            key = (min(pa, pb), max(pa, pb))
+        else:
+            key = ()
+        classes.setdefault(key, []).append(k)
+    units: list[list[tuple[int, bool]]] = []
+    for key in sorted(classes):
+        by_pair: dict[tuple[int, int], list[int]] = {}
+        for k in classes[key]:
+            a, b = ends[k]
+            by_pair.setdefault((min(a, b), max(a, b)), []).append(k)
+        single_edges: list[tuple[int, int]] = []
+        single_ids: list[int] = []
+        for (a, b), ks in by_pair.items():
+            # Повторні зустрічі: пари ребер з протилежною орієнтацією
+            while len(ks) >= 2:
+                k1, k2 = ks.pop(), ks.pop()
+                units.append([(k1, True), (k2, False)])
+                if not (keep_orientation and home[k1] != home[k2]):
+                    home[k1], home[k2] = a, b
+            if ks:
+                k = ks[0]
+                single_edges.append((home[k], a + b - home[k]) if keep_orientation else (a, b))
+                single_ids.append(k)
+        for cycle in _euler_cycles(single_edges, single_ids, n_teams, directed=keep_orientation):
+            units.append(cycle)
+            if keep_orientation:
+                continue
+            for k, forward in cycle:
+                a, b = min(ends[k]), max(ends[k])
+                home[k] = a if forward else b
+
+    def flip_delta(unit: list[tuple[int, bool]]) -> int:
+        flipped: dict[int, set[int]] = {}
+        for k, _ in unit:
+            a, b = ends[k]
+            flipped.setdefault(a, set()).add(pos_in_team[a][k])
+            flipped.setdefault(b, set()).add(pos_in_team[b][k])
+        delta = 0
+        for t, positions in flipped.items():
+            seq = team_edges[t]
+            for p in positions:
+                for q in (p - 1, p + 1):
+                    if 0 <= q < len(seq) and q not in positions:
+                        same = is_home(t, seq[p]) == is_home(t, seq[q])
+                        delta += -1 if same else 1
+        return delta
+
+    def flip(unit: list[tuple[int, bool]]) -> None:
+        for k, _ in unit:
+            a, b = ends[k]
+            home[k] = b if home[k] == a else a
+
+    # Випадкова початкова орієнтація циклів (крім keep_orientation), далі спуск з першим покращенням
+    for unit in units:
+        if not keep_orientation and rng.random() < 0.5:
+            flip(unit)
+    order = list(range(len(units)))
+    passes = 0
+    for passes in range(1, max_passes + 1):
+        rng.shuffle(order)
+        improved = False
+        for u in order:
+            if flip_delta(units[u]) < 0:
+                flip(units[u])
+                improved = True
+        if not improved:
+            break
+
+    for k, m in enumerate(edge_matches):
+        if index_of[m.participant_a.id] != home[k]:
+            m.participant_a, m.participant_b = m.participant_b, m.participant_a
+    return HomeAwayReport(
+        breaks_before=breaks_before,
+        breaks_after=count_breaks(),
+        cycles=len(units),
+        passes=passes,
+    )
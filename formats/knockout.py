@@ -3,67 +3,91 @@
 Сітка: 1 проти останнього, 2 проти передостаннього тощо; повна сітка відома наперед.
 Якщо кількість не ступінь двійки — перші номери отримують bye (проходять далі).
 Підтримка сіяних: num_seeded — скільки сіяних; вони в жорсткій сітці, решта жереб.
+avoid_same: без пар першого кола з однієї країни/клубу (knockout_placement).
 """
 from __future__ import annotations
 
 import random
-from typing import Optional
+from typing import Iterator, Optional
 
 from models import Participant, Match, DrawResult, BracketType
-from draw_utils import next_power_of_two, bracket_seed_order, sort_by_seed
+from draw_events import DrawEvent, PotOpened, BallDrawn, SlotAssigned, ByeGranted, DrawCompleted, run_events
+from draw_utils import next_power_of_two, bracket_seed_order, sort_by_seed, make_rng
+from metrics import instrument, phase
+from .knockout_placement import place_unseeded, check_fixed_pairs
 
 
-def _build_single_knockout_bracket(
+def _knockout_slots(
     participants: list[Participant],
     shuffle_seed: int | None,
     num_seeded: Optional[int],
-) -> tuple[list[Match], list[list[Match]]]:
+    rng: random.Random | None = None,
+    avoid_same: tuple[str, ...] = (),
+) -> tuple[list[Optional[Participant]], list[int], list[int]]:
     """
-    Сітка нокауту: 1 vs останній, 2 vs передостанній, ...
-    Bye: якщо n не 2^k, перші (2^k - n) учасників проходять у наступне коло без гри.
-    num_seeded: якщо задано, перші num_seeded — сіяні (жорстка сітка), решта — жереб по несіяних позиціях.
+    Розстановка по слотах сітки (None — bye). Повертає (slots, позиції сіяних у порядку номерів,
+    позиції несіяних у порядку жеребу); без жеребу всі позиції — «сіяні».
     """
     n = len(participants)
     size = next_power_of_two(n)
-    byes = size - n
-
     ordered = sort_by_seed(participants)
     # ordered[0] = 1-й сіяний, ordered[-1] = останній
+    bracket_order = bracket_seed_order(size)
+    by_seed = sorted(range(size), key=lambda i: bracket_order[i])
+    slots: list[Optional[Participant]] = [None] * size
+    if num_seeded is None and avoid_same:
+        # Без сіяння жорстка сітка не може оминути пари з avoid_same — жереб для всіх
+        num_seeded = 0
 
-    if num_seeded is not None and num_seeded > 0:
-        bracket_order = bracket_seed_order(size)
-        slots = [None] * size
-        if num_seeded >= n:
-            # Усі сіяні: жорстка сітка 1 vs останній, 2 vs передостанній тощо
-            for i in range(size):
-                if bracket_order[i] <= n:
-                    slots[i] = ordered[bracket_order[i] - 1]
+    if num_seeded is not None and (num_seeded > 0 or avoid_same) and num_seeded < n:
+        # Сіяні — фіксовані позиції; несіяні — жереб (випадкові суперники для сіяних)
+        seed_positions = by_seed[:num_seeded]
+        unseeded_positions = by_seed[num_seeded:n]
+        unseeded_list = ordered[num_seeded:n]
+        for idx, pos in enumerate(seed_positions):
+            slots[pos] = ordered[idx]
+        if avoid_same:
+            # Сіяні, що стоять один проти одного (num_seeded > size/2), жереб не розведе
+            check_fixed_pairs(slots, avoid_same)
+            with phase("knockout", "placement"):
+                place_unseeded(slots, unseeded_positions, unseeded_list, avoid_same, make_rng(shuffle_seed, rng))
         else:
-            # Сіяні — фіксовані позиції; несіяні — жереб (випадкові суперники для сіяних)
-            seed_positions = sorted(range(size), key=lambda i: bracket_order[i])[:num_seeded]
-            unseeded_positions = sorted(range(size), key=lambda i: bracket_order[i])[num_seeded : num_seeded + (n - num_seeded)]
-            unseeded_list = ordered[num_seeded:n]
-            rng = random.Random(shuffle_seed)
-            rng.shuffle(unseeded_list)
-            for idx, pos in enumerate(seed_positions):
-                slots[pos] = ordered[idx]
+            make_rng(shuffle_seed, rng).shuffle(unseeded_list)
             for idx, pos in enumerate(unseeded_positions):
-                if idx < len(unseeded_list):
-                    slots[pos] = unseeded_list[idx]
-    else:
-        # Усі в порядку сіяння; розставляємо по стандартній сітці (1 vs n, 2 vs n-1, ...)
-        bracket_order = bracket_seed_order(size)
-        slots = [None] * size
-        for i in range(size):
-            seed_1based = bracket_order[i]
-            if seed_1based <= n:
-                # Позиція для учасника з номером seed_1based (1..n)
-                slots[i] = ordered[seed_1based - 1]
-        # Bye: перші `byes` учасників (1, 2, ... byes) мають бути в позиціях, які не грають у R1
-        # У bracket_order позиції 0 і 1 грають між собою — це 1 vs size. Якщо byes=8, то учасники 1..8 не грають.
-        # Тобто позиції, що відповідають сіяним 1..byes, — це "bye" позиції. Вони вже заповнені.
-        # Позиції для сіяних byes+1..n мають суперників. Все вже коректно: slots заповнені за bracket_order.
-        pass
+                slots[pos] = unseeded_list[idx]
+        return slots, seed_positions, unseeded_positions
+
+    # Усі сіяні або без сіяння: жорстка сітка 1 vs останній, 2 vs передостанній тощо.
+    # Bye: перші (size - n) номерів стоять навпроти порожніх позицій і не грають у першому колі.
+    for i in range(size):
+        if bracket_order[i] <= n:
+            slots[i] = ordered[bracket_order[i] - 1]
+    if avoid_same:
+        check_fixed_pairs(slots, avoid_same)
+    return slots, by_seed[:n], []
+
+
+def _build_single_knockout_bracket(
+    participants: list[Participant],
+    shuffle_seed: int | None,
+    num_seeded: Optional[int],
+    rng: random.Random | None = None,
+    avoid_same: tuple[str, ...] = (),
+    slots: Optional[list[Optional[Participant]]] = None,
+) -> tuple[list[Match], list[list[Match]]]:
+    """
+    Сітка нокауту: 1 vs останній, 2 vs передостанній, ...
+    Bye: якщо n не 2^k, перші (2^k - n) учасників проходять у наступне коло без гри.
+    num_seeded: якщо задано, перші num_seeded — сіяні (жорстка сітка), решта — жереб по несіяних позиціях
+    (0 — жереб для всіх).
+    avoid_same: атрибути учасника ("country", "club"), збіг яких заборонено в парах першого кола;
+    несіяні розставляються рівномірно серед допустимих варіантів (place_unseeded).
+    rng: власний генератор замість random.Random(shuffle_seed).
+    slots: готова розстановка (_knockout_slots); тоді жереб не проводиться.
+    """
+    if slots is None:
+        slots = _knockout_slots(participants, shuffle_seed, num_seeded, rng, avoid_same)[0]
+    size = len(slots)
 
     matches: list[Match] = []
     round_matches: list[list[Match]] = []
@@ -122,45 +146,91 @@ def _build_single_knockout_bracket(
     return matches, round_matches
 
 
-def draw_knockout(
+def iter_knockout(
     participants: list[Participant],
     shuffle_seed: int | None = None,
     seeded: bool = True,
     num_seeded: Optional[int] = None,
     bracket_type: str = "single",
-) -> DrawResult:
+    rng: random.Random | None = None,
+    avoid_same: tuple[str, ...] = (),
+) -> Iterator[DrawEvent]:
     """
-    Нокаут із вибором типу сітки: одиночний, подвійний або потрійний.
-    Одиночний: 1 vs останній, 2 vs передостанній, …; сітка жорстка.
-    Якщо кількість не 2^k — перші отримують bye. num_seeded: кількість сіяних (решта — жереб).
-    bracket_type: "single", "double" або "triple".
+    Жеребкування нокауту подіями (draw_events): сіяні стають у свої слоти, відкривається кошик
+    несіяних, кожна витягнута куля — BallDrawn і SlotAssigned, далі ByeGranted і DrawCompleted
+    з тим самим DrawResult, що й draw_knockout з тими ж параметрами.
     """
     if num_seeded is None and seeded:
         num_seeded = len(participants) // 2
     elif not seeded:
         num_seeded = None
 
+    slots, seed_positions, drawn_positions = _knockout_slots(participants, shuffle_seed, num_seeded, rng, avoid_same)
+    for pos in seed_positions:
+        yield SlotAssigned(slots[pos], pos, seeded=True)
+    if drawn_positions:
+        unseeded = tuple(sort_by_seed(participants)[len(seed_positions):])
+        yield PotOpened(0, unseeded)
+        for pos in drawn_positions:
+            yield BallDrawn(slots[pos], 0)
+            yield SlotAssigned(slots[pos], pos)
+    for i in range(0, len(slots), 2):
+        a, b = slots[i], slots[i + 1] if i + 1 < len(slots) else None
+        if (a is None) != (b is None):
+            yield ByeGranted(a or b)
+
     bracket_type = bracket_type.lower().strip()
     if bracket_type in ("double", "подвійний"):
-        return _draw_double_knockout(participants, shuffle_seed, num_seeded)
+        result = _draw_double_knockout(participants, shuffle_seed, num_seeded, rng, avoid_same, slots)
     elif bracket_type in ("triple", "потрійний"):
-        return _draw_triple_knockout(participants, shuffle_seed, num_seeded)
+        result = _draw_triple_knockout(participants, shuffle_seed, num_seeded, rng, avoid_same, slots)
     else:
         # За замовчуванням одиночний
-        matches, rounds = _build_single_knockout_bracket(participants, shuffle_seed, num_seeded)
+        matches, rounds = _build_single_knockout_bracket(participants, shuffle_seed, num_seeded, rng, avoid_same, slots)
         desc = f"Одиночний нокаут ({len(participants)} учасників)"
         if num_seeded is not None:
             desc += f", {num_seeded} сіяних"
-        return DrawResult(matches=matches, rounds=rounds, description=desc)
+        result = DrawResult(matches=matches, rounds=rounds, description=desc)
+    yield DrawCompleted(result)
+
+
+@instrument("knockout")
+def draw_knockout(
+    participants: list[Participant],
+    shuffle_seed: int | None = None,
+    seeded: bool = True,
+    num_seeded: Optional[int] = None,
+    bracket_type: str = "single",
+    rng: random.Random | None = None,
+    avoid_same: tuple[str, ...] = (),
+) -> DrawResult:
+    """
+    Нокаут із вибором типу сітки: одиночний, подвійний або потрійний.
+    Одиночний: 1 vs останній, 2 vs передостанній, …; сітка жорстка.
+    Якщо кількість не 2^k — перші отримують bye. num_seeded: кількість сіяних (решта — жереб).
+    bracket_type: "single", "double" або "triple".
+    rng: власний генератор (наприклад, підпотік DrawStream); має пріоритет над shuffle_seed.
+    avoid_same: напр. ("club", "country") — у першому колі не грають учасники з одного клубу/країни
+    (діє для жеребу несіяних; num_seeded=0 чи seeded=False — жереб для всіх).
+    Покроково (для церемонії) — iter_knockout.
+    """
+    return run_events(iter_knockout(
+        participants, shuffle_seed, seeded, num_seeded, bracket_type, rng, avoid_same,
+    ))
 
 
 def _draw_double_knockout(
     participants: list[Participant],
     shuffle_seed: int | None = None,
     num_seeded: Optional[int] = None,
+    rng: random.Random | None = None,
+    avoid_same: tuple[str, ...] = (),
+    slots: Optional[list[Optional[Participant]]] = None,
 ) -> DrawResult:
     """Подвійний нокаут: верхня сітка (як одиночний) + нижня сітка + фінал."""
-    upper_matches, upper_rounds = _build_single_knockout_bracket(participants, shuffle_seed, num_seeded)
+    upper_matches, upper_rounds = _build_single_knockout_bracket(
+        participants, shuffle_seed, num_seeded, rng, avoid_same, slots
+    )
     for m in upper_matches:
         m.match_id = "U-" + m.match_id
         if m.winner_advances_to:
@@ -195,9 +265,12 @@ def _draw_triple_knockout(
     participants: list[Participant],
     shuffle_seed: int | None = None,
     num_seeded: Optional[int] = None,
+    rng: random.Random | None = None,
+    avoid_same: tuple[str, ...] = (),
+    slots: Optional[list[Optional[Participant]]] = None,
 ) -> DrawResult:
     """Потрійний нокаут (структура як подвійний)."""
-    result = _draw_double_knockout(participants, shuffle_seed, num_seeded)
+    result = _draw_double_knockout(participants, shuffle_seed, num_seeded, rng, avoid_same, slots)
     result.description = (
         f"Потрійний нокаут ({len(participants)} учасників). Виліт після третьої поразки."
     )
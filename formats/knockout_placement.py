@@ -0,0 +1,187 @@
+"""
+Розстановка несіяних у сітці нокауту з обмеженнями: у першому колі не грають між собою
+учасники з однієї країни (федерації) чи одного клубу.
+
+Позиції несіяних у першому колі бувають трьох видів: навпроти сіяного (суперник відомий),
+навпроти bye (без обмежень) і навпроти іншого несіяного. Розстановка:
+  1. двочасткове паросполучення «несіяний → позиція» (позиції навпроти сіяних приймають лише
+     сумісних) — жадібне випадкове + збільшувальні шляхи (алгоритм Куна) для решти;
+     якщо повного паросполучення немає, обмеження нездійсненні;
+  2. ремонт пар «несіяний — несіяний» обмінами позицій;
+  3. випадкове блукання обмінами: дві позиції міняються учасниками, якщо обидва матчі
+     лишаються допустимими. Пропозиція симетрична, тож стаціонарний розподіл — рівномірний
+     на допустимих розстановках (досяжних обмінами).
+Кожен крок — O(1) перевірок, тож сітка на 1024+ учасників розставляється за мілісекунди.
+"""
+from __future__ import annotations
+
+import random
+from typing import Optional, Sequence
+
+from models import Participant
+
+
+def _conflict(a: Optional[Participant], b: Optional[Participant], avoid: Sequence[str]) -> bool:
+    if a is None or b is None:
+        return False
+    for attr in avoid:
+        va = getattr(a, attr, None)
+        if va is not None and va == getattr(b, attr, None):
+            return True
+    return False
+
+
+def _infeasible(avoid: Sequence[str]) -> str:
+    return f"Неможливо розставити несіяних: у першому колі неминучі пари зі спільним {'/'.join(avoid)}"
+
+
+def check_fixed_pairs(slots: list[Optional[Participant]], avoid: Sequence[str]) -> None:
+    """
+    Пари першого кола, де обидві позиції вже зайняті (сіяний проти сіяного), мають не збігатися
+    за avoid — жереб несіяних їх не змінює. Інакше — ValueError.
+    """
+    for i in range(0, len(slots) - 1, 2):
+        a, b = slots[i], slots[i + 1]
+        if _conflict(a, b, avoid):
+            raise ValueError(
+                f"Неможливо розставити сіяних: у першому колі {a.name} і {b.name} мають спільний "
+                f"{'/'.join(avoid)}; зменште кількість сіяних або приберіть обмеження"
+            )
+
+
+def place_unseeded(
+    slots: list[Optional[Participant]],
+    positions: list[int],
+    unseeded: list[Participant],
+    avoid: Sequence[str],
+    rng: random.Random,
+    mixing_steps: Optional[int] = None,
+) -> None:
+    """
+    Заповнити slots[positions[i]] учасниками unseeded так, щоб у парах першого кола
+    (позиції 2k, 2k+1) не було збігів за атрибутами avoid (напр. ("country", "club")).
+    slots змінюється на місці; решта позицій (сіяні, None — bye) фіксовані.
+    mixing_steps: кроків випадкового блукання (за замовчуванням 20 × кількість несіяних).
+    Якщо допустимої розстановки немає — ValueError.
+    """
+    k = len(unseeded)
+    if k != len(positions):
+        raise ValueError("Кількість несіяних не збігається з кількістю вільних позицій")
+    if k == 0:
+        return
+    free = set(positions)
+    # partner[i] — індекс позиції (у positions) суперника-несіяного або -1; fixed[i] — сіяний/bye навпроти
+    slot_of = {pos: i for i, pos in enumerate(positions)}
+    partner = [slot_of.get(pos ^ 1, -1) for pos in positions]
+    fixed = [slots[pos ^ 1] if pos ^ 1 not in free else None for pos in positions]
+
+    # 1. Паросполучення: позиція i ← учасник u; позиції навпроти сіяного приймають лише сумісних
+    constrained = [i for i in range(k) if fixed[i] is not None]
+    open_slots = [i for i in range(k) if fixed[i] is None]
+    order = list(range(k))
+    rng.shuffle(order)
+    owner = [-1] * k  # позиція → учасник
+    placed = [-1] * k  # учасник → позиція
+    rng.shuffle(constrained)
+    pool = list(order)
+    for i in constrained:
+        # Кілька випадкових спроб, далі — збільшувальний шлях
+        for _ in range(8):
+            if not pool:
+                break
+            j = rng.randrange(len(pool))
+            u = pool[j]
+            if not _conflict(unseeded[u], fixed[i], avoid):
+                owner[i], placed[u] = u, i
+                pool[j] = pool[-1]
+                pool.pop()
+                break
+    for i in constrained:
+        if owner[i] >= 0:
+            continue
+        if not _augment(i, owner, placed, unseeded, fixed, avoid, order):
+            raise ValueError(_infeasible(avoid))
+    rest = [u for u in order if placed[u] < 0]
+    rng.shuffle(open_slots)
+    for i, u in zip(open_slots, rest):
+        owner[i], placed[u] = u, i
+
+    def ok(i: int, u: int, moved: dict[int, int]) -> bool:
+        """Чи допустимий учасник u на позиції i, якщо moved (позиція → учасник) уже застосовано."""
+        p = partner[i]
+        other = unseeded[moved.get(p, owner[p])] if p >= 0 else fixed[i]
+        return not _conflict(unseeded[u], other, avoid)
+
+    # 2. Ремонт пар несіяний — несіяний
+    bad = [i for i in range(k) if partner[i] > i and not ok(i, owner[i], {})]
+    for i in bad:
+        if ok(i, owner[i], {}):
+            continue
+        candidates = list(range(k))
+        rng.shuffle(candidates)
+        for j in candidates:
+            if j in (i, partner[i]):
+                continue
+            moved = {i: owner[j], j: owner[i]}
+            if ok(i, owner[j], moved) and ok(j, owner[i], moved):
+                owner[i], owner[j] = owner[j], owner[i]
+                break
+        else:
+            raise ValueError(_infeasible(avoid))
+
+    # 3. Випадкове блукання обмінами
+    steps = 20 * k if mixing_steps is None else mixing_steps
+    if k >= 2:
+        for _ in range(steps):
+            i, j = rng.randrange(k), rng.randrange(k)
+            if i == j:
+                continue
+            moved = {i: owner[j], j: owner[i]}
+            if ok(i, owner[j], moved) and ok(j, owner[i], moved):
+                owner[i], owner[j] = owner[j], owner[i]
+
+    for i, pos in enumerate(positions):
+        slots[pos] = unseeded[owner[i]]
+
+
+def _augment(
+    start: int,
+    owner: list[int],
+    placed: list[int],
+    unseeded: list[Participant],
+    fixed: list[Optional[Participant]],
+    avoid: Sequence[str],
+    order: list[int],
+) -> bool:
+    """Збільшувальний шлях (Кун) від вільної позиції start серед позицій навпроти сіяних."""
+    visited: set[int] = set()
+    # Ітеративний DFS: стек (позиція, наступний індекс у order)
+    stack: list[list[int]] = [[start, 0]]
+    path: list[tuple[int, int]] = []  # (позиція, учасник)
+    while stack:
+        frame = stack[-1]
+        i, idx = frame
+        advanced = False
+        while idx < len(order):
+            u = order[idx]
+            idx += 1
+            if u in visited or _conflict(unseeded[u], fixed[i], avoid):
+                continue
+            visited.add(u)
+            frame[1] = idx
+            path.append((i, u))
+            if placed[u] < 0 or fixed[placed[u]] is None:
+                # Вільний учасник (або на позиції без обмеження — її звільняємо)
+                if placed[u] >= 0:
+                    owner[placed[u]] = -1
+                for slot, user in path:
+                    owner[slot], placed[user] = user, slot
+                return True
+            stack.append([placed[u], 0])
+            advanced = True
+            break
+        if not advanced:
+            stack.pop()
+            if path:
+                path.pop()
+    return False
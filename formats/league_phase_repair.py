@@ -0,0 +1,260 @@
+"""
+Локальний ремонт розкладу етапу ліги після заміни або зняття команди.
+
+Замість повного перезапуску жеребкування (новий seed змінює всі пари й тури):
+  - Заміна: нова команда займає місце старої в усіх її матчах. Якщо при цьому
+    порушуються Country Lock / Max per country — конфліктний матч (n, x) обмінюється
+    з іншим матчем (u, v) на (n, v) і (u, x), де u з кошика n, а v з кошика x.
+    Кошикові квоти, 4H/4A та «без повторів» зберігаються.
+  - Тури: два обміняні ребра лежать у турах r1 і r2; ребра цих турів утворюють
+    чергувальні цикли, і перефарбовуються лише цикли, через які проходять нові ребра.
+  - Зняття: матчі команди вилучаються, решта розкладу не змінюється.
+"""
+from __future__ import annotations
+
+import dataclasses
+import random
+from dataclasses import dataclass, field
+from typing import Optional
+
+from models import Participant, Match, DrawResult
+from draw_utils import make_rng
+
+
+@dataclass
+class RepairReport:
+    """Підсумок ремонту: скільки матчів змінили пару, господаря чи тур."""
+    moved_fixtures: int = 0
+    removed_fixtures: int = 0
+    changed_match_ids: list[str] = field(default_factory=list)
+
+
+def _country_violations(
+    team: int,
+    opponents: set[int],
+    countries: list[Optional[str]],
+    country_lock: bool,
+    max_per_country: int,
+) -> int:
+    """Кількість порушень Country Lock / Max per country для команди."""
+    own = countries[team]
+    counts: dict[str, int] = {}
+    violations = 0
+    for o in opponents:
+        c = countries[o]
+        if not c:
+            continue
+        if country_lock and own and c == own:
+            violations += 1
+        counts[c] = counts.get(c, 0) + 1
+        if max_per_country > 0 and counts[c] > max_per_country:
+            violations += 1
+    return violations
+
+
+def _recolor_two_rounds(
+    fixtures: list[list],
+    touched: list[int],
+    r1: int,
+    r2: int,
+) -> Optional[dict[int, int]]:
+    """
+    Перефарбувати чергувальні цикли турів r1/r2, що містять ребра touched.
+    Повертає {індекс матчу: новий тур} або None, якщо цикл непарний.
+    """
+    incident: dict[int, list[int]] = {}
+    for idx, f in enumerate(fixtures):
+        if f[2] in (r1, r2) or idx in touched:
+            incident.setdefault(f[0], []).append(idx)
+            incident.setdefault(f[1], []).append(idx)
+    if any(len(edges) != 2 for edges in incident.values()):
+        return None
+
+    new_round: dict[int, int] = {}
+    for start in touched:
+        if start in new_round:
+            continue
+        cycle = [start]
+        vertex = fixtures[start][1]
+        prev = start
+        while True:
+            a, b = incident[vertex]
+            nxt = b if a == prev else a
+            if nxt == start:
+                break
+            cycle.append(nxt)
+            f = fixtures[nxt]
+            vertex = f[1] if f[0] == vertex else f[0]
+            prev = nxt
+        if len(cycle) % 2 == 1:
+            return None
+        # Дві можливі фази; беремо ту, що лишає більше матчів у своєму турі
+        keep_a = sum(1 for i, e in enumerate(cycle) if fixtures[e][2] == (r1 if i % 2 == 0 else r2))
+        keep_b = sum(1 for i, e in enumerate(cycle) if fixtures[e][2] == (r2 if i % 2 == 0 else r1))
+        first, second = (r1, r2) if keep_a >= keep_b else (r2, r1)
+        for i, e in enumerate(cycle):
+            new_round[e] = first if i % 2 == 0 else second
+    return new_round
+
+
+def repair_league_phase(
+    result: DrawResult,
+    participants: list[Participant],
+    withdrawn_id: str,
+    replacement: Optional[Participant] = None,
+    country_lock: bool = False,
+    max_per_country: int = 0,
+    shuffle_seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
+) -> tuple[DrawResult, RepairReport]:
+    """
+    Відремонтувати результат draw_uefa_league_phase після заміни/зняття команди.
+
+    participants: той самий список (і порядок), що передавався в draw_uefa_league_phase —
+    з нього визначаються кошики (по турів+1 команд).
+    replacement: нова команда; None — команда знімається, її матчі вилучаються.
+    Вхідний result не змінюється. Повертає (новий результат, звіт).
+    rng: власний генератор; має пріоритет над shuffle_seed.
+    """
+    index_of = {p.id: i for i, p in enumerate(participants)}
+    if withdrawn_id not in index_of:
+        raise ValueError(f"Учасника {withdrawn_id} немає в жеребкуванні")
+    t = index_of[withdrawn_id]
+    teams_per_pot = len(result.rounds) + 1
+
+    # fixture: [господар, гість, тур, вихідний Match]
+    fixtures: list[list] = []
+    for r, round_matches in enumerate(result.rounds):
+        for m in round_matches:
+            fixtures.append([index_of[m.participant_a.id], index_of[m.participant_b.id], r, m])
+    original = [(f[0], f[1], f[2]) for f in fixtures]
+
+    teams = list(participants)
+    report = RepairReport()
+    if replacement is None:
+        removed = [f for f in fixtures if t in (f[0], f[1])]
+        fixtures = [f for f in fixtures if t not in (f[0], f[1])]
+        original = [(f[0], f[1], f[2]) for f in fixtures]
+        report.removed_fixtures = len(removed)
+    else:
+        teams[t] = replacement
+
+    countries = [p.country for p in teams]
+    opponents: list[set[int]] = [set() for _ in teams]
+    for h, a, _, _ in fixtures:
+        opponents[h].add(a)
+        opponents[a].add(h)
+    rng = make_rng(shuffle_seed, rng)
+
+    def pot(i: int) -> int:
+        return i // teams_per_pot
+
+    def violations(i: int) -> int:
+        return _country_violations(i, opponents[i], countries, country_lock, max_per_country)
+
+    def clashes_with_new(i: int) -> bool:
+        """Чи порушує країна нової команди обмеження суперника i (Country Lock чи ліміт країни)."""
+        own = countries[t]
+        if not own:
+            return False
+        if country_lock and countries[i] == own:
+            return True
+        return max_per_country > 0 and sum(countries[o] == own for o in opponents[i]) > max_per_country
+
+    def violating_fixture() -> Optional[int]:
+        """
+        Матч нової команди, що порушує обмеження — її власні або будь-якого з її суперників
+        (країна нової команди могла перевищити ліміт у суперника).
+        """
+        own = countries[t]
+        seen: dict[str, int] = {}
+        for idx, f in enumerate(fixtures):
+            if t not in (f[0], f[1]):
+                continue
+            x = f[1] if f[0] == t else f[0]
+            c = countries[x]
+            if c:
+                seen[c] = seen.get(c, 0) + 1
+                if (country_lock and c == own) or (max_per_country > 0 and seen[c] > max_per_country):
+                    return idx
+            if clashes_with_new(x):
+                return idx
+        return None
+
+    def swap_out(fi: int) -> bool:
+        f = fixtures[fi]
+        x = f[1] if f[0] == t else f[0]
+        t_home = f[0] == t
+        candidates = list(range(len(fixtures)))
+        rng.shuffle(candidates)
+        candidates.sort(key=lambda j: fixtures[j][2] != f[2])  # спершу той самий тур
+        for j in candidates:
+            h, a, r2, _ = fixtures[j]
+            if j == fi or {h, a} & {t, x}:
+                continue
+            # (u, v): u — з кошика t і з тим самим статусом господаря, v — з кошика x
+            u, v = (h, a) if t_home else (a, h)
+            if pot(u) != pot(t) or pot(v) != pot(x):
+                continue
+            if v in opponents[t] or x in opponents[u]:
+                continue
+            before = [violations(i) for i in (t, x, u, v)]
+            for team, old, new in ((t, x, v), (x, t, u), (u, v, x), (v, u, t)):
+                opponents[team].discard(old)
+                opponents[team].add(new)
+            after = [violations(i) for i in (t, x, u, v)]
+            # Обмін має зменшити порушення чотирьох команд разом і не погіршити жодної
+            if sum(after) < sum(before) and all(na <= nb for na, nb in zip(after, before)):
+                saved = [list(fixtures[fi]), list(fixtures[j])]
+                fixtures[fi][:2] = [t, v] if t_home else [v, t]
+                fixtures[j][:2] = [u, x] if t_home else [x, u]
+                rounds_map = (
+                    {} if r2 == f[2] else _recolor_two_rounds(fixtures, [fi, j], f[2], r2)
+                )
+                if rounds_map is not None:
+                    for idx, r in rounds_map.items():
+                        fixtures[idx][2] = r
+                    return True
+                fixtures[fi][:], fixtures[j][:] = saved
+            for team, old, new in ((t, x, v), (x, t, u), (u, v, x), (v, u, t)):
+                opponents[team].discard(new)
+                opponents[team].add(old)
+        return False
+
+    if replacement is not None:
+        for _ in range(len(fixtures) + 1):
+            fi = violating_fixture()
+            if fi is None:
+                break
+            if not swap_out(fi):
+                break
+        if violating_fixture() is not None:
+            raise ValueError(
+                "Неможливо локально відремонтувати розклад під обмеження по країні. "
+                "Проведіть повне жеребкування з новим seed."
+            )
+
+    # Побудова результату: незмінені матчі зберігають match_id; ті, що змінили тур,
+    # отримують звільнені номери цього туру
+    n_rounds = len(result.rounds)
+    changed = {idx for idx, f in enumerate(fixtures) if (f[0], f[1], f[2]) != original[idx]}
+    free_ids: list[list[str]] = [[] for _ in range(n_rounds)]
+    for idx in changed:
+        if fixtures[idx][2] != original[idx][2]:
+            free_ids[original[idx][2]].append(fixtures[idx][3].match_id)
+    for ids in free_ids:
+        ids.sort(reverse=True)
+    rounds_out: list[list[Match]] = [[] for _ in range(n_rounds)]
+    for idx, (h, a, r, m) in enumerate(fixtures):
+        match_id = m.match_id
+        if idx in changed and r != original[idx][2]:
+            match_id = free_ids[r].pop() if free_ids[r] else f"L-R{r+1}-{len(result.rounds[r]) + idx + 1}"
+        new_m = dataclasses.replace(
+            m, match_id=match_id, participant_a=teams[h], participant_b=teams[a], round_index=r + 1
+        )
+        rounds_out[r].append(new_m)
+        if idx in changed:
+            report.changed_match_ids.append(match_id)
+    report.moved_fixtures = len(changed)
+    matches = [m for r in rounds_out for m in r]
+    return DrawResult(matches=matches, rounds=rounds_out, description=result.description), report
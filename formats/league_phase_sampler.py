@@ -0,0 +1,264 @@
+"""
+Рівномірний випадковий розклад етапу ліги через ланцюг Маркова з перемиканням ребер.
+
+_build_deterministic_draw дає лише циркулянтні розклади (команда i завжди грає з (i+d) % T),
+тож більшість допустимих графів суперників недосяжні. Тут детермінований розклад — лише старт;
+стан ланцюга — граф суперників разом із розподілом по турах. Два типи кроків:
+
+  - подвійне перемикання ребер одного туру:
+        (h1 → a1), (h2 → a2)  ⟶  (h1 → a2), (h2 → a1),
+    де pot(h1) = pot(h2), pot(a1) = pot(a2). Зберігаються квоти «k суперників з кожного
+    кошика», кількість матчів вдома/на виїзді кожної команди і допустимість туру.
+    Перевірка — O(1): чотири вершини, два пошуки в множині пар, лічильники країн;
+  - обмін Кемпе: тури c1/c2 на чергувальному циклі, що містить випадковий матч
+    (змінює лише розподіл по турах).
+
+Обидві пропозиції симетричні, тож стаціонарний розподіл рівномірний на повних розкладах
+(граф + тури), досяжних з початкового. Кожен стан — готовий розклад, повторне
+розфарбування ребер не потрібне.
+
+Якщо стартовий граф порушує обмеження по країні, ланцюг спершу приймає лише ті перемикання,
+що не збільшують кількість порушень; після досягнення нуля — лише допустимі.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Optional
+
+from models import Participant, Match, DrawResult
+from draw_utils import make_rng
+from .uefa_league_phase import (
+    _league_phase_layout,
+    _build_deterministic_draw,
+    _edge_color_rounds,
+)
+from .home_away import optimize_home_away
+
+
+@dataclass
+class MixingStats:
+    """Діагностика перемішування ланцюга."""
+    steps: int
+    accepted_swaps: int
+    accepted_kempe: int
+    acceptance_rate: float
+    edges_changed: int  # пар суперників, яких немає в стартовому графі
+    fraction_changed: float
+    # Частка змінених пар після кожних len(edges) кроків — виходить на плато при перемішуванні
+    history: list[float] = field(default_factory=list)
+
+
+def _team_violations(
+    counts: dict[str, int],
+    own: Optional[str],
+    country_lock: bool,
+    max_per_country: int,
+) -> int:
+    v = 0
+    for c, cnt in counts.items():
+        if country_lock and own and c == own:
+            v += cnt
+        if max_per_country > 0 and cnt > max_per_country:
+            v += cnt - max_per_country
+    return v
+
+
+def sample_league_phase(
+    participants: list[Participant],
+    rounds: int = 8,
+    shuffle_seed: Optional[int] = None,
+    steps: Optional[int] = None,
+    country_lock: bool = False,
+    max_per_country: int = 2,
+    balance_home_away: bool = False,
+    rng: Optional[random.Random] = None,
+) -> tuple[DrawResult, MixingStats]:
+    """
+    Жеребкування етапу ліги з рівномірно випадковим розкладом.
+
+    steps: кількість кроків ланцюга (за замовчуванням 40 × кількість матчів);
+    менше кроків — швидше, але ближче до стартового циркулянтного розкладу (див. history).
+    Решта параметрів — як у draw_uefa_league_phase. Повертає (результат, діагностика).
+    rng: власний генератор; має пріоритет над shuffle_seed.
+    """
+    n_teams = len(participants)
+    teams_per_pot, n_pots, k_per_pot = _league_phase_layout(n_teams, rounds)
+    own_rng = rng
+    rng = make_rng(shuffle_seed, rng)
+    matches_with_round, _ = _build_deterministic_draw(
+        participants, rng.randrange(2**32), n_teams, teams_per_pot, n_pots, rounds
+    )
+    edges: list[tuple[int, int]] = []
+    color: list[int] = []
+    for r, pair_list in enumerate(_edge_color_rounds(matches_with_round, n_teams, rounds)):
+        for h, a in pair_list:
+            edges.append((h, a))
+            color.append(r)
+    if steps is None:
+        steps = 40 * len(edges)
+
+    def key(u: int, v: int) -> int:
+        return u * n_teams + v if u < v else v * n_teams + u
+
+    pairs = {key(h, a) for h, a in edges}
+    start_pairs = set(pairs)
+    pot = [i // teams_per_pot for i in range(n_teams)]
+    at: list[list[int]] = [[-1] * rounds for _ in range(n_teams)]  # (команда, тур) → ребро
+    for e, (h, a) in enumerate(edges):
+        at[h][color[e]] = e
+        at[a][color[e]] = e
+
+    # Кошики ребер за (кошик господаря, кошик гостя, тур) з O(1) вставкою/видаленням
+    buckets: dict[tuple[int, int, int], list[int]] = {}
+    bucket_pos = [0] * len(edges)
+
+    def bucket_key(e: int) -> tuple[int, int, int]:
+        h, a = edges[e]
+        return pot[h], pot[a], color[e]
+
+    def bucket_add(e: int) -> None:
+        b = buckets.setdefault(bucket_key(e), [])
+        bucket_pos[e] = len(b)
+        b.append(e)
+
+    def bucket_remove(e: int) -> None:
+        b = buckets[bucket_key(e)]
+        last = b.pop()
+        if last != e:
+            b[bucket_pos[e]] = last
+            bucket_pos[last] = bucket_pos[e]
+
+    for e in range(len(edges)):
+        bucket_add(e)
+
+    countries = [p.country for p in participants]
+    use_countries = country_lock or max_per_country > 0
+    country_counts: list[dict[str, int]] = [dict() for _ in range(n_teams)]
+    if use_countries:
+        for h, a in edges:
+            if countries[a]:
+                country_counts[h][countries[a]] = country_counts[h].get(countries[a], 0) + 1
+            if countries[h]:
+                country_counts[a][countries[h]] = country_counts[a].get(countries[h], 0) + 1
+
+    def team_v(t: int) -> int:
+        return _team_violations(country_counts[t], countries[t], country_lock, max_per_country)
+
+    def move_country(t: int, old: int, new: int) -> None:
+        co, cn = countries[old], countries[new]
+        if co:
+            country_counts[t][co] -= 1
+            if not country_counts[t][co]:
+                del country_counts[t][co]
+        if cn:
+            country_counts[t][cn] = country_counts[t].get(cn, 0) + 1
+
+    def try_swap(i: int) -> bool:
+        h1, a1 = edges[i]
+        bucket = buckets[bucket_key(i)]
+        j = bucket[rng.randrange(len(bucket))]
+        h2, a2 = edges[j]
+        if h1 == h2 or a1 == a2 or h1 == a2 or h2 == a1:
+            return False
+        if key(h1, a2) in pairs or key(h2, a1) in pairs:
+            return False
+        if use_countries:
+            touched = {h1, a1, h2, a2}
+            before = sum(team_v(t) for t in touched)
+            move_country(h1, a1, a2)
+            move_country(a2, h2, h1)
+            move_country(h2, a2, a1)
+            move_country(a1, h1, h2)
+            after = sum(team_v(t) for t in touched)
+            if after > before:
+                move_country(h1, a2, a1)
+                move_country(a2, h1, h2)
+                move_country(h2, a1, a2)
+                move_country(a1, h2, h1)
+                return False
+        pairs.difference_update((key(h1, a1), key(h2, a2)))
+        pairs.update((key(h1, a2), key(h2, a1)))
+        edges[i], edges[j] = (h1, a2), (h2, a1)
+        c = color[i]
+        at[a2][c] = i
+        at[a1][c] = j
+        return True
+
+    def kempe(i: int) -> bool:
+        if rounds < 2:
+            return False
+        c1 = color[i]
+        c2 = rng.randrange(rounds - 1)
+        if c2 >= c1:
+            c2 += 1
+        cycle = [i]
+        start = edges[i][0]
+        x, c = edges[i][1], c2
+        while x != start:
+            e = at[x][c]
+            cycle.append(e)
+            h, a = edges[e]
+            x = a if h == x else h
+            c = c1 if c == c2 else c2
+        for e in cycle:
+            bucket_remove(e)
+        for e in cycle:
+            color[e] = c2 if color[e] == c1 else c1
+            h, a = edges[e]
+            at[h][color[e]] = e
+            at[a][color[e]] = e
+            bucket_add(e)
+        return True
+
+    accepted_swaps = 0
+    accepted_kempe = 0
+    history: list[float] = []
+    checkpoint = max(1, len(edges))
+    for step in range(1, steps + 1):
+        i = rng.randrange(len(edges))
+        if rng.random() < 0.5:
+            accepted_swaps += try_swap(i)
+        else:
+            accepted_kempe += kempe(i)
+        if step % checkpoint == 0:
+            history.append(len(pairs - start_pairs) / len(edges))
+
+    if use_countries and any(team_v(t) for t in range(n_teams)):
+        raise ValueError(
+            "Обмеження по країні не вдалося виконати за задану кількість кроків. "
+            "Збільште steps або послабте country_lock / max_per_country."
+        )
+    changed = len(pairs - start_pairs)
+    stats = MixingStats(
+        steps=steps,
+        accepted_swaps=accepted_swaps,
+        accepted_kempe=accepted_kempe,
+        acceptance_rate=(accepted_swaps + accepted_kempe) / steps if steps else 0.0,
+        edges_changed=changed,
+        fraction_changed=changed / len(edges) if edges else 0.0,
+        history=history,
+    )
+
+    result_rounds: list[list[Match]] = [[] for _ in range(rounds)]
+    for e in sorted(range(len(edges)), key=lambda e: (color[e], min(edges[e]))):
+        h, a = edges[e]
+        r = color[e]
+        m = Match(
+            match_id=f"L-R{r+1}-{len(result_rounds[r]) + 1}",
+            participant_a=participants[h],
+            participant_b=participants[a],
+            round_index=r + 1,
+        )
+        result_rounds[r].append(m)
+    desc = (
+        f"Етап ліги ЛЧ (League Phase, випадковий розклад): {n_teams} команд, {n_pots} кошиків по {teams_per_pot}, "
+        f"по {rounds} матчів на команду ({k_per_pot} з кожного кошика)."
+    )
+    result = DrawResult(
+        matches=[m for r in result_rounds for m in r], rounds=result_rounds, description=desc
+    )
+    if balance_home_away:
+        pot_of = {p.id: i // teams_per_pot for i, p in enumerate(participants)}
+        optimize_home_away(result, pot_of=pot_of, shuffle_seed=shuffle_seed, rng=own_rng)
+    return result, stats
@@ -0,0 +1,56 @@
+"""
+Ущільнення групового етапу в спільні ігрові дні.
+
+Без ущільнення тури груп ідуть один за одним (round_offset): 8 груп по 4 — 24 «тури».
+compact_matchdays переплітає їх: блок = тур однієї групи (команди в ньому не перетинаються),
+у день потрапляє не більше одного блоку кожної групи, порядок турів у групі зберігається,
+сума матчів дня — не більше max_matches.
+
+Блоки беруться за шаром (тур 1 усіх груп, тур 2 усіх груп, …) і додаються в поточний день,
+доки він не переповниться або група не повториться — один прохід, O(кількість блоків).
+Для груп однакового розміру це найкоротший розклад: max(турів у групі,
+⌈блоків / блоків у дні⌉) днів — шар ділиться на порції, жодна не містить двох блоків однієї групи.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from models import Match
+
+
+def compact_matchdays(
+    group_rounds: list[list[list[Match]]],
+    max_matches: Optional[int] = None,
+    first_round: int = 1,
+) -> list[list[Match]]:
+    """
+    Розкласти тури груп по ігрових днях. group_rounds[g][j] — матчі туру j групи g.
+    max_matches: ліміт матчів на день (None — без ліміту: день = тур усіх груп).
+    Повертає ігрові дні; round_index кожного матчу стає first_round + номер дня (з 0).
+    """
+    if max_matches is not None:
+        biggest = max((len(block) for rounds in group_rounds for block in rounds), default=0)
+        if max_matches < max(biggest, 1):
+            raise ValueError(
+                f"Ліміт {max_matches} матчів на ігровий день менший за тур однієї групи ({biggest} матчів)"
+            )
+    depth = max((len(rounds) for rounds in group_rounds), default=0)
+    matchdays: list[list[Match]] = []
+    current: list[Match] = []
+    used: set[int] = set()
+    for j in range(depth):
+        for g, rounds in enumerate(group_rounds):
+            if j >= len(rounds) or not rounds[j]:
+                continue
+            block = rounds[j]
+            if g in used or (max_matches is not None and len(current) + len(block) > max_matches):
+                matchdays.append(current)
+                current, used = [], set()
+            current.extend(block)
+            used.add(g)
+    if current:
+        matchdays.append(current)
+    for day, matches in enumerate(matchdays):
+        for m in matches:
+            m.round_index = first_round + day
+    return matchdays
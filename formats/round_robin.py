@@ -1,14 +1,28 @@
 """
 Колова система: кожен з кожним один чи більше разів (залежно від кількості кіл).
 """
+import random
+
 from models import Participant, Match, DrawResult
 from draw_utils import shuffle_participants, sort_by_seed
+from metrics import instrument, phase
+from .home_away import optimize_home_away
+from .travel import optimize_travel
 
 
-def _round_robin_pairs(participants: list[Participant], rounds: list[list[Match]], round_offset: int = 0, num_rounds: int = 1) -> list[Match]:
+def _round_robin_pairs(
+    participants: list[Participant],
+    rounds: list[list[Match]],
+    round_offset: int = 0,
+    num_rounds: int = 1,
+    alternate_home_away: bool = False,
+) -> list[Match]:
     """
     Класичний алгоритм кругів: фіксований один, решта обертаються.
     num_rounds: скільки кіл (повизму) провести. За замовчуванням 1 (одна колова система).
+    alternate_home_away: канонічна орієнтація з мінімумом брейків (n − 2 за коло при парному n):
+    фіксований вдома в парних турах, у парі (rest[i], rest[-i]) господар чергується за парністю i;
+    кожне наступне коло — дзеркальне попередньому.
     """
     n = len(participants)
     if n < 2:
@@ -16,7 +30,11 @@ def _round_robin_pairs(participants: list[Participant], rounds: list[list[Match]
     all_matches: list[Match] = []
     # Парна кількість: кожен грає кожен раунд. Непарна: додаємо "дубль" і він отримує bye.
     if n % 2 == 1:
-        participants = list(participants) + [None]  # type: ignore
+        # Для канонічної орієнтації «дубль» — фіксований: тоді брейків немає взагалі
+        if alternate_home_away:
+            participants = [None] + list(participants)  # type: ignore
+        else:
+            participants = list(participants) + [None]  # type: ignore
         n += 1
     fixed = participants[0]
     rest = list(participants[1:])
@@ -28,18 +46,24 @@ def _round_robin_pairs(participants: list[Participant], rounds: list[list[Match]
             # Глобальний номер раунду: якщо 2 кола, то R1, R2 для першої, R3, R4 для другої.
             global_round_index = round_offset + round_num * num_rounds_single + r + 1
             # Пара: fixed vs rest[0]; rest[1] vs rest[-1], rest[2] vs rest[-2], ...
+            mirror = alternate_home_away and round_num % 2 == 1
             opp = rest[0]
             if fixed is not None and opp is not None:
+                home, away = fixed, opp
+                if alternate_home_away and (r % 2 == 1) != mirror:
+                    home, away = away, home
                 m = Match(
                     match_id=f"R{global_round_index}-M1",
-                    participant_a=fixed,
-                    participant_b=opp,
+                    participant_a=home,
+                    participant_b=away,
                     round_index=global_round_index,
                 )
                 all_matches.append(m)
                 round_matches.append(m)
             for i in range(1, (n - 1) // 2 + 1):
                 a, b = rest[i], rest[n - 1 - i]
+                if alternate_home_away and (i % 2 == 1) != mirror:
+                    a, b = b, a
                 if a is not None and b is not None:
                     m = Match(
                         match_id=f"R{global_round_index}-M{i+1}",
@@ -55,27 +79,41 @@ def _round_robin_pairs(participants: list[Participant], rounds: list[list[Match]
     return all_matches
 
 
+@instrument("round_robin")
 def draw_round_robin(
     participants: list[Participant],
     shuffle_seed: int | None = None,
     seeded: bool = False,
     num_seeded: int | None = None,
     num_rounds: int = 1,
+    balance_home_away: bool = False,
+    minimize_travel: bool = False,
+    distances: dict[str, dict[str, float]] | None = None,
+    max_road_trip: int | None = None,
+    max_home_stand: int | None = None,
+    rng: random.Random | None = None,
 ) -> DrawResult:
     """
     Колова система: кожен з кожним num_rounds разів.
     num_rounds: скільки кіл (за замовчуванням 1 — одна колова, 2 — подвійна колова).
     num_seeded: кількість сіяних (в порядку спочатку).
+    balance_home_away: переорієнтувати матчі (participant_a — господар) для мінімуму серій вдома/на виїзді.
+    minimize_travel: переставити тури й господар/гість для мінімуму переїздів (optimize_travel) —
+    за Participant.location або матрицею distances; max_road_trip / max_home_stand — ліміти серій.
+    rng: власний генератор; має пріоритет над shuffle_seed.
     """
     if seeded:
         ordered = sort_by_seed(participants)
     else:
-        ordered = shuffle_participants(participants, shuffle_seed)
+        ordered = shuffle_participants(participants, shuffle_seed, rng=rng)
 
     num_rounds = max(1, int(num_rounds))  # Переконатися, що це позитивне ціле число
     rounds: list[list[Match]] = []
-    matches = _round_robin_pairs(ordered, rounds, round_offset=0, num_rounds=num_rounds)
-    
+    with phase("round_robin", "construction"):
+        matches = _round_robin_pairs(
+            ordered, rounds, round_offset=0, num_rounds=num_rounds, alternate_home_away=balance_home_away
+        )
+
     description = f"Колова система ({len(participants)} учасників)"
     if num_rounds == 1:
         description += ". Кожен з кожним один раз."
@@ -84,8 +122,23 @@ def draw_round_robin(
     else:
         description += f". Кожен з кожним {num_rounds} разів ({num_rounds}-кратна колова)."
     
-    return DrawResult(
+    result = DrawResult(
         matches=matches,
         rounds=rounds,
         description=description,
     )
+    if balance_home_away:
+        with phase("round_robin", "home_away"):
+            # Канонічна орієнтація вже мінімальна за брейками; пошук лише доводить її (±1 баланс)
+            optimize_home_away(result, shuffle_seed=shuffle_seed, rng=rng, keep_orientation=True)
+    if minimize_travel:
+        with phase("round_robin", "travel"):
+            optimize_travel(
+                result,
+                distances=distances,
+                max_road_trip=max_road_trip,
+                max_home_stand=max_home_stand,
+                shuffle_seed=shuffle_seed,
+                rng=rng,
+            )
+    return result
@@ -0,0 +1,328 @@
+"""
+Мінімізація переїздів у коловій системі (задача на кшталт Traveling Tournament Problem).
+
+Кожна команда починає вдома, на кожен матч їде на майданчик господаря і після
+останнього туру повертається додому; між двома виїздними матчами поспіль вона їде
+напряму від одного суперника до іншого. Мета — мінімальна сумарна відстань.
+
+Ходи локального пошуку (імітація відпалу):
+  - обмін двох турів місцями (змінює порядок турів для всіх команд);
+  - розворот пари зустрічей (подвійна колова): A–B вдома/в гостях міняються місцями,
+    баланс господар/гість кожної команди не змінюється.
+Вартість ходу рахується інкрементально: для відстані — лише ребра маршруту навколо
+змінених турів, для обмежень на серії — лише серії, що торкаються змінених турів.
+
+Обмеження: max_road_trip — найбільше виїздних матчів поспіль, max_home_stand — домашніх.
+Порушення штрафуються (дорожче за будь-який переїзд), тож пошук повертається до допустимих розкладів.
+"""
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from models import Participant, DrawResult
+from draw_utils import make_rng
+
+
+@dataclass
+class TravelReport:
+    """Сумарна відстань і порушення обмежень на серії до і після оптимізації."""
+    distance_before: float
+    distance_after: float
+    violations_before: int
+    violations_after: int
+    iterations: int
+    accepted: int
+
+
+def haversine_km(a: tuple[float, float], b: tuple[float, float]) -> float:
+    """Відстань по великому колу між (широта, довгота) в кілометрах."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _distance_matrix(
+    teams: list[Participant],
+    distances: Optional[dict[str, dict[str, float]]],
+) -> list[list[float]]:
+    n = len(teams)
+    if distances is not None:
+        try:
+            return [
+                [0.0 if i == j else float(distances[teams[i].id][teams[j].id]) for j in range(n)]
+                for i in range(n)
+            ]
+        except KeyError as e:
+            raise ValueError(f"Немає відстані для учасника {e.args[0]!r} у матриці відстаней") from None
+    missing = [p.name for p in teams if p.location is None]
+    if missing:
+        raise ValueError(f"Немає координат (location) для: {', '.join(missing[:5])}")
+    return [[haversine_km(teams[i].location, teams[j].location) for j in range(n)] for i in range(n)]
+
+
+def optimize_travel(
+    result: DrawResult,
+    distances: Optional[dict[str, dict[str, float]]] = None,
+    max_road_trip: Optional[int] = None,
+    max_home_stand: Optional[int] = None,
+    max_iterations: int = 20_000,
+    time_limit: Optional[float] = None,
+    shuffle_seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
+) -> TravelReport:
+    """
+    Переставити тури та господар/гість у result для мінімуму сумарних переїздів.
+    Змінює result на місці, але лише учасників наявних Match: participant_a — господар,
+    participant_b — гість. Об'єкти Match, їхні match_id і round_index та порядок result.rounds
+    не змінюються — обмін турів означає, що матчі туру отримують пари іншого туру.
+
+    distances: id → id → відстань; інакше — по великому колу з Participant.location.
+    max_road_trip / max_home_stand: найбільше виїздних / домашніх матчів поспіль (None — без обмеження).
+    Повторні зустрічі пари (подвійна колова) отримують протилежні орієнтації; якщо пара
+    зустрічається двічі, розворот пари — один із ходів пошуку.
+    max_iterations: кількість ходів (20 команд, подвійна колова — кілька секунд).
+    time_limit: додатковий ліміт у секундах; з ним результат залежить від швидкості машини,
+    тож при тому самому seed відтворюваність гарантується лише без time_limit.
+    rng: власний генератор; має пріоритет над shuffle_seed.
+    """
+    rng = make_rng(shuffle_seed, rng)
+    rounds = [list(r) for r in result.rounds if r]
+    index_of: dict[str, int] = {}
+    teams: list[Participant] = []
+    for round_matches in rounds:
+        for m in round_matches:
+            for p in (m.participant_a, m.participant_b):
+                if p is not None and p.id not in index_of:
+                    index_of[p.id] = len(teams)
+                    teams.append(p)
+    n, num_rounds = len(teams), len(rounds)
+    if n < 2 or num_rounds == 0:
+        return TravelReport(0.0, 0.0, 0, 0, 0, 0)
+    # Індекс n + t — «вдома, вільний тур»: та сама точка, що й t, але без матчу
+    dist = [row + row for row in _distance_matrix(teams, distances)]
+    dist += dist
+    # code[t][v]: 1 — t вдома, 0 — на виїзді, -1 — вільний тур
+    code = [[1 if v == t else -1 if v == n + t else 0 for v in range(2 * n)] for t in range(n)]
+
+    # path[t][r + 1] — де команда t грає тур r (індекс господаря або n + t); path[t][0] = path[t][-1] = t
+    # opp[r][t] — суперник у турі r або -1
+    path = [[t] + [n + t] * num_rounds + [t] for t in range(n)]
+    opp = [[-1] * n for _ in range(num_rounds)]
+    meetings: dict[tuple[int, int], list[int]] = {}
+    for r, round_matches in enumerate(rounds):
+        for m in round_matches:
+            if m.participant_a is None or m.participant_b is None:
+                continue
+            a, b = index_of[m.participant_a.id], index_of[m.participant_b.id]
+            opp[r][a], opp[r][b] = b, a
+            path[a][r + 1] = path[b][r + 1] = a
+            meetings.setdefault((min(a, b), max(a, b)), []).append(r)
+
+    def run_excess(t: int, positions: set[int]) -> int:
+        """Перевищення лімітів серіями, що торкаються positions (та сусідніх турів)."""
+        seq, ct = path[t], code[t]
+        excess = 0
+        covered = 0  # серії до цієї позиції вже пораховані
+        for p in sorted(positions):
+            lo, hi = max(p - 1, covered + 1, 1), min(p + 1, num_rounds)
+            if lo > hi:
+                continue
+            first = ct[seq[lo]]
+            while lo > covered + 1 and ct[seq[lo - 1]] == first:
+                lo -= 1
+            # Серії від lo до кінця серії, що містить hi
+            q = lo
+            while q <= hi:
+                s = ct[seq[q]]
+                end = q
+                while end < num_rounds and ct[seq[end + 1]] == s:
+                    end += 1
+                if s >= 0:
+                    limit = max_home_stand if s == 1 else max_road_trip
+                    if limit is not None and end - q + 1 > limit:
+                        excess += end - q + 1 - limit
+                covered = end
+                q = end + 1
+        return excess
+
+    def team_distance(t: int) -> float:
+        seq = path[t]
+        return sum(dist[seq[i]][seq[i + 1]] for i in range(num_rounds + 1))
+
+    def total_violations() -> int:
+        return sum(run_excess(t, set(range(1, num_rounds + 1))) for t in range(n))
+
+    constrained = max_road_trip is not None or max_home_stand is not None
+    penalty = 2.0 * max(max(row) for row in dist) + 1.0
+
+    def changes_cost(changes: dict[int, dict[int, int]]) -> float:
+        total = 0.0
+        for t, moved in changes.items():
+            seq = path[t]
+            total += sum(dist[seq[i]][seq[i + 1]] for i in {i for p in moved for i in (p - 1, p)})
+            if constrained:
+                total += penalty * run_excess(t, set(moved))
+        return total
+
+    def change_cost(changes: dict[int, dict[int, int]]) -> float:
+        """
+        Зміна вартості від присвоєння path[t][pos] = v для changes[t][pos] = v: рахуються лише
+        ребра маршруту та серії навколо змінених позицій.
+        """
+        before = changes_cost(changes)
+        saved = {t: {p: path[t][p] for p in moved} for t, moved in changes.items()}
+        apply(changes)
+        after = changes_cost(changes)
+        apply(saved)
+        return after - before
+
+    def swap_rounds_changes(r1: int, r2: int) -> dict[int, dict[int, int]]:
+        p1, p2 = r1 + 1, r2 + 1
+        return {
+            t: {p1: path[t][p2], p2: path[t][p1]}
+            for t in range(n)
+            if path[t][p1] != path[t][p2]
+        }
+
+    def apply_swap_rounds(r1: int, r2: int) -> None:
+        for t in range(n):
+            path[t][r1 + 1], path[t][r2 + 1] = path[t][r2 + 1], path[t][r1 + 1]
+        opp[r1], opp[r2] = opp[r2], opp[r1]
+
+    def meeting_rounds(a: int, b: int) -> list[int]:
+        return [r for r in range(num_rounds) if opp[r][a] == b]
+
+    def flip_pair_changes(a: int, b: int) -> dict[int, dict[int, int]]:
+        r1, r2 = meeting_rounds(a, b)
+        h1, h2 = path[a][r1 + 1], path[a][r2 + 1]
+        return {a: {r1 + 1: h2, r2 + 1: h1}, b: {r1 + 1: h2, r2 + 1: h1}}
+
+    def swap_teams_changes(i: int, j: int) -> dict[int, dict[int, int]]:
+        """Обмін розкладів команд i та j (перейменування): суперники й господар/гість переходять до іншої."""
+        changes: dict[int, dict[int, int]] = {}
+        for r in range(num_rounds):
+            p = r + 1
+            oi, oj = opp[r][i], opp[r][j]
+            if oi == j:
+                host = j if path[i][p] == i else i
+                changes.setdefault(i, {})[p] = host
+                changes.setdefault(j, {})[p] = host
+                continue
+            changes.setdefault(i, {})[p] = n + i if oj < 0 else i if path[j][p] == j else oj
+            changes.setdefault(j, {})[p] = n + j if oi < 0 else j if path[i][p] == i else oi
+            if oi >= 0:
+                changes.setdefault(oi, {})[p] = j if path[oi][p] == i else oi
+            if oj >= 0:
+                changes.setdefault(oj, {})[p] = i if path[oj][p] == j else oj
+        for t, moved in changes.items():
+            for p in [p for p, v in moved.items() if path[t][p] == v and t not in (i, j)]:
+                del moved[p]
+        return changes
+
+    def apply_swap_teams(i: int, j: int, changes: dict[int, dict[int, int]]) -> None:
+        apply(changes)
+        for row in opp:
+            oi, oj = row[i], row[j]
+            if oi == j:
+                continue
+            row[i], row[j] = oj, oi
+            if oi >= 0:
+                row[oi] = j
+            if oj >= 0:
+                row[oj] = i
+
+    def apply(changes: dict[int, dict[int, int]]) -> None:
+        for t, moved in changes.items():
+            for p, v in moved.items():
+                path[t][p] = v
+
+    distance_before = sum(team_distance(t) for t in range(n))
+    violations_before = total_violations() if constrained else 0
+    pairs = []
+    for (a, b), rs in meetings.items():
+        if len(rs) == 2:
+            # Друга зустріч — у гостях у першого суперника
+            host = path[a][rs[0] + 1]
+            guest = b if host == a else a
+            path[a][rs[1] + 1] = path[b][rs[1] + 1] = guest
+            pairs.append((a, b))
+    # Обмін команд зберігає розклад лише для повної колової (кожна пара зустрічається однаково)
+    complete = len(meetings) == n * (n - 1) // 2 and len({len(rs) for rs in meetings.values()}) == 1
+    # Тури міняються лише з турами того самого розміру (об'єкти Match лишаються на місцях)
+    by_size: dict[int, list[int]] = {}
+    for r, round_matches in enumerate(rounds):
+        by_size.setdefault(len(round_matches), []).append(r)
+    swappable = [rs for rs in by_size.values() if len(rs) >= 2]
+
+    kinds = (["flip"] if pairs else []) + (["swap"] if swappable else []) + (["teams"] if complete else [])
+    if not kinds:
+        return TravelReport(distance_before, distance_before, violations_before, violations_before, 0, 0)
+
+    def random_move() -> tuple[str, tuple[int, int], dict[int, dict[int, int]]]:
+        kind = kinds[rng.randrange(len(kinds))]
+        if kind == "flip":
+            a, b = pairs[rng.randrange(len(pairs))]
+            return kind, (a, b), flip_pair_changes(a, b)
+        if kind == "teams":
+            i, j = rng.sample(range(n), 2)
+            return kind, (i, j), swap_teams_changes(i, j)
+        r1, r2 = rng.sample(swappable[rng.randrange(len(swappable))], 2)
+        return kind, (r1, r2), swap_rounds_changes(r1, r2)
+
+    # Температура — за середньою зміною вартості випадкових ходів
+    samples = [abs(change_cost(random_move()[2])) for _ in range(50)]
+    start_temperature = max(1e-9, sum(samples) / len(samples))
+    temperature = start_temperature
+    started = time.monotonic()
+
+    current = sum(team_distance(t) for t in range(n)) + (penalty * total_violations() if constrained else 0)
+    best = current
+    best_state = ([list(seq) for seq in path], [list(row) for row in opp])
+    iterations = accepted = 0
+    while iterations < max_iterations:
+        if iterations % 256 == 0:
+            # Охолодження за часткою вичерпаного бюджету (час або кількість ходів)
+            progress = iterations / max_iterations
+            if time_limit is not None:
+                elapsed = time.monotonic() - started
+                if elapsed > time_limit:
+                    break
+                progress = max(progress, elapsed / time_limit if time_limit > 0 else 1.0)
+            temperature = start_temperature * 0.001 ** progress
+        iterations += 1
+        kind, args, changes = random_move()
+        delta = change_cost(changes)
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            if kind == "swap":
+                apply_swap_rounds(*args)
+            elif kind == "teams":
+                apply_swap_teams(*args, changes)
+            else:
+                apply(changes)
+            current += delta
+            accepted += 1
+            if current < best - 1e-9:
+                best = current
+                best_state = ([list(seq) for seq in path], [list(row) for row in opp])
+
+    # Об'єкти Match лишаються у своїх турах; змінюються лише учасники та господар
+    path[:], opp[:] = best_state
+    for r, round_matches in enumerate(rounds):
+        hosts = sorted(t for t in range(n) if opp[r][t] >= 0 and path[t][r + 1] == t)
+        for m, host in zip((m for m in round_matches if m.participant_a and m.participant_b), hosts):
+            m.participant_a, m.participant_b = teams[host], teams[opp[r][host]]
+
+    distance_after = sum(team_distance(t) for t in range(n))
+    violations_after = total_violations() if constrained else 0
+    return TravelReport(
+        distance_before=distance_before,
+        distance_after=distance_after,
+        violations_before=violations_before,
+        violations_after=violations_after,
+        iterations=iterations,
+        accepted=accepted,
+    )
@@ -17,13 +17,27 @@
 Побудова: детермінована за графом (цикли всередині кошиків і між кошиками),
 з перемішуванням порядку команд у кошиках для різних жеребкувань. Якщо увімкнено
 country_lock / max_per_country, використовується пошук з поверненням (backtracking).
+
+Шаблон: для заданих (n_teams, rounds) структура суперників і розподіл по турах однакові
+з точністю до перестановки команд усередині кошиків, тож граф і розфарбування ребер
+(жадібне / networkx) обчислюються й перевіряються один раз (_league_template, lru_cache).
+Кожне жеребкування — перестановка команд у кошиках і випадкова орієнтація господар/гість
+для кожного класу орієнтації (пари, що повторюються, мають один клас) — O(кількість матчів).
 """
 from __future__ import annotations
 
 import random
-from typing import Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Optional
 
 from models import Participant, Match, DrawResult
+from draw_events import DrawEvent, PotOpened, BallDrawn, SlotAssigned, OpponentsDrawn, DrawCompleted, run_events
+from draw_utils import make_rng
+from feasibility import check, league_phase_layout as _league_phase_layout
+from metrics import ROUND_ASSIGNMENT, instrument, phase
+from .home_away import optimize_home_away
+from .strength_balance import balance_slots, strength_of_schedule
 
 
 def _pot(team_index: int, teams_per_pot: int) -> int:
@@ -37,13 +51,14 @@ def _build_deterministic_draw(
     teams_per_pot: int,
     n_pots: int,
     matches_per_team: int,
+    rng: Optional[random.Random] = None,
 ) -> tuple[list[tuple[int, int, bool]], list[list[Optional[int]]]]:
     """
     Побудова розкладу без обмежень по країні.
     Масштабовано для будь-якого k_per_pot: по k_per_pot матчів з кожного кошика на команду.
     Повертає (list of (home_idx, away_idx, round_hint), assigned для перевірки).
     """
-    rng = random.Random(shuffle_seed)
+    rng = make_rng(shuffle_seed, rng)
     matches_with_round: list[tuple[int, int, bool]] = []
 
     def add(home: int, away: int):
@@ -137,22 +152,13 @@ def _greedy_assign_rounds(
     matches_per_team: int,
 ) -> list[list[tuple[int, int]]] | None:
     """Жадібне призначення: кожному ребру найменший тур r, де обидві команди ще вільні. Повертає None якщо не вмістилось."""
-    # #region agent log
-    import json
-    import os
-    _log_path = "/Users/serhiy.franchuk/Documents/working/universal-scheduler/.cursor/debug.log"
-    def _log(msg, data):
-        os.makedirs(os.path.dirname(_log_path), exist_ok=True)
-        open(_log_path, "a").write(json.dumps({"message": msg, "data": data, "sessionId": "debug-session", "timestamp": __import__("time").time() * 1000}) + "\n")
-    # #endregion
     rounds_tuples: list[list[tuple[int, int]]] = [[] for _ in range(matches_per_team)]
     used: list[set[int]] = [set() for _ in range(n_teams)]
-    for idx, (h, a) in enumerate(edges):
+    for h, a in edges:
         r = 0
         while r < matches_per_team and (r in used[h] or r in used[a]):
             r += 1
         if r >= matches_per_team:
-            _log("greedy_fail", {"hypothesisId": "H1", "edge_index": idx, "h": h, "a": a, "n_teams": n_teams, "matches_per_team": matches_per_team, "len_edges": len(edges)})
             return None
         rounds_tuples[r].append((h, a))
         used[h].add(r)
@@ -178,18 +184,8 @@ def _edge_color_rounds(
         )
 
     edges = [(h, a) for h, a, _ in matches_with_round]
-    # #region agent log
-    import json as _json
-    import os as _os
-    _log_path = "/Users/serhiy.franchuk/Documents/working/universal-scheduler/.cursor/debug.log"
-    def _dbg(msg, data):
-        _os.makedirs(_os.path.dirname(_log_path), exist_ok=True)
-        with open(_log_path, "a") as _f:
-            _f.write(_json.dumps({"message": msg, "data": {**data, "sessionId": "debug-session"}, "timestamp": __import__("time").time() * 1000}) + "\n")
     unique_pairs = set((min(h, a), max(h, a)) for h, a, _ in matches_with_round)
     use_multigraph = len(matches_with_round) > len(unique_pairs)
-    _dbg("edge_color_entry", {"hypothesisId": "H3", "n_teams": n_teams, "matches_per_team": matches_per_team, "len_edges": len(edges), "len_unique_pairs": len(unique_pairs), "use_multigraph": use_multigraph})
-    # #endregion
 
     # Різні порядки для жадібного призначення (часто дають рівно matches_per_team турів для 36/8, 30/5)
     by_min_vertex: list[tuple[int, int]] = []
@@ -197,7 +193,6 @@ def _edge_color_rounds(
         for (h, a) in edges:
             if min(h, a) == v:
                 by_min_vertex.append((h, a))
-    _dbg("order_lengths", {"hypothesisId": "H3", "len_by_min_vertex": len(by_min_vertex), "len_edges": len(edges)})
     by_max_degree: list[tuple[int, int]] = list(edges)
     deg = [0] * n_teams
     for (h, a) in edges:
@@ -208,9 +203,9 @@ def _edge_color_rounds(
     for order_name, ordered in (("by_min_vertex", by_min_vertex), ("by_max_degree", by_max_degree), ("edges", edges)):
         result = _greedy_assign_rounds(ordered, n_teams, matches_per_team)
         if result is not None:
-            _dbg("greedy_ok", {"hypothesisId": "H1", "used_order": order_name})
+            ROUND_ASSIGNMENT.inc(f"greedy:{order_name}")
             return result
-    _dbg("greedy_all_failed", {"hypothesisId": "H1", "fallback": "max_weight_matching"})
+    ROUND_ASSIGNMENT.inc("multigraph_matching" if use_multigraph else "matching")
 
     # Запасний варіант: 1-факторизація через max_weight_matching
 
@@ -241,20 +236,13 @@ def _edge_color_rounds(
                 if not H.has_edge(u, v):
                     H.add_edge(u, v)
             matching = nx.max_weight_matching(H, maxcardinality=True)
-            matching_size = len(matching)
             for (u, v) in matching:
                 key = next(iter(G[u][v]))
                 pair = G.edges[u, v, key].get("pair", (u, v))
                 rounds_tuples[r].append(pair)
                 G.remove_edge(u, v, key)
-            # #region agent log
-            _dbg("multigraph_round", {"hypothesisId": "H2", "round": r, "matching_size": matching_size, "edges_left_after": G.number_of_edges()})
-            # #endregion
 
     if G.number_of_edges() > 0:
-        # #region agent log
-        _dbg("raise_edges_left", {"hypothesisId": "H2", "edges_left": G.number_of_edges(), "matches_per_team": matches_per_team})
-        # #endregion
         raise RuntimeError(
             f"Неможливо розкласти всі матчі в {matches_per_team} турів. "
             f"Спробуйте збільшити кількість турів або обрати іншу кількість учасників."
@@ -262,14 +250,11 @@ def _edge_color_rounds(
     return rounds_tuples
 
 
-def _matches_to_rounds_and_assigned(
-    matches_with_round: list[tuple[int, int, bool]],
+def _rounds_to_matches(
+    rounds_tuples: list[list[tuple[int, int]]],
     participants: list[Participant],
-    n_teams: int,
-    matches_per_team: int,
 ) -> tuple[list[list[Match]], list[Match]]:
-    """Побудувати раунди та плоский список матчів."""
-    rounds_tuples = _edge_color_rounds(matches_with_round, n_teams, matches_per_team)
+    """Матчі L-R{тур}-{i} з пар (господар, гість) по турах."""
     result_rounds: list[list[Match]] = []
     all_matches: list[Match] = []
     for r, pair_list in enumerate(rounds_tuples):
@@ -329,65 +314,191 @@ def _apply_country_constraints(
     return matches_with_round
 
 
-def draw_uefa_league_phase(
+class _CanonicalOrientation(random.Random):
+    """Замість rng у _build_deterministic_draw: завжди add(a, b); лічить кидки (класи орієнтації)."""
+
+    def __init__(self) -> None:
+        super().__init__(0)
+        self.calls = 0
+
+    def random(self) -> float:
+        self.calls += 1
+        return 0.0
+
+
+@dataclass(frozen=True)
+class _LeagueTemplate:
+    """Розфарбований розклад у позиціях (слот = індекс команди в порядку кошиків)."""
+    rounds: tuple[tuple[tuple[int, int, int], ...], ...]  # тур → (слот a, слот b, клас орієнтації)
+    n_classes: int
+
+
+@lru_cache(maxsize=32)
+def _league_template(n_teams: int, rounds: int) -> _LeagueTemplate:
+    """
+    Шаблон для (n_teams, rounds): ребра _build_deterministic_draw у канонічній орієнтації,
+    розподіл по турах _edge_color_rounds і перевірка (кожен тур — досконале паросполучення,
+    у кожної команди rounds матчів). Клас орієнтації — номер кидка монети при побудові:
+    дублікати ребер непарної схеми мають той самий клас, тож орієнтуються однаково.
+    """
+    teams_per_pot, n_pots, _ = _league_phase_layout(n_teams, rounds)
+    canonical = _CanonicalOrientation()
+    matches_with_round, _ = _build_deterministic_draw(
+        [], None, n_teams, teams_per_pot, n_pots, rounds, rng=canonical
+    )
+    classes: dict[tuple[int, int], list[int]] = {}
+    for i, (a, b, _) in enumerate(matches_with_round):
+        classes.setdefault((a, b), []).append(i % canonical.calls)
+    coloured = _edge_color_rounds(matches_with_round, n_teams, rounds)
+
+    template_rounds = []
+    games = [0] * n_teams
+    for r, pair_list in enumerate(coloured):
+        seen: set[int] = set()
+        round_edges = []
+        for a, b in pair_list:
+            if a in seen or b in seen:
+                raise RuntimeError(f"Шаблон етапу ліги: команда грає двічі в турі {r + 1}")
+            seen.update((a, b))
+            games[a] += 1
+            games[b] += 1
+            round_edges.append((a, b, classes[(a, b)].pop(0)))
+        if len(seen) != n_teams:
+            raise RuntimeError(f"Шаблон етапу ліги: тур {r + 1} неповний ({len(seen)} з {n_teams} команд)")
+        template_rounds.append(tuple(round_edges))
+    if any(g != rounds for g in games):
+        raise RuntimeError("Шаблон етапу ліги: не всі команди мають однакову кількість матчів")
+    return _LeagueTemplate(rounds=tuple(template_rounds), n_classes=canonical.calls)
+
+
+def _relabel_template(
+    template: _LeagueTemplate,
+    n_teams: int,
+    teams_per_pot: int,
+    rng: random.Random,
+) -> tuple[list[int], int]:
+    """Перестановка команд у кожному кошику (позиція → команда) і біти орієнтації класів."""
+    slot_team = list(range(n_teams))
+    for base in range(0, n_teams, teams_per_pot):
+        pot = slot_team[base:base + teams_per_pot]
+        rng.shuffle(pot)
+        slot_team[base:base + teams_per_pot] = pot
+    bits = rng.getrandbits(template.n_classes) if template.n_classes else 0
+    return slot_team, bits
+
+
+def _oriented_rounds(template: _LeagueTemplate, slot_team: list[int], bits: int) -> list[list[tuple[int, int]]]:
+    """Тур → [(господар, гість)] для перестановки slot_team і орієнтації bits."""
+    return [
+        [
+            (slot_team[a], slot_team[b]) if (bits >> c) & 1 else (slot_team[b], slot_team[a])
+            for a, b, c in round_edges
+        ]
+        for round_edges in template.rounds
+    ]
+
+
+def _template_neighbours(template: _LeagueTemplate, n_teams: int) -> list[list[int]]:
+    """Позиція → позиції суперників у шаблоні (з повторами)."""
+    neighbours: list[list[int]] = [[] for _ in range(n_teams)]
+    for round_edges in template.rounds:
+        for a, b, _ in round_edges:
+            neighbours[a].append(b)
+            neighbours[b].append(a)
+    return neighbours
+
+
+def iter_uefa_league_phase(
     participants: list[Participant],
     rounds: int = 8,
     shuffle_seed: Optional[int] = None,
     country_lock: bool = False,
     max_per_country: int = 2,
-) -> DrawResult:
+    balance_home_away: bool = False,
+    rng: Optional[random.Random] = None,
+    balance_strength: bool = False,
+) -> Iterator[DrawEvent]:
     """
-    Жеребкування етапу ліги (League Phase) за сучасною формулою ЛЧ.
-
-    rounds: кількість турів (матчів на команду). Розмір кошика = rounds+1.
-    N = (rounds+1) * num_pots; rounds має ділитися на num_pots (матчів з кожного кошика).
+    Жеребкування етапу ліги подіями (draw_events): для кожного кошика PotOpened, кулі
+    (BallDrawn + SlotAssigned — позиція в шаблоні розкладу), потім OpponentsDrawn з матчами
+    кожної команди й DrawCompleted з тим самим DrawResult, що й draw_uefa_league_phase.
     """
     n_teams = len(participants)
-    if n_teams % 2 == 1:
-        raise ValueError(
-            f"League Phase: кількість учасників має бути парною (кожен тур по n/2 матчів). Отримано {n_teams}."
-        )
-    teams_per_pot = rounds + 1
-    n_pots = n_teams // teams_per_pot
+    # Правила й перевірка шаблону — feasibility.py: ValueError, якщо матчі не розкладаються по турах
+    config = check("league_phase", n_teams, rounds=rounds)
+    teams_per_pot, n_pots, k_per_pot = rounds + 1, config.pots, config.per_pot
     matches_per_team = rounds
 
-    if n_teams % teams_per_pot != 0:
-        raise ValueError(
-            f"League Phase: кількість учасників має ділитися на (турів+1) = {teams_per_pot}. "
-            f"Отримано {n_teams} учасників."
-        )
-    k_per_pot_val = rounds // n_pots
-    if (teams_per_pot * k_per_pot_val) % 2 == 1:
-        # Кількість матчів всередині кошика = (команд × матчів на команду) / 2. Щоб було цілим, добуток має бути парним.
-        raise ValueError(
-            f"League Phase: комбінація {n_teams} учасників і {rounds} турів неможлива: "
-            f"у кошику по {teams_per_pot} команд кожна грає {k_per_pot_val} матчів всередині кошика — "
-            f"разом це {teams_per_pot * k_per_pot_val} «напівматчів», тобто {teams_per_pot * k_per_pot_val / 2} матчів (неціле). "
-            f"Потрібно, щоб (команд у кошику)×(матчів з кошика) було парним: оберіть кількість турів, кратну {2 * n_pots} "
-            f"(напр. {2 * n_pots} або {4 * n_pots}), або іншу кількість учасників (наприклад 18, 36)."
-        )
-    if rounds % n_pots != 0:
-        raise ValueError(
-            f"League Phase: кількість турів ({rounds}) має ділитися на кількість кошиків ({n_pots})."
-        )
-    k_per_pot = rounds // n_pots
-    if k_per_pot == 1 and teams_per_pot % 2 == 1:
-        raise ValueError(
-            "League Phase: при одному матчі з кожного кошика розмір кошика (турів+1) має бути парним. "
-            f"Зараз турів={rounds}, кошик={teams_per_pot}."
+    with phase("league_phase", "round_assignment"):
+        template = _league_template(n_teams, matches_per_team)
+    rng = make_rng(shuffle_seed, rng)
+    with phase("league_phase", "construction"):
+        slot_team, bits = _relabel_template(template, n_teams, teams_per_pot, rng)
+    if balance_strength:
+        with phase("league_phase", "strength"):
+            balance_slots(
+                _template_neighbours(template, n_teams), slot_team, participants, teams_per_pot,
+                country_lock=country_lock, max_per_country=max_per_country, rng=rng,
+            )
+    for base in range(0, n_teams, teams_per_pot):
+        pot = base // teams_per_pot
+        yield PotOpened(pot, tuple(participants[base:base + teams_per_pot]))
+        for slot in range(base, base + teams_per_pot):
+            yield BallDrawn(participants[slot_team[slot]], pot)
+            yield SlotAssigned(participants[slot_team[slot]], slot)
+    rounds_tuples = _oriented_rounds(template, slot_team, bits)
+    with phase("league_phase", "constraints"):
+        _apply_country_constraints(
+            participants,
+            [(h, a, True) for pair_list in rounds_tuples for h, a in pair_list],
+            country_lock, max_per_country, shuffle_seed, n_teams,
         )
-
-    matches_with_round, _ = _build_deterministic_draw(
-        participants, shuffle_seed, n_teams, teams_per_pot, n_pots, matches_per_team
-    )
-    matches_with_round = _apply_country_constraints(
-        participants, matches_with_round, country_lock, max_per_country, shuffle_seed, n_teams
-    )
-    rounds_list, matches = _matches_to_rounds_and_assigned(
-        matches_with_round, participants, n_teams, matches_per_team
-    )
+    rounds_list, matches = _rounds_to_matches(rounds_tuples, participants)
     desc = (
         f"Етап ліги ЛЧ (League Phase): {n_teams} команд, {n_pots} кошиків по {teams_per_pot}, "
         f"по {rounds} матчів на команду ({k_per_pot} з кожного кошика)."
     )
-    return DrawResult(matches=matches, rounds=rounds_list, description=desc)
+    result = DrawResult(matches=matches, rounds=rounds_list, description=desc)
+    if balance_strength:
+        result.description += "\n" + strength_of_schedule(result).summary()
+    if balance_home_away:
+        pot_of = {p.id: i // teams_per_pot for i, p in enumerate(participants)}
+        with phase("league_phase", "home_away"):
+            optimize_home_away(result, pot_of=pot_of, shuffle_seed=shuffle_seed, rng=rng)
+    # result.matches — у порядку турів (_rounds_to_matches)
+    team_matches: dict[str, list[Match]] = {p.id: [] for p in participants}
+    for m in result.matches:
+        team_matches[m.participant_a.id].append(m)
+        team_matches[m.participant_b.id].append(m)
+    for slot in range(n_teams):
+        team = participants[slot_team[slot]]
+        yield OpponentsDrawn(team, tuple(team_matches[team.id]))
+    yield DrawCompleted(result)
+
+
+@instrument("league_phase")
+def draw_uefa_league_phase(
+    participants: list[Participant],
+    rounds: int = 8,
+    shuffle_seed: Optional[int] = None,
+    country_lock: bool = False,
+    max_per_country: int = 2,
+    balance_home_away: bool = False,
+    rng: Optional[random.Random] = None,
+    balance_strength: bool = False,
+) -> DrawResult:
+    """
+    Жеребкування етапу ліги (League Phase) за сучасною формулою ЛЧ.
+
+    rounds: кількість турів (матчів на команду). Розмір кошика = rounds+1.
+    N = (rounds+1) * num_pots; rounds має ділитися на num_pots (матчів з кожного кошика).
+    balance_home_away: переорієнтувати матчі так, щоб з кожного кошика був один матч вдома
+    й один на виїзді, і мінімізувати серії вдома/на виїзді.
+    rng: власний генератор (наприклад, підпотік DrawStream); має пріоритет над shuffle_seed.
+    balance_strength: переставити команди в межах кошиків для рівної сили суперників
+    (середній рейтинг Participant.rating, strength_balance.py); у опис додається сила розкладу кожної команди.
+    Покроково (для церемонії) — iter_uefa_league_phase.
+    """
+    return run_events(iter_uefa_league_phase(
+        participants, rounds, shuffle_seed, country_lock, max_per_country, balance_home_away, rng, balance_strength,
+    ))
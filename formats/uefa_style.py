@@ -1,18 +1,31 @@
 """
 Формат на кшталт Ліги чемпіонів УЄФА: груповий етап (колова в групах) + плей-оф нокаут.
 """
+import random
+
 from models import Participant, Match, DrawResult, Group
 from draw_utils import distribute_into_groups, next_power_of_two
+from feasibility import check
+from metrics import instrument, phase
 from .round_robin import _round_robin_pairs
 from .knockout import _build_single_knockout_bracket
+from .group_draw import draw_groups_by_pots
+from .matchdays import compact_matchdays
 
 
+@instrument("uefa_style")
 def draw_uefa_style(
     participants: list[Participant],
     num_groups: int = 8,
     advance_per_group: int = 2,
     shuffle_seed: int | None = None,
     seeded: bool = True,
+    use_pots: bool = False,
+    country_protection: bool = True,
+    forbidden_pairs: list[tuple[str, str]] | None = None,
+    rng: random.Random | None = None,
+    compact: bool = False,
+    max_matches_per_matchday: int | None = None,
 ) -> DrawResult:
     """
     Стиль Ліги чемпіонів УЄФА:
@@ -22,16 +35,34 @@ def draw_uefa_style(
 
     num_groups: кількість груп (наприклад 8).
     advance_per_group: скільки з кожної групи виходить далі (наприклад 2).
+    use_pots: жеребкування по кошиках (draw_groups_by_pots) замість «змійки» за сіяними номерами;
+    тоді діють country_protection та forbidden_pairs (пари країн, що не можуть бути в одній групі).
+    rng: власний генератор для обох етапів (групи, потім сітка); має пріоритет над shuffle_seed.
+    compact: групи грають у спільні ігрові дні (8 груп по 4 — 3 дні, а не 24 тури);
+    max_matches_per_matchday: ліміт матчів на день (вмикає compact). Плей-оф — одразу після.
     """
     n = len(participants)
     needed = num_groups * 4  # типова група по 4 команди
-    if n < num_groups * 2:
-        raise ValueError(f"Потрібно мінімум {num_groups * 2} учасників для {num_groups} груп")
+    check("uefa_style", n, groups=num_groups, advancers=advance_per_group)
 
-    group_lists = distribute_into_groups(participants, num_groups, seeded=seeded, shuffle_seed=shuffle_seed)
+    with phase("uefa_style", "groups"):
+        if use_pots:
+            group_lists = draw_groups_by_pots(
+                participants,
+                num_groups,
+                shuffle_seed=shuffle_seed,
+                country_protection=country_protection,
+                forbidden_pairs=forbidden_pairs,
+                rng=rng,
+            )
+        else:
+            group_lists = distribute_into_groups(
+                participants, num_groups, seeded=seeded, shuffle_seed=shuffle_seed, rng=rng
+            )
     groups: list[Group] = []
     all_matches: list[Match] = []
     all_rounds: list[list[Match]] = []
+    group_rounds: list[list[list[Match]]] = []
     round_offset = 0
 
     for gi, g_participants in enumerate(group_lists):
@@ -47,6 +78,10 @@ def draw_uefa_style(
         groups.append(g)
         all_matches.extend(g_matches)
         all_rounds.extend(g_rounds)
+        group_rounds.append(g_rounds)
+    if compact or max_matches_per_matchday is not None:
+        all_rounds = compact_matchdays(group_rounds, max_matches_per_matchday)
+        round_offset = len(all_rounds)
 
     # Плей-оф: advance_per_group * num_groups = кількість команд
     playoff_count = advance_per_group * num_groups
@@ -56,11 +91,14 @@ def draw_uefa_style(
         Participant(id=f"PO-{i}", name=f"1-ше/2-ге місце групи (жереб)")
         for i in range(playoff_count)
     ]
-    knockout_matches, knockout_rounds = _build_single_knockout_bracket(
-        placeholders, shuffle_seed=shuffle_seed, seeded=False
-    )
+    with phase("uefa_style", "bracket"):
+        knockout_matches, knockout_rounds = _build_single_knockout_bracket(
+            placeholders, shuffle_seed=shuffle_seed, num_seeded=None, rng=rng
+        )
     for m in knockout_matches:
         m.match_id = "PO-" + m.match_id
+        if m.winner_advances_to:
+            m.winner_advances_to = "PO-" + m.winner_advances_to
         m.round_index += round_offset
     all_matches.extend(knockout_matches)
     all_rounds.extend(knockout_rounds)
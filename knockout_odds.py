@@ -0,0 +1,231 @@
+"""
+Точні ймовірності пар жеребкування нокауту з кошиками та заборонами (напр. 1/8 фіналу ЛЧ:
+переможці груп проти других місць, без пар з однієї групи чи країни).
+
+Послідовна процедура (sequential, як у УЄФА): з першого кошика (drawn_first, другі місця)
+тягнеться випадкова куля; суперник — рівноймовірно з тих у другому кошику, з ким пара
+дозволена і після кого решту жеребкування ще можна завершити. Через цю перевірку
+ймовірності відрізняються від «рівномірно серед усіх допустимих сіток» (uniform).
+
+Обчислення: стан — пара бітових масок (хто лишився в першому кошику, хто в другому).
+count(стан) — кількість досконалих паросполучень решти (мемоізований DP: найменший
+учасник першого кошика × кожен дозволений суперник). Ймовірності станів поширюються
+вперед рівень за рівнем; кожен стан обробляється один раз. Для 8 × 8 (1/8 фіналу) —
+12 870 станів, частки секунди.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Iterable, Optional, Union
+
+from models import Participant, Match, DrawResult
+from draw_utils import make_rng
+
+PROCEDURES = ("sequential", "uniform")
+
+Number = Union[float, Fraction]
+
+
+@dataclass
+class PairingOdds:
+    """Ймовірності пар: probabilities[i][j] — drawn_first[i] проти opponents[j]."""
+    drawn_first: list[Participant]
+    opponents: list[Participant]
+    probabilities: list[list[Number]] = field(default_factory=list)
+    matchings: int = 0  # кількість допустимих сіток (досконалих паросполучень)
+    procedure: str = "sequential"
+
+    def probability(self, first_id: str, opponent_id: str) -> Number:
+        i = next(k for k, p in enumerate(self.drawn_first) if p.id == first_id)
+        j = next(k for k, p in enumerate(self.opponents) if p.id == opponent_id)
+        return self.probabilities[i][j]
+
+    def summary(self, width: int = 8) -> str:
+        lines = ["".ljust(18) + "".join(p.name[:width - 1].rjust(width) for p in self.opponents)]
+        for p, row in zip(self.drawn_first, self.probabilities):
+            lines.append(
+                p.name[:17].ljust(18)
+                + "".join((f"{100 * float(x):.1f}" if x else "—").rjust(width) for x in row)
+            )
+        lines.append(f"Допустимих сіток: {self.matchings}")
+        return "\n".join(lines)
+
+
+def _allowed_masks(
+    drawn_first: list[Participant],
+    opponents: list[Participant],
+    avoid_same: tuple[str, ...],
+    group_of: Optional[dict[str, str]],
+    forbidden_pairs: Optional[Iterable[tuple[str, str]]],
+) -> list[int]:
+    """Для кожного з drawn_first — бітова маска дозволених суперників."""
+    forbidden = {frozenset(pair) for pair in forbidden_pairs or ()}
+    masks = []
+    for a in drawn_first:
+        mask = 0
+        for j, b in enumerate(opponents):
+            if group_of is not None and a.id in group_of and group_of.get(a.id) == group_of.get(b.id):
+                continue
+            if any(getattr(a, attr, None) is not None and getattr(a, attr, None) == getattr(b, attr, None)
+                   for attr in avoid_same):
+                continue
+            if frozenset((a.id, b.id)) in forbidden:
+                continue
+            mask |= 1 << j
+        masks.append(mask)
+    return masks
+
+
+class _MatchingCounter:
+    """count(first_mask, opp_mask) — кількість досконалих паросполучень решти (мемоізовано)."""
+
+    def __init__(self, allowed: list[int]):
+        self.allowed = allowed
+        self.shift = len(allowed)
+        self.memo: dict[int, int] = {}
+
+    def __call__(self, first: int, opp: int) -> int:
+        if first == 0:
+            return 1
+        key = (first << self.shift) | opp
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+        low = first & -first
+        i = low.bit_length() - 1
+        rest = first ^ low
+        total = 0
+        candidates = self.allowed[i] & opp
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            total += self(rest, opp ^ bit)
+        self.memo[key] = total
+        return total
+
+    def eligible(self, first: int, opp: int, i: int) -> list[int]:
+        """Біти суперників для drawn_first[i], після яких решту ще можна розіграти."""
+        rest = first ^ (1 << i)
+        out = []
+        candidates = self.allowed[i] & opp
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            if self(rest, opp ^ bit):
+                out.append(bit)
+        return out
+
+
+def _check_sizes(drawn_first: list[Participant], opponents: list[Participant]) -> None:
+    if len(drawn_first) != len(opponents):
+        raise ValueError(
+            f"Кошики мають бути однакового розміру: {len(drawn_first)} і {len(opponents)}"
+        )
+
+
+def knockout_pairing_odds(
+    drawn_first: list[Participant],
+    opponents: list[Participant],
+    avoid_same: tuple[str, ...] = ("country",),
+    group_of: Optional[dict[str, str]] = None,
+    forbidden_pairs: Optional[Iterable[tuple[str, str]]] = None,
+    procedure: str = "sequential",
+    exact: bool = False,
+) -> PairingOdds:
+    """
+    Ймовірність кожної пари жеребкування «кошик проти кошика».
+
+    drawn_first: кошик, з якого тягнуть першим (другі місця груп); opponents — другий кошик.
+    avoid_same: атрибути учасника, збіг яких забороняє пару (за замовчуванням країна).
+    group_of: id → група; учасники однієї групи не грають між собою.
+    forbidden_pairs: додаткові заборонені пари (id, id).
+    procedure: "sequential" — послідовне жеребкування з перевіркою завершуваності (УЄФА);
+    "uniform" — рівномірно серед усіх допустимих сіток.
+    exact: дроби (Fraction) замість float.
+    ValueError, якщо допустимої сітки немає.
+    """
+    if procedure not in PROCEDURES:
+        raise ValueError(f"Невідома процедура {procedure!r}. Доступні: {', '.join(PROCEDURES)}")
+    _check_sizes(drawn_first, opponents)
+    n = len(drawn_first)
+    allowed = _allowed_masks(drawn_first, opponents, avoid_same, group_of, forbidden_pairs)
+    count = _MatchingCounter(allowed)
+    full = (1 << n) - 1
+    total = count(full, full)
+    if total == 0:
+        raise ValueError("Жеребкування неможливе: заборони не дозволяють скласти жодної сітки")
+    one: Number = Fraction(1) if exact else 1.0
+    zero: Number = one * 0
+    probs: list[list[Number]] = [[zero] * n for _ in range(n)]
+
+    if procedure == "uniform":
+        for i in range(n):
+            rest = full ^ (1 << i)
+            for j in range(n):
+                if allowed[i] >> j & 1:
+                    probs[i][j] = one * count(rest, full ^ (1 << j)) / total
+        return PairingOdds(drawn_first, opponents, probs, total, procedure)
+
+    # Послідовна процедура: рівень = скільки куль ще в першому кошику
+    level: dict[tuple[int, int], Number] = {(full, full): one}
+    for remaining in range(n, 0, -1):
+        following: dict[tuple[int, int], Number] = {}
+        for (first, opp), p in level.items():
+            ball_share = p / remaining
+            bits = first
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                i = low.bit_length() - 1
+                eligible = count.eligible(first, opp, i)
+                share = ball_share / len(eligible)
+                for bit in eligible:
+                    probs[i][bit.bit_length() - 1] += share
+                    state = (first ^ low, opp ^ bit)
+                    following[state] = following.get(state, zero) + share
+        level = following
+    return PairingOdds(drawn_first, opponents, probs, total, procedure)
+
+
+def draw_restricted_knockout(
+    drawn_first: list[Participant],
+    opponents: list[Participant],
+    avoid_same: tuple[str, ...] = ("country",),
+    group_of: Optional[dict[str, str]] = None,
+    forbidden_pairs: Optional[Iterable[tuple[str, str]]] = None,
+    shuffle_seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
+) -> DrawResult:
+    """
+    Провести послідовне жеребкування тією ж процедурою, що й knockout_pairing_odds(sequential):
+    пари M1, M2, … у порядку витягування; господар першого матчу — з drawn_first.
+    rng: власний генератор; має пріоритет над shuffle_seed.
+    """
+    _check_sizes(drawn_first, opponents)
+    rng = make_rng(shuffle_seed, rng)
+    n = len(drawn_first)
+    count = _MatchingCounter(_allowed_masks(drawn_first, opponents, avoid_same, group_of, forbidden_pairs))
+    full = (1 << n) - 1
+    if count(full, full) == 0:
+        raise ValueError("Жеребкування неможливе: заборони не дозволяють скласти жодної сітки")
+    first, opp = full, full
+    matches: list[Match] = []
+    balls = list(range(n))
+    rng.shuffle(balls)
+    for k, i in enumerate(balls, 1):
+        bit = rng.choice(count.eligible(first, opp, i))
+        first ^= 1 << i
+        opp ^= bit
+        matches.append(Match(
+            match_id=f"M{k}",
+            participant_a=drawn_first[i],
+            participant_b=opponents[bit.bit_length() - 1],
+            round_index=1,
+        ))
+    return DrawResult(
+        matches=matches,
+        rounds=[matches],
+        description=f"Жеребкування пар з обмеженнями ({n} пар, послідовна процедура).",
+    )
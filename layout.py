@@ -0,0 +1,275 @@
+"""
+Розмітка сітки нокауту й групових таблиць для візуалізації та потоковий SVG.
+
+layout_bracket — координати матчів і з'єднувальні лінії для одиночної, подвійної та потрійної
+сітки за O(n): один прохід будує індекс «матч → матчі, переможці яких у нього потрапляють»
+(замість повторного пошуку за winner_advances_to для кожного матчу), далі колонки (тури)
+обробляються зліва направо — матч стоїть посередині між своїми попередниками або на наступному
+вільному місці колонки. Нижня сітка — під верхньою, фінал — праворуч від обох.
+У сітку потрапляють лише матчі, пов'язані посиланнями переможця чи переможеного (та нижня сітка
+й фінал), тож групові матчі UEFA-формату чи конвеєра етапів не стають окремими колонками.
+layout_groups — таблиці груп сіткою по columns у ряд; render_svg ставить їх над сіткою.
+
+iter_svg віддає SVG частинами (заголовок, кожен вузол, кожна лінія), тож сітку на 1 024
+учасники можна писати у файл чи відповідь сервера, не збираючи весь документ у пам'яті:
+    with open("bracket.svg", "w", encoding="utf-8") as f:
+        write_svg(layout_bracket(result), f)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, TextIO
+from xml.sax.saxutils import escape
+
+from models import Match, DrawResult, BracketType
+
+
+@dataclass
+class Node:
+    """Прямокутник: матч (два рядки) або група (заголовок і рядки учасників)."""
+    key: str
+    x: float
+    y: float
+    width: float
+    height: float
+    title: str
+    lines: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Connector:
+    """Ламана від правого краю source до лівого краю target: точки (x, y)."""
+    source: str
+    target: str
+    points: list[tuple[float, float]]
+
+
+@dataclass
+class Layout:
+    """Готова розмітка: вузли, лінії та розмір полотна."""
+    nodes: list[Node] = field(default_factory=list)
+    connectors: list[Connector] = field(default_factory=list)
+    width: float = 0.0
+    height: float = 0.0
+
+
+@dataclass
+class LayoutStyle:
+    """Розміри в пікселях."""
+    box_width: float = 180.0
+    box_height: float = 44.0
+    column_gap: float = 48.0
+    row_gap: float = 12.0
+    section_gap: float = 40.0  # між верхньою та нижньою сіткою
+    margin: float = 16.0
+    line_height: float = 18.0  # рядок групової таблиці
+
+
+def _label(match: Match, feeders: dict[str, list[Match]]) -> tuple[str, str]:
+    """Учасники матчу; порожні місця — «Переможець Mx» попередників по черзі (як у summary)."""
+    sources = iter(feeders.get(match.match_id, []))
+    out = []
+    for p in (match.participant_a, match.participant_b):
+        if p is not None:
+            out.append(p.name)
+        else:
+            source = next(sources, None)
+            out.append(f"Переможець {source.match_id}" if source else "?")
+    return out[0], out[1]
+
+
+def _bracket_matches(result: DrawResult) -> list[Match]:
+    """Матчі сітки: з посиланнями (звідки чи куди) або з нижньої сітки / фіналу."""
+    matches = result.matches or [m for r in result.rounds for m in r]
+    linked: set[str] = set()
+    for m in matches:
+        for target in (m.winner_advances_to, m.loser_advances_to):
+            if target:
+                linked.add(m.match_id)
+                linked.add(target)
+    return [m for m in matches if m.match_id in linked or m.bracket is not BracketType.UPPER]
+
+
+def layout_bracket(result: DrawResult, style: Optional[LayoutStyle] = None) -> Layout:
+    """
+    Розмітка сітки нокауту (верхня, нижня, фінал) за O(кількість матчів).
+    Колонка — тур у межах своєї частини сітки; матч без попередників стає на наступне вільне місце.
+    Матчі поза сіткою (групові, колові) пропускаються.
+    """
+    style = style or LayoutStyle()
+    feeders: dict[str, list[Match]] = {}
+    matches = _bracket_matches(result)
+    for m in matches:
+        if m.winner_advances_to:
+            feeders.setdefault(m.winner_advances_to, []).append(m)
+
+    sections: dict[BracketType, list[Match]] = {b: [] for b in BracketType}
+    for m in matches:
+        sections[m.bracket].append(m)
+
+    pitch_x = style.box_width + style.column_gap
+    pitch_y = style.box_height + style.row_gap
+    centre: dict[str, float] = {}
+    column_of: dict[str, int] = {}
+    layout = Layout()
+
+    def place(section: list[Match], top: float, first_column: int) -> tuple[float, int]:
+        """Розставити частину сітки; повертає (нижній край, кількість колонок)."""
+        if not section:
+            return top, 0
+        by_round: dict[int, list[Match]] = {}
+        for m in section:
+            by_round.setdefault(m.round_index, []).append(m)
+        base_round = min(by_round)
+        next_free: dict[int, float] = {}
+        bottom = top
+        columns = 0
+        # Тури зліва направо (турів — O(log n)); усередині туру — порядок результату
+        for m in (m for r in sorted(by_round) for m in by_round[r]):
+            col = first_column + m.round_index - base_round
+            columns = max(columns, col - first_column + 1)
+            free = next_free.get(col, top + style.box_height / 2)
+            sources = [centre[s.match_id] for s in feeders.get(m.match_id, []) if s.match_id in centre]
+            y = max(sum(sources) / len(sources), free) if sources else free
+            centre[m.match_id] = y
+            column_of[m.match_id] = col
+            next_free[col] = y + pitch_y
+            bottom = max(bottom, y + style.box_height / 2)
+        return bottom, columns
+
+    upper_bottom, upper_cols = place(sections[BracketType.UPPER], style.margin, 0)
+    lower_top = upper_bottom + style.section_gap if sections[BracketType.UPPER] else style.margin
+    lower_bottom, lower_cols = place(sections[BracketType.LOWER], lower_top, 0)
+    final_col = max(upper_cols, lower_cols)
+    finals = sections[BracketType.FINAL]
+    if finals:
+        # Фінал — праворуч від обох частин, посередині між їхніми останніми матчами
+        last = [m for m in matches if m.bracket is not BracketType.FINAL and m.winner_advances_to is None]
+        anchor = [centre[m.match_id] for m in last if m.match_id in centre]
+        y0 = sum(anchor) / len(anchor) if anchor else style.margin + style.box_height / 2
+        for k, m in enumerate(finals):
+            centre[m.match_id] = y0 + k * pitch_y
+            column_of[m.match_id] = final_col
+        lower_bottom = max(lower_bottom, y0 + (len(finals) - 1) * pitch_y + style.box_height / 2)
+
+    for m in matches:
+        if m.match_id not in centre:
+            continue
+        a, b = _label(m, feeders)
+        layout.nodes.append(Node(
+            key=m.match_id,
+            x=style.margin + column_of[m.match_id] * pitch_x,
+            y=centre[m.match_id] - style.box_height / 2,
+            width=style.box_width,
+            height=style.box_height,
+            title=m.match_id,
+            lines=[a, b],
+        ))
+        target = m.winner_advances_to
+        if target in centre:
+            x1 = style.margin + column_of[m.match_id] * pitch_x + style.box_width
+            x2 = style.margin + column_of[target] * pitch_x
+            xm = x1 + style.column_gap / 2 if x2 > x1 else x1
+            y1, y2 = centre[m.match_id], centre[target]
+            layout.connectors.append(Connector(m.match_id, target, [(x1, y1), (xm, y1), (xm, y2), (x2, y2)]))
+
+    columns = final_col + (1 if finals else 0)
+    layout.width = 2 * style.margin + max(columns, 1) * pitch_x - style.column_gap
+    layout.height = max(upper_bottom, lower_bottom) + style.margin
+    return layout
+
+
+def layout_groups(result: DrawResult, columns: int = 4, style: Optional[LayoutStyle] = None) -> Layout:
+    """Таблиці груп: по columns у ряд, висота ряду — за найбільшою групою ряду."""
+    style = style or LayoutStyle()
+    layout = Layout()
+    pitch_x = style.box_width + style.column_gap
+    y = style.margin
+    for row_start in range(0, len(result.groups), columns):
+        row = result.groups[row_start:row_start + columns]
+        row_height = 0.0
+        for k, group in enumerate(row):
+            height = style.line_height * (len(group.participants) + 1) + style.row_gap
+            row_height = max(row_height, height)
+            layout.nodes.append(Node(
+                key=group.group_id,
+                x=style.margin + k * pitch_x,
+                y=y,
+                width=style.box_width,
+                height=height,
+                title=f"Група {group.name}",
+                lines=[p.name for p in group.participants],
+            ))
+        y += row_height + style.section_gap
+    used = min(columns, len(result.groups)) or 1
+    layout.width = 2 * style.margin + used * pitch_x - style.column_gap
+    layout.height = y - style.section_gap + style.margin if result.groups else 2 * style.margin
+    return layout
+
+
+def stack_layouts(top: Layout, bottom: Layout, style: Optional[LayoutStyle] = None) -> Layout:
+    """Одне полотно: bottom під top (зсув на висоту top без нижнього поля)."""
+    style = style or LayoutStyle()
+    if not top.nodes:
+        return bottom
+    if not bottom.nodes:
+        return top
+    dy = top.height - style.margin + style.section_gap - style.margin
+    layout = Layout(nodes=list(top.nodes), connectors=list(top.connectors))
+    for node in bottom.nodes:
+        layout.nodes.append(Node(node.key, node.x, node.y + dy, node.width, node.height, node.title, node.lines))
+    for c in bottom.connectors:
+        layout.connectors.append(Connector(c.source, c.target, [(x, y + dy) for x, y in c.points]))
+    layout.width = max(top.width, bottom.width)
+    layout.height = bottom.height + dy
+    return layout
+
+
+def _num(v: float) -> str:
+    return f"{v:.1f}".rstrip("0").rstrip(".")
+
+
+def iter_svg(layout: Layout, style: Optional[LayoutStyle] = None) -> Iterator[str]:
+    """SVG частинами: заголовок, лінії, вузли, кінець документа."""
+    style = style or LayoutStyle()
+    yield (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_num(layout.width)}" height="{_num(layout.height)}" '
+        f'viewBox="0 0 {_num(layout.width)} {_num(layout.height)}" font-family="sans-serif" font-size="12">\n'
+        '<style>.box{fill:#fff;stroke:#888}.title{fill:#888;font-size:10px}.line{fill:none;stroke:#aaa}</style>\n'
+    )
+    for c in layout.connectors:
+        path = " ".join(f"{'M' if i == 0 else 'L'}{_num(x)} {_num(y)}" for i, (x, y) in enumerate(c.points))
+        yield f'<path class="line" d="{path}"/>\n'
+    for node in layout.nodes:
+        x, y = node.x, node.y
+        parts = [
+            f'<g><rect class="box" x="{_num(x)}" y="{_num(y)}" width="{_num(node.width)}" '
+            f'height="{_num(node.height)}" rx="4"/>',
+            f'<text class="title" x="{_num(x + 4)}" y="{_num(y - 3)}">{escape(node.title)}</text>',
+        ]
+        step = min(style.line_height, node.height / max(len(node.lines), 1))
+        for k, line in enumerate(node.lines):
+            parts.append(f'<text x="{_num(x + 6)}" y="{_num(y + step * (k + 0.75))}">{escape(line)}</text>')
+        parts.append("</g>\n")
+        yield "".join(parts)
+    yield "</svg>\n"
+
+
+def write_svg(layout: Layout, out: TextIO, style: Optional[LayoutStyle] = None) -> None:
+    """Записати SVG у файл чи потік частинами."""
+    for chunk in iter_svg(layout, style):
+        out.write(chunk)
+
+
+def render_svg(result: DrawResult, style: Optional[LayoutStyle] = None) -> str:
+    """
+    SVG для результату: таблиці груп (якщо є) і під ними сітка (якщо є зв'язки переможців);
+    '' — нічого малювати.
+    """
+    matches = result.matches or [m for r in result.rounds for m in r]
+    bracket = layout_bracket(result, style) if any(m.winner_advances_to for m in matches) else Layout()
+    groups = layout_groups(result, style=style) if result.groups else Layout()
+    layout = stack_layouts(groups, bracket, style)
+    if not layout.nodes:
+        return ""
+    return "".join(iter_svg(layout, style))
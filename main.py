@@ -8,16 +8,26 @@
   3 — стиль Ліги чемпіонів УЄФА (групи + плей-оф)
   4 — кастомна формула
 
-Запуск: python main.py [номер або формула]
-Без аргументів — інтерактивний вибір.
+Запуск: python main.py [номер або формула] [--participants ФАЙЛ] [--near N]
+Без аргументів — інтерактивний вибір. --participants: учасники з CSV/TSV/JSON Lines
+(сіяння за рейтингом) замість згенерованих n. --near N: найближчі до N допустимі конфігурації
+формату (python main.py 8 --near 40).
 """
 import sys
 import os
+from typing import TYPE_CHECKING
 
 # Додати корінь проєкту в шлях
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from models import Participant, DrawResult
+if TYPE_CHECKING:
+    # draw_cache тягне sqlite3, якого немає в Pyodide за замовчуванням — лише для анотацій
+    from draw_cache import DrawCache
+from feasibility import check, nearest, valid_participant_counts
+from layout import render_svg
+from metrics import phase
+from participants_io import load_participants, load_participants_text
 from formats import (
     draw_knockout,
     draw_round_robin,
@@ -29,28 +39,43 @@ from formats import (
 
 def league_phase_valid_participant_counts(rounds: int) -> tuple[int, list[int]]:
     """
-    Для League Phase при заданій кількості турів: дійсні кількості учасників.
-    Умови: n = (rounds+1)*k (k — дільник rounds); n парне (кожен тур по n/2 матчів, без баїв);
-    при одному матчі з кошика розмір кошика парний; (команд у кошику)×(матчів з кошика) парне.
-    Повертає (мінімум_учасників, відсортований список допустимих n).
+    Для League Phase при заданій кількості турів: дійсні кількості учасників (правила й перевірка
+    побудовою розкладу — feasibility.py). Повертає (мінімум_учасників, відсортований список допустимих n).
     """
-    pot_size = rounds + 1
-    divisors = [d for d in range(1, rounds + 1) if rounds % d == 0]
-    valid = []
-    for k in divisors:
-        n = pot_size * k
-        if n % 2 == 1:
-            continue  # тільки парна кількість: кожен тур по n/2 матчів, інакше не вмістити в rounds турів
-        n_pots = n // pot_size
-        k_per_pot = rounds // n_pots
-        if k_per_pot == 1 and pot_size % 2 == 1:
-            continue  # заборонено: один матч з кошика при непарному розмірі кошика
-        if n_pots == 1 and pot_size % 2 == 1:
-            continue  # один кошик з непарним числом: не вмістити всі матчі в rounds турів без баїв
-        if (pot_size * k_per_pot) % 2 == 1:
-            continue  # неціла кількість матчів у кошику (27.5 тощо)
-        valid.append(n)
-    return (min(valid) if valid else 0, sorted(valid))
+    valid = list(valid_participant_counts("league_phase", rounds=rounds))
+    return (min(valid) if valid else 0, valid)
+
+
+# Пункт меню → (формат feasibility, параметри з аргументів run_feasibility_web)
+_FEASIBILITY_FORMATS = {
+    "1": "knockout",
+    "2": "round_robin",
+    "3": "uefa_style",
+    "8": "league_phase",
+}
+
+
+def run_feasibility_web(choice: str, n: int, league_rounds: int | None = None, count: int = 5) -> dict:
+    """
+    Підказка для форми: чи допустима кількість учасників n і найближчі допустимі конфігурації.
+    Повертає {"valid": bool, "message": str, "nearest": [опис, …]}; для формату без правил — {}.
+    """
+    fmt = _FEASIBILITY_FORMATS.get(choice)
+    if fmt is None:
+        return {}
+    # УЄФА у веб-формі — 8 груп, по 2 виходять (значення за замовчуванням draw_uefa_style)
+    fixed = {"groups": 8, "advancers": 2} if fmt == "uefa_style" else {}
+    params = {"rounds": league_rounds or 8} if fmt == "league_phase" else fixed
+    try:
+        config = check(fmt, n, **params)
+        message = config.describe()
+        valid = True
+    except ValueError as e:
+        message = str(e)
+        valid = False
+    # Для етапу ліги пропонуємо й інші кількості турів: 40 → 36/8, 34/16, …
+    near = nearest(fmt, n, count=count, **fixed)
+    return {"valid": valid, "message": message, "nearest": [c.describe() for c in near]}
 
 
 def make_sample_participants(
@@ -86,6 +111,40 @@ def make_sample_participants(
     return participants
 
 
+def read_participants(
+    source: str,
+    fmt: str | None = None,
+    league_rounds: int | None = None,
+    from_text: bool = False,
+    seed_by_rating: bool = True,
+) -> list[Participant]:
+    """
+    Учасники з файлу (або з тексту файлу, from_text=True) для run_draw.
+    Сіяння за рейтингом (без рейтингу у файлі — стовпець seed; seed_by_rating=False — завжди seed);
+    для етапу ліги (league_rounds) — кошики по league_rounds+1 (або стовпець pot з файлу),
+    учасники впорядковані за кошиками.
+    """
+    pot_size = league_rounds + 1 if league_rounds is not None else None
+    if from_text:
+        loaded = load_participants_text(source, fmt=fmt or "csv", pot_size=pot_size, seed_by_rating=seed_by_rating)
+    else:
+        loaded = load_participants(source, fmt=fmt, pot_size=pot_size, seed_by_rating=seed_by_rating)
+    if not loaded.participants:
+        raise ValueError("У файлі учасників немає жодного запису")
+    if loaded.pots:
+        return [p for pot in loaded.pots for p in pot]
+    return loaded.participants
+
+
+def _read_participants_cli(path: str, league_rounds: int | None = None) -> list[Participant] | None:
+    """read_participants для CLI: замість traceback — повідомлення й None."""
+    try:
+        return read_participants(path, league_rounds=league_rounds)
+    except (OSError, ValueError) as e:
+        print(f"Не вдалося прочитати учасників з {path}: {e}")
+        return None
+
+
 def run_draw(
     choice: str,
     participants: list[Participant],
@@ -94,8 +153,29 @@ def run_draw(
     league_rounds: int | None = None,
     knockout_type: str = "single",
     round_robin_rounds: int = 1,
+    cache: "DrawCache | None" = None,
 ) -> DrawResult:
-    """Запустити жеребкування за вибором. num_seeded: 0=повний жереб, n=усі сіяні. league_rounds: кількість турів для формату 8."""
+    """
+    Запустити жеребкування за вибором. num_seeded: 0=повний жереб, n=усі сіяні. league_rounds: кількість турів для формату 8.
+    cache: якщо задано (і seed не None) — повторний запит з тими самими параметрами завантажується з кешу.
+    """
+    if cache is not None and seed is not None:
+        params = {
+            "choice": choice,
+            "num_seeded": num_seeded,
+            "league_rounds": league_rounds,
+            "knockout_type": knockout_type,
+            "round_robin_rounds": round_robin_rounds,
+        }
+        return cache.get_or_compute(
+            "run_draw",
+            params,
+            participants,
+            seed,
+            lambda: run_draw(
+                choice, participants, seed, num_seeded, league_rounds, knockout_type, round_robin_rounds
+            ),
+        )
     seed = seed if seed is not None else None
     n = len(participants)
     if num_seeded is None and choice not in ("3", "8", "league_phase", "етап ліги", "league phase"):
@@ -122,33 +202,59 @@ def run_draw_web(
     formula: str | None = None,
     knockout_type: str = "single",
     round_robin_rounds: int = 1,
+    participants_text: str | None = None,
+    participants_format: str | None = None,
+    participants_file: str | None = None,
 ) -> dict:
     """
     API для веб-сторінки: приймає параметри, повертає серіалізований результат
     (опис, раунди, групи) або {"error": "..."}.
     knockout_type: "single", "double", "triple" для формату 1.
     round_robin_rounds: кількість кіл для формату 2.
+    participants_text / participants_file: учасники з вмісту файлу або шляху (CSV/TSV/JSON Lines)
+    замість згенерованих n; participants_format — "csv", "tsv" або "jsonl".
     """
     try:
         if choice == "7" and formula:
             choice = formula.strip()
+        from_file = participants_text is not None or participants_file is not None
         if choice == "8":
             league_rounds = league_rounds if league_rounds is not None else 8
             min_n, valid = league_phase_valid_participant_counts(league_rounds)
             if not valid:
                 return {"error": f"При {league_rounds} турах немає допустимої кількості учасників. Оберіть 8 або 12 турів."}
+            if from_file:
+                participants = read_participants(
+                    participants_text if participants_text is not None else participants_file,
+                    fmt=participants_format,
+                    league_rounds=league_rounds,
+                    from_text=participants_text is not None,
+                )
+                n = len(participants)
             if n not in valid:
-                return {"error": f"При {league_rounds} турах допустимі кількості: {valid}. Обрано {n}."}
-            participants = make_sample_participants(n, format_kind="league_phase", rounds=league_rounds)
+                suggestions = "; ".join(c.describe() for c in nearest("league_phase", n, count=3))
+                return {
+                    "error": f"При {league_rounds} турах допустимі кількості: {valid}. Обрано {n}. "
+                    f"Найближчі допустимі конфігурації: {suggestions}."
+                }
+            if not from_file:
+                participants = make_sample_participants(n, format_kind="league_phase", rounds=league_rounds)
         else:
             league_rounds = None
-            if choice in ("3", "uefa", "ліга чемпіонів") and n < 16:
-                n = 32
-            participants = make_sample_participants(
-                n,
-                num_seeded=n // 2 if num_seeded is None else num_seeded,
-                format_kind="default",
-            )
+            if from_file:
+                participants = read_participants(
+                    participants_text if participants_text is not None else participants_file,
+                    fmt=participants_format,
+                    from_text=participants_text is not None,
+                )
+            else:
+                if choice in ("3", "uefa", "ліга чемпіонів") and n < 16:
+                    n = 32
+                participants = make_sample_participants(
+                    n,
+                    num_seeded=n // 2 if num_seeded is None else num_seeded,
+                    format_kind="default",
+                )
         result = run_draw(
             choice,
             participants,
@@ -158,27 +264,35 @@ def run_draw_web(
             knockout_type=knockout_type,
             round_robin_rounds=round_robin_rounds,
         )
-        rounds_out = []
-        for r in result.rounds:
-            rounds_out.append([
-                {
-                    "id": m.match_id,
-                    "a": m.participant_a.name if m.participant_a else "?",
-                    "b": m.participant_b.name if m.participant_b else "?",
-                }
-                for m in r
-            ])
-        groups_out = [
-            {"name": g.name, "participants": [p.name for p in g.participants]}
-            for g in result.groups
-        ]
-        return {
-            "description": result.description,
-            "rounds": rounds_out,
-            "groups": groups_out,
-        }
+        with phase("web", "serialisation"):
+            rounds_out = []
+            for r in result.rounds:
+                rounds_out.append([
+                    {
+                        "id": m.match_id,
+                        "a": m.participant_a.name if m.participant_a else "?",
+                        "b": m.participant_b.name if m.participant_b else "?",
+                    }
+                    for m in r
+                ])
+            groups_out = [
+                {"name": g.name, "participants": [p.name for p in g.participants]}
+                for g in result.groups
+            ]
     except Exception as e:
         return {"error": str(e)}
+    # Малюнок — окремо: помилка розмітки не скасовує коректного жеребкування
+    try:
+        with phase("web", "layout"):
+            svg = render_svg(result)
+    except Exception:
+        svg = ""
+    return {
+        "description": result.description,
+        "rounds": rounds_out,
+        "groups": groups_out,
+        "svg": svg,
+    }
 
 
 def main() -> None:
@@ -192,6 +306,31 @@ def main() -> None:
     print()
 
     argv = sys.argv[1:]
+    participants_file: str | None = None
+    for i, arg in enumerate(argv):
+        if arg == "--participants" and i + 1 < len(argv):
+            participants_file = argv[i + 1]
+            argv = argv[:i] + argv[i + 2:]
+            break
+        if arg.startswith("--participants="):
+            participants_file = arg.split("=", 1)[1]
+            argv = argv[:i] + argv[i + 1:]
+            break
+    if "--near" in argv:
+        # python main.py 8 --near 40 — найближчі допустимі конфігурації формату
+        i = argv.index("--near")
+        target = int(argv[i + 1]) if i + 1 < len(argv) and argv[i + 1].isdigit() else 36
+        choice = " ".join(argv[:i]).strip() or "8"
+        fmt = _FEASIBILITY_FORMATS.get(choice)
+        if fmt is None:
+            print(
+                f"--near: формат {choice!r} не підтримується. "
+                f"Доступні: {', '.join(f'{k} ({v})' for k, v in _FEASIBILITY_FORMATS.items())}"
+            )
+            return
+        for config in nearest(fmt, target, count=8):
+            print(f"  {config.describe()}")
+        return
     if argv:
         choice = " ".join(argv).strip()
     else:
@@ -222,7 +361,7 @@ def main() -> None:
                 f"При {league_rounds_arg} турах немає допустимої (парної) кількості учасників. "
                 "Оберіть іншу кількість турів (наприклад 8 або 12)."
             )
-        while True:
+        while participants_file is None:
             try:
                 n_input = input(
                     f"Кількість учасників (мін. {min_n}, допустимі: {valid_n_list}, за замовч. 36): "
@@ -237,10 +376,25 @@ def main() -> None:
                 f"ділилася на кількість кошиків (кошик = {pot_size})."
             )
             print(f"Мінімум учасників: {min_n}. Допустимі значення: {valid_n_list}. Спробуйте ще раз.")
-        participants = make_sample_participants(n, format_kind="league_phase", rounds=league_rounds_arg)
+        if participants_file is not None:
+            participants = _read_participants_cli(participants_file, league_rounds=league_rounds_arg)
+            if participants is None:
+                return
+            n = len(participants)
+            if n not in valid_n_list:
+                print(f"У файлі {n} учасників; при {league_rounds_arg} турах допустимі: {valid_n_list}.")
+                return
+        else:
+            participants = make_sample_participants(n, format_kind="league_phase", rounds=league_rounds_arg)
         print(f"Етап ліги ЛЧ: {n} учасників, {league_rounds_arg} турів, кошики по {pot_size}.\n")
     else:
-        if argv and len(argv) >= 2 and argv[-1].isdigit():
+        if participants_file is not None:
+            participants = _read_participants_cli(participants_file)
+            if participants is None:
+                return
+            n = len(participants)
+            print(f"Завантажено {n} учасників з {participants_file}.\n")
+        elif argv and len(argv) >= 2 and argv[-1].isdigit():
             n = int(argv[-1])
             choice = " ".join(argv[:-1]).strip() or "1"
         else:
@@ -276,13 +430,14 @@ def main() -> None:
             except (EOFError, ValueError):
                 pass
 
-        if choice in ("3", "uefa", "ліга чемпіонів") and n < 16:
-            participants = make_sample_participants(32, num_seeded=16, format_kind="default")
-            print("Для формату УЄФА використано 32 учасники.\n")
-        else:
-            participants = make_sample_participants(
-                n, num_seeded=num_seeded_arg if num_seeded_arg is not None else n // 2, format_kind="default"
-            )
+        if participants_file is None:
+            if choice in ("3", "uefa", "ліга чемпіонів") and n < 16:
+                participants = make_sample_participants(32, num_seeded=16, format_kind="default")
+                print("Для формату УЄФА використано 32 учасники.\n")
+            else:
+                participants = make_sample_participants(
+                    n, num_seeded=num_seeded_arg if num_seeded_arg is not None else n // 2, format_kind="default"
+                )
 
     try:
         result = run_draw(
@@ -20,6 +20,9 @@ class Participant:
     name: str
     seed: Optional[int] = None  # сіяний номер для жеребкування
     country: Optional[str] = None  # країна (для Country Lock / Max 2 per country)
+    club: Optional[str] = None  # клуб (без пар одного клубу в першому колі нокауту)
+    rating: Optional[float] = None  # рейтинг (Elo) для симуляції результатів
+    location: Optional[tuple[float, float]] = None  # (широта, довгота) домашнього майданчика — для мінімізації переїздів
 
     def __str__(self) -> str:
         return self.name
@@ -0,0 +1,270 @@
+"""
+Завантаження учасників з файлів: CSV/TSV, JSON Lines; потоково, з опційним mmap.
+
+Рядки читаються по одному (csv.reader / json.loads на рядок), файл цілком у пам'ять
+не потрапляє. Сіяння за рейтингом і кошики — в тому ж проході: з top=K тримається лише
+купа з K найсильніших (пам'ять O(K) навіть для списку федерації на 100k гравців).
+
+Стовпці (назви можна перевизначити через columns): id, name, seed, country, club, rating,
+lat, lon (координати майданчика → Participant.location), pot (власний кошик).
+Без id — номер рядка; без name — id.
+
+Приклад CSV:
+    id,name,country,rating
+    1,Динамо,UA,1850
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import heapq
+import io
+import json
+import mmap
+import os
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Iterable, Iterator, Optional, Union
+
+from models import Participant
+
+
+# Формат за розширенням файлу
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".txt": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+Source = Union[str, os.PathLike, Iterable[str]]
+
+
+@dataclass
+class LoadedParticipants:
+    """Учасники (у порядку сіяння), кошики та статистика імпорту."""
+    participants: list[Participant]
+    pots: list[list[Participant]] = field(default_factory=list)
+    rows: int = 0  # прочитано записів
+    skipped: int = 0  # пропущено некоректних (strict=False)
+
+
+def detect_format(path: Union[str, os.PathLike]) -> str:
+    ext = os.path.splitext(os.fspath(path))[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Невідомий формат файлу {ext!r}. Підтримуються: {', '.join(sorted(FORMATS))}")
+    return FORMATS[ext]
+
+
+def _mmap_lines(path: Union[str, os.PathLike], encoding: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """Рядки з mmap: декодування блоками по chunk_size, неповний рядок переноситься в наступний блок."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            tail = ""
+            for start in range(0, len(mm), chunk_size):
+                text = tail + decoder.decode(mm[start:start + chunk_size])
+                lines = text.splitlines(keepends=True)
+                tail = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+                yield from lines
+            tail += decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+
+def _lines(source: Source, use_mmap: bool, encoding: str) -> Iterator[str]:
+    if isinstance(source, (str, os.PathLike)):
+        if use_mmap:
+            yield from _mmap_lines(source, encoding)
+            return
+        with open(source, encoding=encoding, newline="") as f:
+            yield from f
+        return
+    yield from source
+
+
+# Поля запису в порядку кортежу values у _records / _to_participant
+FIELDS = ("id", "name", "seed", "country", "club", "rating", "lat", "lon", "pot")
+
+
+def _records(lines: Iterable[str], fmt: str, columns: dict[str, str]) -> Iterator[tuple[int, tuple]]:
+    """
+    (номер рядка у файлі з 1, значення FIELDS) для кожного непорожнього запису.
+    Для CSV індекси стовпців визначаються один раз із заголовка.
+    """
+    keys = [columns.get(f, f) for f in FIELDS]
+    if fmt == "jsonl":
+        for line_no, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Рядок {line_no}: некоректний JSON ({e.msg})") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"Рядок {line_no}: очікується об'єкт JSON")
+            yield line_no, tuple(record.get(k) for k in keys)
+        return
+    reader = csv.reader(lines, delimiter="\t" if fmt == "tsv" else ",")
+    positions: Optional[list[int]] = None
+    for row in reader:
+        if not row or all(not c.strip() for c in row):
+            continue
+        if positions is None:
+            header = {c.strip().lstrip("\ufeff"): i for i, c in enumerate(row)}
+            positions = [header.get(k, -1) for k in keys]
+            continue
+        width = len(row)
+        yield reader.line_num, tuple(row[i].strip() if 0 <= i < width else None for i in positions)
+
+
+def _optional(value, cast):
+    if value is None or value == "":
+        return None
+    return cast(value)
+
+
+def _to_participant(line_no: int, values: tuple) -> tuple[Participant, Optional[int]]:
+    pid, name, seed, country, club, rating, lat, lon, pot = values
+    try:
+        pid = str(line_no) if pid is None or pid == "" else str(pid)
+        lat, lon = _optional(lat, float), _optional(lon, float)
+        participant = Participant(
+            id=pid,
+            name=str(name) if name not in (None, "") else pid,
+            seed=_optional(seed, int),
+            country=_optional(country, str),
+            club=_optional(club, str),
+            rating=_optional(rating, float),
+            location=(lat, lon) if lat is not None and lon is not None else None,
+        )
+        return participant, _optional(pot, int)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Рядок {line_no}: {e}") from None
+
+
+def iter_participants(
+    source: Source,
+    fmt: Optional[str] = None,
+    columns: Optional[dict[str, str]] = None,
+    use_mmap: bool = False,
+    encoding: str = "utf-8-sig",
+) -> Iterator[Participant]:
+    """
+    Потоково читати учасників з файлу (шлях) або з ітерованого тексту (рядки).
+    fmt: "csv", "tsv", "jsonl"; за замовчуванням — за розширенням (для тексту — "csv").
+    columns: поле → назва стовпця/ключа у файлі, напр. {"rating": "elo", "name": "player"}.
+    use_mmap: читати через mmap (великі файли на диску).
+    """
+    for _, participant, _ in _iter_rows(source, fmt, columns or {}, use_mmap, encoding, strict=True):
+        yield participant
+
+
+def _iter_rows(
+    source: Source,
+    fmt: Optional[str],
+    columns: dict[str, str],
+    use_mmap: bool,
+    encoding: str,
+    strict: bool,
+    skipped: Optional[list[int]] = None,
+) -> Iterator[tuple[int, Participant, Optional[int]]]:
+    if fmt is None:
+        fmt = detect_format(source) if isinstance(source, (str, os.PathLike)) else "csv"
+    if fmt not in FORMATS.values():
+        raise ValueError(f"Невідомий формат {fmt!r}. Підтримуються: csv, tsv, jsonl")
+    for line_no, values in _records(_lines(source, use_mmap, encoding), fmt, columns):
+        try:
+            participant, pot = _to_participant(line_no, values)
+        except ValueError:
+            if strict:
+                raise
+            if skipped is not None:
+                skipped[0] += 1
+            continue
+        yield line_no, participant, pot
+
+
+def load_participants(
+    source: Source,
+    fmt: Optional[str] = None,
+    seed_by_rating: bool = True,
+    top: Optional[int] = None,
+    pot_size: Optional[int] = None,
+    num_pots: Optional[int] = None,
+    columns: Optional[dict[str, str]] = None,
+    use_mmap: bool = False,
+    strict: bool = True,
+    encoding: str = "utf-8-sig",
+) -> LoadedParticipants:
+    """
+    Завантажити учасників за один прохід: сіяння, відбір top і кошики.
+
+    seed_by_rating: сіяні номери 1..n за спаданням рейтингу (без рейтингу — в кінці, за номером
+    з файлу, далі в порядку файлу); якщо рейтингу немає в жодному рядку — номери з файлу
+    зберігаються. False — завжди номери з файлу (без номера — в кінці).
+    top: лишити лише top найсильніших (купа розміру top — пам'ять не залежить від розміру файлу).
+    pot_size / num_pots: кошики за порядком сіяння; стовпець pot у файлі має пріоритет.
+    strict: False — некоректні рядки пропускаються (LoadedParticipants.skipped), інакше ValueError.
+    """
+    if top is not None and top < 1:
+        raise ValueError("top має бути додатним")
+    skipped = [0]
+    rows = 0
+    tiebreak = count()
+
+    def key(line_no: int, p: Participant) -> tuple:
+        # Більший ключ — сильніший учасник; рівність — раніший рядок
+        by_seed = (p.seed is not None, -(p.seed or 0), -line_no)
+        if seed_by_rating:
+            return (p.rating is not None, p.rating or 0.0) + by_seed
+        return by_seed
+
+    kept: list[tuple[tuple, int, Participant, Optional[int]]] = []
+    for line_no, participant, pot in _iter_rows(
+        source, fmt, columns or {}, use_mmap, encoding, strict, skipped
+    ):
+        rows += 1
+        item = (key(line_no, participant), next(tiebreak), participant, pot)
+        if top is None:
+            kept.append(item)
+        elif len(kept) < top:
+            heapq.heappush(kept, item)
+        elif item[0] > kept[0][0]:
+            heapq.heapreplace(kept, item)
+
+    kept.sort(key=lambda item: item[0], reverse=True)
+    participants = [p for _, _, p, _ in kept]
+    if seed_by_rating and any(p.rating is not None for p in participants):
+        for i, p in enumerate(participants, 1):
+            p.seed = i
+    elif seed_by_rating:
+        # Рейтингу немає ніде — сіяння з файлу; учасники без номера — після найбільшого
+        last = max((p.seed for p in participants if p.seed is not None), default=0)
+        for p in participants:
+            if p.seed is None:
+                last += 1
+                p.seed = last
+
+    pots: list[list[Participant]] = []
+    file_pots = [pot for _, _, _, pot in kept]
+    if any(pot is not None for pot in file_pots):
+        by_pot: dict[int, list[Participant]] = {}
+        for p, pot in zip(participants, file_pots):
+            if pot is None:
+                raise ValueError(f"Учасник {p.name!r} без кошика, хоча стовпець pot заповнено для інших")
+            by_pot.setdefault(pot, []).append(p)
+        pots = [by_pot[k] for k in sorted(by_pot)]
+    elif pot_size or num_pots:
+        size = pot_size or -(-len(participants) // num_pots)
+        pots = [participants[i:i + size] for i in range(0, len(participants), size)]
+    return LoadedParticipants(participants=participants, pots=pots, rows=rows, skipped=skipped[0])
+
+
+def load_participants_text(text: str, fmt: str = "csv", **kwargs) -> LoadedParticipants:
+    """load_participants для тексту (вміст файлу з веб-форми)."""
+    return load_participants(io.StringIO(text), fmt=fmt, **kwargs)
@@ -0,0 +1,227 @@
+"""
+Гілки «а що, якщо» для жеребкування: копіювання під час запису (copy-on-write).
+
+Scenario.from_draw(result) — корінь: індекс матчів, порядок турів і попередники кожного матчу
+будуються один раз і спільні для всіх гілок. fork() — O(1): нова гілка посилається на батька
+і зберігає лише власні дельти — змінені матчі (копії через dataclasses.replace, учасники спільні)
+та записані результати (MatchResult, як у storage.py). Решта матчів — ті самі об'єкти, що й
+у батька та в корені; відкинути гілку — просто забути посилання (звільняється лише її дельта).
+Гілка, від якої вже зроблено fork, стає лише для читання: інакше запис у батька «протік» би
+в усі наявні гілки. Щоб продовжити батьківський сценарій, зробіть ще один fork.
+
+Пошук матчу — вгору ланцюжком батьків (O(глибина)); для довгих ланцюжків flatten()
+збирає всі дельти в одну гілку, що спирається прямо на корінь.
+
+Приклад:
+    base = Scenario.from_draw(result)
+    a = base.fork("A виграє")
+    a.record(MatchResult("M1", winner="1"))
+    b = base.fork("B виграє")
+    b.record(MatchResult("M1", score_a=0, score_b=2))
+    a.match("M5").participant_a   # переможець M1 у гілці a
+    base.record(...)              # RuntimeError: base уже має гілки
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, Iterator, Optional
+
+from models import Match, DrawResult, Group
+from storage import MatchResult
+
+
+@dataclass
+class _Base:
+    """Спільне для всіх гілок: незмінний знімок жеребкування."""
+    result: DrawResult
+    matches: dict[str, Match]
+    feeders: dict[str, list[str]]  # матч → матчі, звідки в нього потрапляють (переможець чи переможений)
+
+
+class Scenario:
+    """Гілка сценарію: батько + власні дельти матчів і результатів."""
+
+    __slots__ = ("name", "parent", "depth", "_base", "_matches", "_results", "_frozen")
+
+    def __init__(self, base: _Base, parent: Optional["Scenario"] = None, name: str = ""):
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self._base = base
+        self._matches: dict[str, Match] = {}
+        self._results: dict[str, MatchResult] = {}
+        self._frozen = False  # True після першого fork(): дельти спільні з гілками
+
+    @classmethod
+    def from_draw(cls, result: DrawResult, name: str = "базовий") -> "Scenario":
+        """Корінь для результату жеребкування (O(кількість матчів)); сам result не змінюється."""
+        matches = result.matches or [m for r in result.rounds for m in r]
+        feeders: dict[str, list[str]] = {}
+        for m in matches:
+            for target in (m.winner_advances_to, m.loser_advances_to):
+                if target:
+                    feeders.setdefault(target, []).append(m.match_id)
+        return cls(_Base(result, {m.match_id: m for m in matches}, feeders), name=name)
+
+    def fork(self, name: str = "") -> "Scenario":
+        """Нова гілка від поточної — O(1), нічого не копіюється; поточна стає лише для читання."""
+        self._frozen = True
+        return Scenario(self._base, self, name)
+
+    @property
+    def read_only(self) -> bool:
+        return self._frozen
+
+    # --- читання ---
+
+    def match(self, match_id: str) -> Match:
+        """Поточна версія матчу в цій гілці (не змінювати: об'єкт може бути спільним з іншими гілками)."""
+        node: Optional[Scenario] = self
+        while node is not None:
+            m = node._matches.get(match_id)
+            if m is not None:
+                return m
+            node = node.parent
+        try:
+            return self._base.matches[match_id]
+        except KeyError:
+            raise KeyError(f"Матч {match_id} не знайдено в жеребкуванні") from None
+
+    def result(self, match_id: str) -> Optional[MatchResult]:
+        node: Optional[Scenario] = self
+        while node is not None:
+            r = node._results.get(match_id)
+            if r is not None:
+                return r
+            node = node.parent
+        return None
+
+    def _chain(self) -> list["Scenario"]:
+        """Гілки від кореня до цієї."""
+        chain = []
+        node: Optional[Scenario] = self
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+        return chain
+
+    def changed_matches(self) -> dict[str, Match]:
+        """Усі матчі, змінені відносно жеребкування (з урахуванням предків), — O(сумарні дельти)."""
+        merged: dict[str, Match] = {}
+        for node in self._chain():
+            merged.update(node._matches)
+        return merged
+
+    def results(self) -> dict[str, MatchResult]:
+        """Усі записані результати гілки з урахуванням предків."""
+        merged: dict[str, MatchResult] = {}
+        for node in self._chain():
+            merged.update(node._results)
+        return merged
+
+    @property
+    def changes(self) -> int:
+        """Розмір власної дельти (матчі + результати)."""
+        return len(self._matches) + len(self._results)
+
+    def matches(self) -> Iterator[Match]:
+        """Усі матчі в порядку жеребкування, поточні версії."""
+        changed = self.changed_matches()
+        for match_id, m in self._base.matches.items():
+            yield changed.get(match_id, m)
+
+    def to_result(self) -> DrawResult:
+        """
+        DrawResult цієї гілки: змінені матчі — її копії, решта — спільні об'єкти жеребкування
+        (тож результат лише для читання). Групи з жодним зміненим матчем теж спільні.
+        """
+        changed = self.changed_matches()
+        source = self._base.result
+
+        def current(ms: list[Match]) -> list[Match]:
+            return [changed.get(m.match_id, m) for m in ms]
+
+        groups: list[Group] = []
+        for g in source.groups:
+            if any(m.match_id in changed for m in g.matches):
+                groups.append(replace(g, matches=current(g.matches)))
+            else:
+                groups.append(g)
+        return DrawResult(
+            matches=current(source.matches),
+            groups=groups,
+            rounds=[current(r) for r in source.rounds],
+            description=source.description + (f"\nСценарій: {self.name}" if self.name else ""),
+        )
+
+    # --- запис ---
+
+    def update_match(self, match_id: str, **fields: Any) -> Match:
+        """Змінити поля матчу лише в цій гілці (копія через dataclasses.replace)."""
+        self._check_writable()
+        m = replace(self.match(match_id), **fields)
+        self._matches[match_id] = m
+        return m
+
+    def record(self, result: MatchResult, advance: bool = True) -> None:
+        """
+        Записати результат у цій гілці. winner — id переможця; інакше за рахунком (нічия — без переможця).
+        advance: переможця (і переможеного, якщо є loser_advances_to) поставити в наступний матч
+        за тими ж правилами, що й TournamentStore.record_results.
+        """
+        self._check_writable()
+        m = self.match(result.match_id)
+        a, b = m.participant_a, m.participant_b
+        winner_id = result.winner
+        if winner_id is None and result.score_a is not None and result.score_b is not None and result.score_a != result.score_b:
+            side = a if result.score_a > result.score_b else b
+            winner_id = side.id if side is not None else None
+        if winner_id is not None and winner_id not in (a and a.id, b and b.id):
+            raise ValueError(f"Матч {result.match_id}: {winner_id} не грає в цьому матчі")
+        self._results[result.match_id] = replace(result, winner=winner_id)
+        if not advance or winner_id is None:
+            return
+        winner, loser = (a, b) if a is not None and a.id == winner_id else (b, a)
+        if m.winner_advances_to:
+            self._advance(winner, m.winner_advances_to, m.match_id)
+        if m.loser_advances_to and loser is not None:
+            self._advance(loser, m.loser_advances_to, m.match_id)
+
+    def _check_writable(self) -> None:
+        if self._frozen:
+            raise RuntimeError(
+                f"Сценарій {self.name!r} уже має гілки й не змінюється; запишіть результат у новий fork()"
+            )
+
+    def record_results(self, results: Iterable[MatchResult], advance: bool = True) -> int:
+        """Кілька результатів поспіль; повертає їх кількість."""
+        count = 0
+        for r in results:
+            self.record(r, advance)
+            count += 1
+        return count
+
+    def _advance(self, participant: Any, target: str, source: str) -> None:
+        if target not in self._base.matches:
+            return
+        feeders = self._base.feeders.get(target, [])
+        current = self.match(target)
+        if len(feeders) >= 2:
+            slot_a = feeders.index(source) == 0
+        else:
+            slot_a = current.participant_a is None or current.participant_a.id == participant.id
+        self.update_match(target, **({"participant_a": participant} if slot_a else {"participant_b": participant}))
+
+    def flatten(self, name: Optional[str] = None) -> "Scenario":
+        """Нова гілка прямо від кореня з усіма дельтами цієї — для швидкого пошуку в довгих ланцюжках."""
+        root = self._chain()[0]
+        root._frozen = True
+        flat = Scenario(self._base, root, self.name if name is None else name)
+        for node in self._chain()[1:]:
+            flat._matches.update(node._matches)
+            flat._results.update(node._results)
+        return flat
+
+    def __repr__(self) -> str:
+        return f"Scenario({self.name!r}, глибина {self.depth}, змін {self.changes})"
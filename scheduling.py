@@ -0,0 +1,137 @@
+"""
+Розклад матчів по часових слотах, майданчиках і дошках.
+
+DrawResult.rounds визначає, хто з ким грає в якому турі, але не де і коли.
+schedule_matches призначає кожному матчу пару (слот, майданчик) і номер дошки:
+  - тури йдуть по черзі, кожен тур починається з нового слота;
+  - якщо в турі більше матчів, ніж місць у слоті, тур «переливається» в наступні слоти;
+  - майданчик може бути доступний лише в частині слотів (available_slots).
+
+Алгоритм — прохід по слотах з чергою матчів туру: O(матчів + слотів × майданчиків).
+Якщо всі майданчики мають обмежену доступність, порожні слоти пропускаються двійковим
+пошуком по об'єднанню доступних слотів.
+"""
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Optional
+
+from models import DrawResult
+
+
+@dataclass
+class Venue:
+    """Майданчик (зал, стадіон) з кількістю дошок/полів, що працюють одночасно."""
+    venue_id: str
+    name: str
+    boards: int = 1
+    available_slots: Optional[set[int]] = None  # None — доступний у кожному слоті
+
+    def is_available(self, slot: int) -> bool:
+        return self.available_slots is None or slot in self.available_slots
+
+
+@dataclass
+class SlotAssignment:
+    """Призначення одного матчу: слот, майданчик, дошка (з 1)."""
+    match_id: str
+    round_index: int
+    slot: int
+    venue_id: str
+    board: int
+
+
+@dataclass
+class Schedule:
+    """Розклад: призначення по match_id і слоти, зайняті кожним туром."""
+    assignments: dict[str, SlotAssignment] = field(default_factory=dict)
+    round_slots: list[list[int]] = field(default_factory=list)
+    num_slots: int = 0
+
+    def by_slot(self) -> dict[int, list[SlotAssignment]]:
+        out: dict[int, list[SlotAssignment]] = {}
+        for a in self.assignments.values():
+            out.setdefault(a.slot, []).append(a)
+        return out
+
+    def summary(self, slot_labels: Optional[list[str]] = None) -> str:
+        lines = []
+        for slot, items in sorted(self.by_slot().items()):
+            label = slot_labels[slot] if slot_labels and slot < len(slot_labels) else f"Слот {slot + 1}"
+            lines.append(f"--- {label} ---")
+            for a in sorted(items, key=lambda x: (x.venue_id, x.board)):
+                lines.append(f"  [{a.match_id}] {a.venue_id}, дошка {a.board}")
+        return "\n".join(lines)
+
+
+def schedule_matches(
+    result: DrawResult,
+    venues: list[Venue],
+    round_gap: int = 0,
+    max_slots: Optional[int] = None,
+) -> Schedule:
+    """
+    Призначити кожен матч result у (слот, майданчик, дошка).
+
+    round_gap: скільки порожніх слотів залишати між турами (наприклад, день відпочинку).
+    max_slots: верхня межа кількості слотів; якщо матчі не вміщаються — ValueError.
+    """
+    if not venues or all(v.boards <= 0 for v in venues):
+        raise ValueError("Потрібен хоча б один майданчик з дошками")
+    rounds = result.rounds or [result.matches]
+
+    # Якщо всі майданчики з обмеженою доступністю — слоти без жодного майданчика пропускаємо
+    open_slots: Optional[list[int]] = None
+    active = [v for v in venues if v.boards > 0]
+    if all(v.available_slots is not None for v in active):
+        open_slots = sorted(set().union(*(v.available_slots for v in active)))
+        if not open_slots:
+            raise ValueError("Жоден майданчик не доступний у жодному слоті")
+
+    def next_open(slot: int) -> Optional[int]:
+        if open_slots is None:
+            return slot
+        i = bisect.bisect_left(open_slots, slot)
+        return open_slots[i] if i < len(open_slots) else None
+
+    schedule = Schedule()
+    slot = 0
+    for round_matches in rounds:
+        used_slots: list[int] = []
+        pending = list(round_matches)
+        pos = 0
+        while pos < len(pending):
+            s = next_open(slot)
+            if s is None or (max_slots is not None and s >= max_slots):
+                raise ValueError(
+                    f"Не вистачає слотів: {len(pending) - pos} матчів туру лишилися без місця "
+                    f"(останній слот {slot})."
+                )
+            slot = s
+            placed_any = False
+            for venue in venues:
+                if venue.boards <= 0 or not venue.is_available(slot):
+                    continue
+                take = min(venue.boards, len(pending) - pos)
+                for board in range(1, take + 1):
+                    m = pending[pos]
+                    schedule.assignments[m.match_id] = SlotAssignment(
+                        match_id=m.match_id,
+                        round_index=m.round_index,
+                        slot=slot,
+                        venue_id=venue.venue_id,
+                        board=board,
+                    )
+                    pos += 1
+                placed_any = placed_any or take > 0
+                if pos == len(pending):
+                    break
+            if placed_any:
+                used_slots.append(slot)
+            slot += 1
+        schedule.round_slots.append(used_slots)
+        if used_slots:
+            slot += round_gap
+    schedule.num_slots = max((a.slot for a in schedule.assignments.values()), default=-1) + 1
+    return schedule
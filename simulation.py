@@ -0,0 +1,279 @@
+"""
+Симуляція турніру за рейтингами (Elo): ймовірності виходу в кожну стадію та перемоги.
+
+Структура береться з DrawResult:
+  - табличні матчі (групи за group_id, інакше одна загальна таблиця — колова, етап ліги):
+    очки за перемогу/нічию/поразку, місця за очками (рівність — випадково);
+  - матчі на виліт: учасники відомі або надходять через winner_advances_to; заглушки
+    «місце в таблиці» (PO-i з uefa_style, S<k>-P<r> з конвеєра етапів) підставляються з таблиць.
+
+Модель матчу: P(перемога A) = 1 / (1 + 10^((Rb - Ra - home_advantage) / 400));
+для табличних матчів частина цієї ймовірності віддається нічиїй (draw_rate при рівних силах).
+Усе рахується пакетами NumPy: на кожен матч — один вектор по всіх симуляціях пакета,
+очки таблиці — множенням матриці результатів на матрицю інцидентності. Пам'ять обмежена
+розміром пакета (batch_size), тож мільйони симуляцій ідуть пакетами.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from models import Participant, Match, DrawResult
+
+
+def _numpy() -> Any:
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError(
+            "Симуляція потребує numpy. Встановіть: pip install numpy"
+        )
+    return np
+
+
+# Назва таблиці без груп (колова, етап ліги)
+LEAGUE_TABLE = "Таблиця"
+TITLE = "перемога"
+
+_PIPELINE_RANK = re.compile(r"^S\d+-P(\d+)$")
+_UEFA_PLAYOFF = re.compile(r"^PO-(\d+)$")
+
+
+@dataclass
+class SimulationReport:
+    """Частоти за n_sims симуляцій."""
+    n_sims: int
+    stages: list[str] = field(default_factory=list)  # стадії на виліт у порядку проходження + TITLE
+    reach: dict[str, dict[str, float]] = field(default_factory=dict)  # id → стадія → ймовірність
+    expected_points: dict[str, float] = field(default_factory=dict)
+    # таблиця → id → ймовірності місць 1..розмір таблиці
+    positions: dict[str, dict[str, list[float]]] = field(default_factory=dict)
+
+    def title_odds(self) -> dict[str, float]:
+        return {pid: stages.get(TITLE, 0.0) for pid, stages in self.reach.items()}
+
+    def summary(self, participants: Optional[list[Participant]] = None, top: int = 20) -> str:
+        names = {p.id: p.name for p in participants or []}
+        order = sorted(self.reach, key=lambda pid: -self.reach[pid].get(TITLE, 0.0))[:top]
+        lines = ["Учасник".ljust(24) + "".join(s[:12].rjust(13) for s in self.stages)]
+        for pid in order:
+            row = names.get(pid, pid)[:23].ljust(24)
+            row += "".join(f"{100 * self.reach[pid].get(s, 0.0):12.1f}%" for s in self.stages)
+            lines.append(row)
+        return "\n".join(lines)
+
+
+def _round_label(count: int) -> str:
+    if count == 1:
+        return "фінал"
+    if count == 2:
+        return "півфінал"
+    if count == 4:
+        return "чвертьфінал"
+    return f"1/{count} фіналу"
+
+
+def _prefix(match_id: str) -> str:
+    head, sep, _ = match_id.partition("-")
+    return head if sep and not head.startswith("M") else ""
+
+
+def simulate_draw(
+    result: DrawResult,
+    participants: Optional[list[Participant]] = None,
+    n_sims: int = 100_000,
+    seed: Optional[int] = None,
+    default_rating: float = 1500.0,
+    home_advantage: float = 0.0,
+    draw_rate: float = 0.25,
+    points: tuple[float, float, float] = (3, 1, 0),
+    slots: Optional[dict[str, tuple[Optional[str], int]]] = None,
+    batch_size: int = 50_000,
+) -> SimulationReport:
+    """
+    Змоделювати result n_sims разів і порахувати ймовірності стадій для кожного учасника.
+
+    participants: учасники з рейтингами (Participant.rating; без рейтингу — default_rating).
+    За замовчуванням — усі реальні учасники з матчів result.
+    home_advantage: бонус до рейтингу participant_a (господаря) в пунктах Elo.
+    draw_rate: частка нічиїх у табличних матчах рівних суперників (матчі на виліт — без нічиїх).
+    slots: власна прив'язка заглушок: id заглушки → (group_id або None для загальної таблиці, місце).
+    """
+    np = _numpy()
+    if not 0 <= draw_rate < 1:
+        raise ValueError("draw_rate має бути в межах [0, 1)")
+    rng = np.random.default_rng(seed)
+
+    # --- Класифікація матчів ---
+    incoming: dict[str, list[Match]] = {}
+    for m in result.matches:
+        if m.winner_advances_to:
+            incoming.setdefault(m.winner_advances_to, []).append(m)
+    knockout = [m for m in result.matches if m.winner_advances_to or m.match_id in incoming]
+    knockout_ids = {m.match_id for m in knockout}
+    table_matches = [
+        m for m in result.matches
+        if m.match_id not in knockout_ids and m.participant_a is not None and m.participant_b is not None
+    ]
+
+    group_order = [g.group_id for g in result.groups]
+
+    def resolve_slot(pid: str) -> Optional[tuple[Optional[str], int]]:
+        if slots and pid in slots:
+            return slots[pid]
+        m = _PIPELINE_RANK.match(pid)
+        if m:
+            return None, int(m.group(1))
+        m = _UEFA_PLAYOFF.match(pid)
+        if m and group_order:
+            i = int(m.group(1))
+            return group_order[i % len(group_order)], i // len(group_order) + 1
+        return None
+
+    if participants is None:
+        seen: dict[str, Participant] = {}
+        for m in table_matches:
+            seen.setdefault(m.participant_a.id, m.participant_a)
+            seen.setdefault(m.participant_b.id, m.participant_b)
+        for m in knockout:
+            if m.match_id in incoming:
+                continue
+            for p in (m.participant_a, m.participant_b):
+                if p is not None and resolve_slot(p.id) is None:
+                    seen.setdefault(p.id, p)
+        participants = list(seen.values())
+    index = {p.id: i for i, p in enumerate(participants)}
+    n_teams = len(participants)
+    ratings = np.array(
+        [p.rating if p.rating is not None else default_rating for p in participants], dtype=np.float64
+    )
+
+    # --- Таблиці ---
+    tables: dict[str, list[int]] = {}
+    for m in table_matches:
+        key = m.group_id if m.group_id is not None else LEAGUE_TABLE
+        members = tables.setdefault(key, [])
+        for p in (m.participant_a, m.participant_b):
+            if index[p.id] not in members:
+                members.append(index[p.id])
+    group_names = {g.group_id: g.name for g in result.groups}
+
+    a_idx = np.array([index[m.participant_a.id] for m in table_matches], dtype=np.int64)
+    b_idx = np.array([index[m.participant_b.id] for m in table_matches], dtype=np.int64)
+    p_home = 1.0 / (1.0 + 10.0 ** ((ratings[b_idx] - ratings[a_idx] - home_advantage) / 400.0))
+    p_draw = draw_rate * 4.0 * p_home * (1.0 - p_home)
+    p_win_a = p_home - p_draw / 2.0
+    incidence_a = np.zeros((len(table_matches), n_teams), dtype=np.float32)
+    incidence_b = np.zeros((len(table_matches), n_teams), dtype=np.float32)
+    incidence_a[np.arange(len(table_matches)), a_idx] = 1.0
+    incidence_b[np.arange(len(table_matches)), b_idx] = 1.0
+    win_pts, draw_pts, loss_pts = (np.float32(x) for x in points)
+
+    # --- Стадії на виліт ---
+    knockout.sort(key=lambda m: (m.round_index, m.match_id))
+    round_sizes: dict[tuple[str, int], int] = {}
+    for m in knockout:
+        key = (_prefix(m.match_id), m.round_index)
+        round_sizes[key] = round_sizes.get(key, 0) + 1
+    # Етап, що передає переможців в інший етап (плей-оф перед нокаутом), — не «1/k фіналу»
+    by_id = {m.match_id: m for m in knockout}
+    feeding = {
+        _prefix(m.match_id) for m in knockout
+        if m.winner_advances_to in by_id and _prefix(m.winner_advances_to) != _prefix(m.match_id)
+    }
+    stage_of: dict[str, str] = {}
+    stages: list[str] = []
+    for m in knockout:
+        prefix = _prefix(m.match_id)
+        if prefix in feeding:
+            label = prefix
+        else:
+            label = _round_label(round_sizes[(prefix, m.round_index)])
+            label = f"{prefix} {label}" if prefix else label
+        stage_of[m.match_id] = label
+        if label not in stages:
+            stages.append(label)
+    terminal = [m for m in knockout if not m.winner_advances_to]
+    final_ids = {max(terminal, key=lambda m: m.round_index).match_id} if terminal else set()
+    stages.append(TITLE)
+
+    reach_counts = {s: np.zeros(n_teams, dtype=np.int64) for s in stages}
+    points_sum = np.zeros(n_teams, dtype=np.float64)
+    position_counts = {
+        key: np.zeros((len(members), n_teams), dtype=np.int64) for key, members in tables.items()
+    }
+
+    done = 0
+    while done < n_sims:
+        size = min(batch_size, n_sims - done)
+        done += size
+
+        # Табличні матчі: одна матриця випадкових чисел на пакет
+        ranked: dict[str, Any] = {}
+        if table_matches:
+            u = rng.random((size, len(table_matches)))
+            win_a = u < p_win_a
+            draw = ~win_a & (u < p_win_a + p_draw)
+            pts_a = np.where(win_a, win_pts, np.where(draw, draw_pts, loss_pts)).astype(np.float32)
+            pts_b = np.where(win_a, loss_pts, np.where(draw, draw_pts, win_pts)).astype(np.float32)
+            team_pts = pts_a @ incidence_a + pts_b @ incidence_b
+            points_sum += team_pts.sum(axis=0)
+            for key, members in tables.items():
+                cols = np.array(members, dtype=np.int64)
+                score = team_pts[:, cols] + rng.random((size, len(cols))) * 0.5
+                order = cols[np.argsort(-score, axis=1)]
+                ranked[key] = order
+                for place in range(len(cols)):
+                    position_counts[key][place] += np.bincount(order[:, place], minlength=n_teams)
+
+        # Матчі на виліт по раундах
+        winners: dict[str, Any] = {}
+        for m in knockout:
+            entrants = []
+            for p in (m.participant_a, m.participant_b):
+                if p is None:
+                    continue
+                if p.id in index:
+                    entrants.append(np.full(size, index[p.id], dtype=np.int64))
+                    continue
+                src = resolve_slot(p.id)
+                if src is not None:
+                    key = src[0] if src[0] is not None else LEAGUE_TABLE
+                    if key in ranked and src[1] <= ranked[key].shape[1]:
+                        entrants.append(ranked[key][:, src[1] - 1])
+            for feeder in sorted(incoming.get(m.match_id, []), key=lambda f: f.match_id):
+                if feeder.match_id in winners:
+                    entrants.append(winners[feeder.match_id])
+            if not entrants:
+                continue
+            for e in entrants[:2]:
+                reach_counts[stage_of[m.match_id]] += np.bincount(e, minlength=n_teams)
+            if len(entrants) == 1:
+                winners[m.match_id] = entrants[0]
+                continue
+            ea, eb = entrants[0], entrants[1]
+            p_a = 1.0 / (1.0 + 10.0 ** ((ratings[eb] - ratings[ea]) / 400.0))
+            winners[m.match_id] = np.where(rng.random(size) < p_a, ea, eb)
+
+        if final_ids:
+            champion = next((winners[mid] for mid in final_ids if mid in winners), None)
+        elif ranked:
+            # Лише таблиця: перемога — перше місце (загальної таблиці, якщо вона є)
+            key = LEAGUE_TABLE if LEAGUE_TABLE in ranked else next(iter(ranked))
+            champion = ranked[key][:, 0]
+        else:
+            champion = None
+        if champion is not None:
+            reach_counts[TITLE] += np.bincount(champion, minlength=n_teams)
+
+    report = SimulationReport(n_sims=n_sims, stages=stages)
+    for i, p in enumerate(participants):
+        report.reach[p.id] = {s: float(reach_counts[s][i]) / n_sims for s in stages}
+        report.expected_points[p.id] = float(points_sum[i]) / n_sims
+    for key, counts in position_counts.items():
+        name = group_names.get(key, key)
+        report.positions[name] = {
+            participants[i].id: [float(c) / n_sims for c in counts[:, i]] for i in tables[key]
+        }
+    return report
@@ -0,0 +1,507 @@
+"""
+Сховище турнірів у SQLite: учасники, матчі, тури, групи й переходи переможців — у таблицях,
+а не pickle-blob, тож турнір, що триває тижнями, можна читати частинами й оновлювати
+результатами по одному матчу без перезапису цілого.
+
+Запис — пакетами (executemany) в одній транзакції; індекси за (турнір, тур), (турнір, учасник)
+і (турнір, група). Читання ліниве: iter_matches тягне рядки курсором, load(rounds=...) збирає
+DrawResult лише з потрібних турів. Учасник з тим самим id у межах одного load — той самий об'єкт.
+
+Приклад:
+    with TournamentStore("events.sqlite3") as store:
+        tid = store.save(draw_knockout(players, shuffle_seed=7), name="Кубок 2026")
+        store.record_results(tid, [MatchResult("M1", 2, 1)])  # переможець іде в наступний матч
+        result = store.load(tid)
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from models import BracketType, DrawResult, Group, Match, Participant
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS participants (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    seed INTEGER,
+    country TEXT,
+    club TEXT,
+    rating REAL,
+    lat REAL,
+    lon REAL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (tournament_id, id)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    match_id TEXT NOT NULL,
+    position INTEGER,
+    round_no INTEGER,
+    round_pos INTEGER,
+    round_index INTEGER NOT NULL,
+    bracket TEXT NOT NULL,
+    group_id TEXT,
+    leg INTEGER NOT NULL,
+    participant_a TEXT,
+    participant_b TEXT,
+    winner_advances_to TEXT,
+    loser_advances_to TEXT,
+    score_a REAL,
+    score_b REAL,
+    winner TEXT,
+    updated REAL,
+    PRIMARY KEY (tournament_id, match_id)
+);
+CREATE INDEX IF NOT EXISTS matches_round ON matches (tournament_id, round_no, round_pos);
+CREATE INDEX IF NOT EXISTS matches_participant_a ON matches (tournament_id, participant_a);
+CREATE INDEX IF NOT EXISTS matches_participant_b ON matches (tournament_id, participant_b);
+CREATE INDEX IF NOT EXISTS matches_group ON matches (tournament_id, group_id);
+CREATE INDEX IF NOT EXISTS matches_advance ON matches (tournament_id, winner_advances_to);
+CREATE TABLE IF NOT EXISTS groups (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    group_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (tournament_id, group_id)
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    group_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    participant_id TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, group_id, position)
+);
+CREATE INDEX IF NOT EXISTS group_members_participant ON group_members (tournament_id, participant_id);
+"""
+
+# Стовпці учасника в порядку SELECT (для JOIN у запитах матчів)
+_P_COLUMNS = "id, name, seed, country, club, rating, lat, lon"
+
+_MATCH_SELECT = f"""
+SELECT m.match_id, m.round_no, m.round_pos, m.round_index, m.bracket, m.group_id, m.leg,
+       m.winner_advances_to, m.loser_advances_to,
+       {", ".join("pa." + c for c in _P_COLUMNS.split(", "))},
+       {", ".join("pb." + c for c in _P_COLUMNS.split(", "))}
+FROM matches m
+LEFT JOIN participants pa ON pa.tournament_id = m.tournament_id AND pa.id = m.participant_a
+LEFT JOIN participants pb ON pb.tournament_id = m.tournament_id AND pb.id = m.participant_b
+"""
+
+
+@dataclass
+class MatchResult:
+    """Результат матчу. winner — id переможця; None — за рахунком (нічия — без переможця)."""
+    match_id: str
+    score_a: Optional[float] = None
+    score_b: Optional[float] = None
+    winner: Optional[str] = None
+
+
+def _participant_row(tid: int, position: int, p: Participant) -> tuple:
+    lat, lon = p.location if p.location is not None else (None, None)
+    return (tid, p.id, p.name, p.seed, p.country, p.club, p.rating, lat, lon, position)
+
+
+class TournamentStore:
+    """
+    Турніри в SQLite. path: файл (":memory:" — лише в пам'яті процесу).
+    Потокобезпечне: одне з'єднання під замком, як у DrawCache.
+    """
+
+    def __init__(self, path: str = "tournaments.sqlite3", batch_size: int = 1000):
+        if batch_size <= 0:
+            raise ValueError("batch_size має бути додатним")
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # --- запис ---
+
+    def save(
+        self,
+        result: DrawResult,
+        name: str = "",
+        participants: Optional[Iterable[Participant]] = None,
+    ) -> int:
+        """
+        Зберегти жеребкування як новий турнір і повернути його id.
+        participants: повний список учасників (за замовчуванням — ті, що є в матчах і групах).
+        """
+        people: dict[str, Participant] = {}
+        for p in participants or ():
+            people.setdefault(p.id, p)
+        for g in result.groups:
+            for p in g.participants:
+                people.setdefault(p.id, p)
+        placement: dict[str, tuple[Optional[int], Optional[int]]] = {}
+        for round_no, round_matches in enumerate(result.rounds, 1):
+            for pos, m in enumerate(round_matches):
+                placement.setdefault(m.match_id, (round_no, pos))
+        ordered: dict[str, tuple[Match, Optional[int]]] = {}
+        for pos, m in enumerate(result.matches):
+            ordered.setdefault(m.match_id, (m, pos))
+        for round_matches in result.rounds:
+            for m in round_matches:
+                ordered.setdefault(m.match_id, (m, None))
+        for m, _ in ordered.values():
+            for p in (m.participant_a, m.participant_b):
+                if p is not None:
+                    people.setdefault(p.id, p)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                tid = self._conn.execute(
+                    "INSERT INTO tournaments (name, description, created) VALUES (?, ?, ?)",
+                    (name, result.description, time.time()),
+                ).lastrowid
+                self._executemany(
+                    "INSERT INTO participants VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (_participant_row(tid, i, p) for i, p in enumerate(people.values())),
+                )
+                self._executemany(
+                    "INSERT INTO matches (tournament_id, match_id, position, round_no, round_pos, round_index, "
+                    "bracket, group_id, leg, participant_a, participant_b, winner_advances_to, loser_advances_to) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            tid, m.match_id, pos, *placement.get(m.match_id, (None, None)), m.round_index,
+                            m.bracket.value, m.group_id, m.leg,
+                            m.participant_a.id if m.participant_a else None,
+                            m.participant_b.id if m.participant_b else None,
+                            m.winner_advances_to, m.loser_advances_to,
+                        )
+                        for m, pos in ordered.values()
+                    ),
+                )
+                self._executemany(
+                    "INSERT INTO groups VALUES (?, ?, ?, ?)",
+                    ((tid, g.group_id, g.name, i) for i, g in enumerate(result.groups)),
+                )
+                self._executemany(
+                    "INSERT INTO group_members VALUES (?, ?, ?, ?)",
+                    ((tid, g.group_id, i, p.id) for g in result.groups for i, p in enumerate(g.participants)),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return tid
+
+    def _executemany(self, sql: str, rows: Iterable[tuple]) -> None:
+        """executemany пакетами по batch_size (генератор рядків не матеріалізується цілком)."""
+        batch: list[tuple] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._conn.executemany(sql, batch)
+                batch.clear()
+        if batch:
+            self._conn.executemany(sql, batch)
+
+    def update_matches(self, tournament_id: int, matches: Iterable[Match]) -> int:
+        """
+        Часткове оновлення: пари й переходи вказаних матчів (напр. після ремонту розкладу).
+        Нових учасників додає; решта турніру не переписується. Повертає кількість оновлених матчів.
+        """
+        matches = list(matches)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                offset = self._conn.execute(
+                    "SELECT COALESCE(MAX(position) + 1, 0) FROM participants WHERE tournament_id = ?",
+                    (tournament_id,),
+                ).fetchone()[0]
+                people = {p.id: p for m in matches for p in (m.participant_a, m.participant_b) if p is not None}
+                self._executemany(
+                    "INSERT OR IGNORE INTO participants VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (_participant_row(tournament_id, offset + i, p) for i, p in enumerate(people.values())),
+                )
+                before = self._conn.total_changes
+                self._executemany(
+                    "UPDATE matches SET participant_a = ?, participant_b = ?, round_index = ?, group_id = ?, "
+                    "winner_advances_to = ?, loser_advances_to = ?, updated = ? "
+                    "WHERE tournament_id = ? AND match_id = ?",
+                    (
+                        (
+                            m.participant_a.id if m.participant_a else None,
+                            m.participant_b.id if m.participant_b else None,
+                            m.round_index, m.group_id, m.winner_advances_to, m.loser_advances_to,
+                            time.time(), tournament_id, m.match_id,
+                        )
+                        for m in matches
+                    ),
+                )
+                changed = self._conn.total_changes - before
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return changed
+
+    def record_results(self, tournament_id: int, results: Iterable[MatchResult], advance: bool = True) -> int:
+        """
+        Записати результати матчів (одна транзакція, executemany).
+        advance: переможця (і переможеного, якщо є loser_advances_to) поставити в наступний матч:
+        з двох матчів-джерел перший (за порядком у турнірі) заповнює participant_a, другий — participant_b;
+        з одного джерела — вільне місце. Повертає кількість оновлених матчів.
+        """
+        results = list(results)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._match_rows(tournament_id, [r.match_id for r in results])
+                updates = []
+                moves: list[tuple[str, str, str]] = []  # (учасник, цільовий матч, звідки)
+                for r in results:
+                    if r.match_id not in rows:
+                        raise KeyError(f"Матч {r.match_id} не знайдено в турнірі {tournament_id}")
+                    a, b, win_to, lose_to = rows[r.match_id]
+                    winner = r.winner
+                    if winner is None and r.score_a is not None and r.score_b is not None and r.score_a != r.score_b:
+                        winner = a if r.score_a > r.score_b else b
+                    if winner is not None and winner not in (a, b):
+                        raise ValueError(f"Матч {r.match_id}: {winner} не грає в цьому матчі")
+                    updates.append((r.score_a, r.score_b, winner, now, tournament_id, r.match_id))
+                    if advance and winner is not None:
+                        if win_to:
+                            moves.append((winner, win_to, r.match_id))
+                        loser = b if winner == a else a
+                        if lose_to and loser is not None:
+                            moves.append((loser, lose_to, r.match_id))
+                self._executemany(
+                    "UPDATE matches SET score_a = ?, score_b = ?, winner = ?, updated = ? "
+                    "WHERE tournament_id = ? AND match_id = ?",
+                    updates,
+                )
+                self._executemany(
+                    "UPDATE matches SET participant_a = COALESCE(?, participant_a), "
+                    "participant_b = COALESCE(?, participant_b), updated = ? WHERE tournament_id = ? AND match_id = ?",
+                    self._advance_rows(tournament_id, moves, now),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(updates)
+
+    def _match_rows(self, tid: int, match_ids: list[str]) -> dict[str, tuple]:
+        """match_id → (participant_a, participant_b, winner_advances_to, loser_advances_to)."""
+        rows: dict[str, tuple] = {}
+        for i in range(0, len(match_ids), 500):
+            chunk = match_ids[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            for match_id, *rest in self._conn.execute(
+                f"SELECT match_id, participant_a, participant_b, winner_advances_to, loser_advances_to "
+                f"FROM matches WHERE tournament_id = ? AND match_id IN ({marks})",
+                (tid, *chunk),
+            ):
+                rows[match_id] = tuple(rest)
+        return rows
+
+    def _advance_rows(self, tid: int, moves: list[tuple[str, str, str]], now: float) -> Iterator[tuple]:
+        for participant_id, target, source in moves:
+            feeders = [
+                row[0] for row in self._conn.execute(
+                    "SELECT match_id FROM matches WHERE tournament_id = ? "
+                    "AND (winner_advances_to = ? OR loser_advances_to = ?) ORDER BY position, match_id",
+                    (tid, target, target),
+                )
+            ]
+            if len(feeders) >= 2:
+                slot_a = feeders.index(source) == 0
+            else:
+                current = self._conn.execute(
+                    "SELECT participant_a FROM matches WHERE tournament_id = ? AND match_id = ?", (tid, target)
+                ).fetchone()
+                if current is None:
+                    continue
+                slot_a = current[0] is None or current[0] == participant_id
+            yield (participant_id, None, now, tid, target) if slot_a else (None, participant_id, now, tid, target)
+
+    def delete(self, tournament_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tournaments WHERE id = ?", (tournament_id,))
+
+    # --- читання ---
+
+    def tournaments(self) -> list[tuple[int, str, str]]:
+        """(id, назва, опис) усіх збережених турнірів."""
+        with self._lock:
+            return self._conn.execute("SELECT id, name, description FROM tournaments ORDER BY id").fetchall()
+
+    def results(self, tournament_id: int) -> dict[str, MatchResult]:
+        """Записані результати: match_id → MatchResult."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT match_id, score_a, score_b, winner FROM matches WHERE tournament_id = ? "
+                "AND (score_a IS NOT NULL OR score_b IS NOT NULL OR winner IS NOT NULL)",
+                (tournament_id,),
+            ).fetchall()
+        return {row[0]: MatchResult(*row) for row in rows}
+
+    def participants(self, tournament_id: int) -> list[Participant]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_P_COLUMNS} FROM participants WHERE tournament_id = ? ORDER BY position", (tournament_id,)
+            ).fetchall()
+        return [_make_participant(row) for row in rows]
+
+    def iter_matches(
+        self,
+        tournament_id: int,
+        round_no: Optional[int] = None,
+        participant_id: Optional[str] = None,
+        group_id: Optional[str] = None,
+        fetch_size: int = 500,
+    ) -> Iterator[Match]:
+        """
+        Матчі турніру курсором (fetchmany по fetch_size), з фільтрами за туром (номер у DrawResult.rounds,
+        з 1), учасником чи групою. Порядок — як у DrawResult.matches.
+        """
+        where, params = ["m.tournament_id = ?"], [tournament_id]
+        if round_no is not None:
+            where.append("m.round_no = ?")
+            params.append(round_no)
+        if participant_id is not None:
+            where.append("(m.participant_a = ? OR m.participant_b = ?)")
+            params += [participant_id, participant_id]
+        if group_id is not None:
+            where.append("m.group_id = ?")
+            params.append(group_id)
+        order = "m.round_pos" if round_no is not None else "m.position IS NULL, m.position, m.round_no, m.round_pos"
+        sql = f"{_MATCH_SELECT} WHERE {' AND '.join(where)} ORDER BY {order}"
+        cache: dict[str, Participant] = {}
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            batch = cursor.fetchmany(fetch_size)
+        while batch:
+            for row in batch:
+                yield _make_match(row, cache)
+            with self._lock:
+                batch = cursor.fetchmany(fetch_size)
+
+    def load(self, tournament_id: int, rounds: Optional[Iterable[int]] = None) -> DrawResult:
+        """
+        Зібрати DrawResult. rounds: номери турів (з 1) — завантажити лише їх (DrawResult.rounds
+        містить тільки ці тури, matches — їхні матчі); None — увесь турнір.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT description FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Турнір {tournament_id} не знайдено")
+            description = row[0]
+            if rounds is None:
+                rows = self._conn.execute(
+                    f"{_MATCH_SELECT} WHERE m.tournament_id = ? "
+                    "ORDER BY m.position IS NULL, m.position, m.round_no, m.round_pos",
+                    (tournament_id,),
+                ).fetchall()
+            else:
+                wanted = sorted(set(rounds))
+                marks = ", ".join("?" * len(wanted))
+                rows = self._conn.execute(
+                    f"{_MATCH_SELECT} WHERE m.tournament_id = ? AND m.round_no IN ({marks}) "
+                    "ORDER BY m.round_no, m.round_pos",
+                    (tournament_id, *wanted),
+                ).fetchall() if wanted else []
+            group_rows = self._conn.execute(
+                f"SELECT g.group_id, g.name, {', '.join('p.' + c for c in _P_COLUMNS.split(', '))} "
+                "FROM groups g LEFT JOIN group_members gm ON gm.tournament_id = g.tournament_id AND gm.group_id = g.group_id "
+                "LEFT JOIN participants p ON p.tournament_id = gm.tournament_id AND p.id = gm.participant_id "
+                "WHERE g.tournament_id = ? ORDER BY g.position, gm.position",
+                (tournament_id,),
+            ).fetchall() if rounds is None else []
+
+        cache: dict[str, Participant] = {}
+        matches: list[Match] = []
+        by_round: dict[int, list[tuple[int, Match]]] = {}
+        for row in rows:
+            m = _make_match(row, cache)
+            matches.append(m)
+            round_no, round_pos = row[1], row[2]
+            if round_no is not None:
+                by_round.setdefault(round_no, []).append((round_pos, m))
+
+        groups: list[Group] = []
+        by_group: dict[str, Group] = {}
+        for group_id, name, *p in group_rows:
+            g = by_group.get(group_id)
+            if g is None:
+                g = by_group[group_id] = Group(group_id=group_id, name=name)
+                groups.append(g)
+            if p[0] is not None:
+                g.participants.append(cache.get(p[0]) or cache.setdefault(p[0], _make_participant(p)))
+        for m in matches:
+            if m.group_id in by_group:
+                by_group[m.group_id].matches.append(m)
+
+        return DrawResult(
+            matches=matches,
+            groups=groups,
+            rounds=[[m for _, m in sorted(by_round[r], key=lambda item: item[0])] for r in sorted(by_round)],
+            description=description,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "TournamentStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _make_participant(row: tuple) -> Participant:
+    pid, name, seed, country, club, rating, lat, lon = row
+    return Participant(
+        id=pid,
+        name=name,
+        seed=seed,
+        country=country,
+        club=club,
+        rating=rating,
+        location=(lat, lon) if lat is not None and lon is not None else None,
+    )
+
+
+def _make_match(row: tuple, cache: dict[str, Participant]) -> Match:
+    """Match з рядка _MATCH_SELECT; учасники з однаковим id — один об'єкт (cache)."""
+    match_id, _, _, round_index, bracket, group_id, leg, win_to, lose_to = row[:9]
+    sides = []
+    for p in (row[9:17], row[17:25]):
+        if p[0] is None:
+            sides.append(None)
+        else:
+            sides.append(cache.get(p[0]) or cache.setdefault(p[0], _make_participant(p)))
+    return Match(
+        match_id=match_id,
+        participant_a=sides[0],
+        participant_b=sides[1],
+        round_index=round_index,
+        bracket=BracketType(bracket),
+        group_id=group_id,
+        leg=leg,
+        winner_advances_to=win_to,
+        loser_advances_to=lose_to,
+    )
@@ -0,0 +1,389 @@
+"""
+Векторизована перевірка інваріантів жеребкування (NumPy).
+
+DrawResult перетворюється на масиви інцидентності (господар, гість, тур для кожного матчу),
+далі всі інваріанти рахуються редукціями NumPy (bincount, порівняння матриць):
+  - усі формати: ніхто не грає сам з собою, не більше одного матчу на команду в турі;
+  - колова: кожна пара зустрічається рівно num_rounds разів;
+  - етап ліги: rounds матчів на команду, k_per_pot суперників з кожного кошика,
+    без повторів, 4H/4A (і по одному вдома/на виїзді з кожного кошика при парному k_per_pot);
+  - нокаут: посилання winner_advances_to ведуть на існуючі матчі пізнішого раунду,
+    у кожен матч приходять рівно два учасники (відомі або переможці), один фінал;
+    у колі після першого менше двох — це bye (сітка без ступеня двійки);
+  - групи: матчі групи лише між її учасниками, колова всередині групи повна.
+
+Заглушки учасників (PO-i з uefa_style, S<k>-P<r> і S<k>-W<n> з конвеєра етапів) — не відомі
+команди: у масиви вони не потрапляють, а в нокауті місце в таблиці — вхід матчу, «переможець
+матчу» — той самий вхід, що й посилання winner_advances_to.
+
+Результат — ValidationReport зі списком Violation (код, повідомлення, учасники, матчі).
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from models import Participant, DrawResult
+
+
+# Заглушки: місце в таблиці (PO-i, S<k>-P<r>) і переможець матчу попереднього етапу (S<k>-W<n>)
+_SLOT_PLACEHOLDER = re.compile(r"^(PO-\d+|S\d+-P\d+)$")
+_WINNER_PLACEHOLDER = re.compile(r"^S\d+-W\d+$")
+
+
+def _is_placeholder(p: Participant) -> bool:
+    return bool(_SLOT_PLACEHOLDER.match(p.id) or _WINNER_PLACEHOLDER.match(p.id))
+
+
+def _numpy() -> Any:
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError(
+            "Перевірка розкладу потребує numpy. Встановіть: pip install numpy"
+        )
+    return np
+
+
+@dataclass
+class Violation:
+    """Одне порушення інваріанту."""
+    code: str
+    message: str
+    participants: list[str] = field(default_factory=list)
+    match_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    """Підсумок перевірки."""
+    violations: list[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def summary(self) -> str:
+        if self.ok:
+            return "Порушень не знайдено."
+        return "\n".join(f"[{v.code}] {v.message}" for v in self.violations)
+
+
+@dataclass
+class DrawArrays:
+    """Масиви інцидентності матчів з відомими учасниками."""
+    team_ids: list[str]
+    match_ids: list[str]
+    home: Any  # np.ndarray[int] — індекс господаря
+    away: Any  # np.ndarray[int] — індекс гостя
+    round: Any  # np.ndarray[int] — номер туру з 0 (позиція в DrawResult.rounds)
+
+
+def draw_arrays(result: DrawResult, participants: Optional[list[Participant]] = None) -> DrawArrays:
+    """
+    Перетворити DrawResult на масиви. participants задає порядок індексів команд
+    (для етапу ліги — порядок кошиків); без нього — порядок першої появи.
+    Матчі із заглушками замість учасників пропускаються.
+    """
+    np = _numpy()
+    index_of: dict[str, int] = {}
+    team_ids: list[str] = []
+    if participants is not None:
+        for p in participants:
+            index_of[p.id] = len(team_ids)
+            team_ids.append(p.id)
+    home: list[int] = []
+    away: list[int] = []
+    rounds: list[int] = []
+    match_ids: list[str] = []
+    source = result.rounds or [result.matches]
+    for r, round_matches in enumerate(source):
+        for m in round_matches:
+            if m.participant_a is None or m.participant_b is None:
+                continue
+            if _is_placeholder(m.participant_a) or _is_placeholder(m.participant_b):
+                continue
+            for p in (m.participant_a, m.participant_b):
+                if p.id not in index_of:
+                    index_of[p.id] = len(team_ids)
+                    team_ids.append(p.id)
+            home.append(index_of[m.participant_a.id])
+            away.append(index_of[m.participant_b.id])
+            rounds.append(r)
+            match_ids.append(m.match_id)
+    return DrawArrays(
+        team_ids=team_ids,
+        match_ids=match_ids,
+        home=np.asarray(home, dtype=np.int64),
+        away=np.asarray(away, dtype=np.int64),
+        round=np.asarray(rounds, dtype=np.int64),
+    )
+
+
+def _pair_counts(arr: DrawArrays) -> Any:
+    """Симетрична матриця T×T: скільки разів зустрічалася кожна пара."""
+    np = _numpy()
+    t = len(arr.team_ids)
+    lo = np.minimum(arr.home, arr.away)
+    hi = np.maximum(arr.home, arr.away)
+    counts = np.bincount(lo * t + hi, minlength=t * t).reshape(t, t)
+    return counts + counts.T - np.diag(np.diag(counts))
+
+
+def _check_common(arr: DrawArrays, out: list[Violation]) -> None:
+    np = _numpy()
+    t = len(arr.team_ids)
+    self_play = np.flatnonzero(arr.home == arr.away)
+    for i in self_play:
+        out.append(Violation(
+            "self_play",
+            f"Учасник {arr.team_ids[arr.home[i]]} грає сам з собою",
+            [arr.team_ids[arr.home[i]]],
+            [arr.match_ids[i]],
+        ))
+    if not len(arr.round):
+        return
+    n_rounds = int(arr.round.max()) + 1
+    per_round = (
+        np.bincount(arr.round * t + arr.home, minlength=n_rounds * t)
+        + np.bincount(arr.round * t + arr.away, minlength=n_rounds * t)
+    ).reshape(n_rounds, t)
+    for r, team in zip(*np.nonzero(per_round > 1)):
+        out.append(Violation(
+            "multiple_per_round",
+            f"Учасник {arr.team_ids[team]} грає {per_round[r, team]} матчі в турі {r + 1}",
+            [arr.team_ids[team]],
+        ))
+
+
+def _check_round_robin(arr: DrawArrays, num_rounds: int, out: list[Violation]) -> None:
+    np = _numpy()
+    counts = _pair_counts(arr)
+    np.fill_diagonal(counts, num_rounds)
+    for i, j in zip(*np.nonzero(np.triu(counts != num_rounds))):
+        out.append(Violation(
+            "pair_count",
+            f"{arr.team_ids[i]} і {arr.team_ids[j]} зустрічаються {counts[i, j]} раз(и) замість {num_rounds}",
+            [arr.team_ids[i], arr.team_ids[j]],
+        ))
+    if num_rounds % 2 == 0:
+        t = len(arr.team_ids)
+        directed = np.bincount(arr.home * t + arr.away, minlength=t * t).reshape(t, t)
+        for i, j in zip(*np.nonzero(np.triu(directed != directed.T))):
+            out.append(Violation(
+                "home_away_pair",
+                f"{arr.team_ids[i]} і {arr.team_ids[j]}: нерівна кількість матчів вдома й на виїзді",
+                [arr.team_ids[i], arr.team_ids[j]],
+            ))
+
+
+def _check_league_phase(
+    arr: DrawArrays,
+    teams_per_pot: int,
+    matches_per_team: int,
+    check_home_away: bool,
+    out: list[Violation],
+    pots_known: bool = True,
+) -> None:
+    """pots_known=False: порядок кошиків невідомий — квоти кошиків не перевіряються."""
+    np = _numpy()
+    t = len(arr.team_ids)
+    n_pots = t // teams_per_pot
+    k_per_pot = matches_per_team // n_pots if n_pots else 0
+    degree = np.bincount(arr.home, minlength=t) + np.bincount(arr.away, minlength=t)
+    for team in np.flatnonzero(degree != matches_per_team):
+        out.append(Violation(
+            "matches_per_team",
+            f"Учасник {arr.team_ids[team]} має {degree[team]} матчів замість {matches_per_team}",
+            [arr.team_ids[team]],
+        ))
+    counts = _pair_counts(arr)
+    for i, j in zip(*np.nonzero(np.triu(counts > 1))):
+        out.append(Violation(
+            "replay",
+            f"{arr.team_ids[i]} і {arr.team_ids[j]} зустрічаються {counts[i, j]} рази",
+            [arr.team_ids[i], arr.team_ids[j]],
+        ))
+    home_count = np.bincount(arr.home, minlength=t)
+    if check_home_away:
+        for team in np.flatnonzero(2 * home_count != degree):
+            out.append(Violation(
+                "home_away_balance",
+                f"Учасник {arr.team_ids[team]}: {home_count[team]} вдома з {degree[team]}",
+                [arr.team_ids[team]],
+            ))
+    if not pots_known:
+        return
+    pot = np.arange(t) // teams_per_pot
+    # per_pot[team, pot] — скільки суперників з кошика pot
+    per_pot = (
+        np.bincount(arr.home * n_pots + pot[arr.away], minlength=t * n_pots)
+        + np.bincount(arr.away * n_pots + pot[arr.home], minlength=t * n_pots)
+    ).reshape(t, n_pots)
+    for team, p in zip(*np.nonzero(per_pot != k_per_pot)):
+        out.append(Violation(
+            "pot_quota",
+            f"Учасник {arr.team_ids[team]} має {per_pot[team, p]} суперників з кошика {p + 1} замість {k_per_pot}",
+            [arr.team_ids[team]],
+        ))
+    if check_home_away and k_per_pot % 2 == 0:
+        home_per_pot = np.bincount(arr.home * n_pots + pot[arr.away], minlength=t * n_pots).reshape(t, n_pots)
+        for team, p in zip(*np.nonzero(2 * home_per_pot != per_pot)):
+            out.append(Violation(
+                "home_away_pot",
+                f"Учасник {arr.team_ids[team]}: {home_per_pot[team, p]} вдома проти кошика {p + 1} з {per_pot[team, p]}",
+                [arr.team_ids[team]],
+            ))
+
+
+def _check_knockout(result: DrawResult, out: list[Violation]) -> None:
+    np = _numpy()
+    matches = result._matches_by_id()
+    ids = list(matches)
+    idx = {mid: i for i, mid in enumerate(ids)}
+    n = len(ids)
+    src: list[int] = []
+    dst: list[int] = []
+    for mid, m in matches.items():
+        if m.winner_advances_to is None:
+            continue
+        if m.winner_advances_to not in idx:
+            out.append(Violation(
+                "dangling_link",
+                f"Матч {mid}: переможець іде в неіснуючий матч {m.winner_advances_to}",
+                match_ids=[mid],
+            ))
+            continue
+        src.append(idx[mid])
+        dst.append(idx[m.winner_advances_to])
+    src_a = np.asarray(src, dtype=np.int64)
+    dst_a = np.asarray(dst, dtype=np.int64)
+    round_of = np.asarray([matches[mid].round_index for mid in ids], dtype=np.int64)
+    for i in np.flatnonzero(round_of[dst_a] <= round_of[src_a]) if len(src_a) else []:
+        out.append(Violation(
+            "link_backwards",
+            f"Матч {ids[src_a[i]]} веде в матч {ids[dst_a[i]]} не пізнішого раунду",
+            match_ids=[ids[src_a[i]], ids[dst_a[i]]],
+        ))
+    incoming = np.bincount(dst_a, minlength=n)
+    # Відомі учасники й місця в таблиці — входи; «переможець матчу» дублює посилання
+    known = np.zeros(n, dtype=np.int64)
+    winner_slots = np.zeros(n, dtype=np.int64)
+    for i, mid in enumerate(ids):
+        for p in (matches[mid].participant_a, matches[mid].participant_b):
+            if p is None:
+                continue
+            if _WINNER_PLACEHOLDER.match(p.id):
+                winner_slots[i] += 1
+            else:
+                known[i] += 1
+    inputs = known + np.maximum(incoming, winner_slots)
+    linked = incoming > 0
+    # Bye: у колі після першого (входу в сітку) учасник без гри не записаний у матч
+    entry = [round_of[i] for i in np.flatnonzero(~linked) if matches[ids[i]].winner_advances_to is not None]
+    bye_round = min(entry) + 1 if entry else None
+    short_ok = (round_of == bye_round) & (inputs < 2) if bye_round is not None else np.zeros(n, dtype=bool)
+    for i in np.flatnonzero((inputs != 2) & ~short_ok):
+        out.append(Violation(
+            "bracket_inputs",
+            f"У матч {ids[i]} приходить {inputs[i] - known[i]} переможців і {known[i]} відомих учасників (має бути 2)",
+            match_ids=[ids[i]],
+        ))
+    # Фінал сітки: матч, в який ведуть посилання, але сам нікуди не веде
+    has_out = np.zeros(n, dtype=bool)
+    has_out[src_a] = True
+    finals = np.flatnonzero(linked & ~has_out)
+    if len(finals) > 1:
+        out.append(Violation(
+            "multiple_finals",
+            f"Сітка має {len(finals)} кінцевих матчів замість одного",
+            match_ids=[ids[i] for i in finals],
+        ))
+
+
+def _check_groups(result: DrawResult, num_rounds: int, out: list[Violation]) -> None:
+    for g in result.groups:
+        members = {p.id for p in g.participants}
+        for m in g.matches:
+            for p in (m.participant_a, m.participant_b):
+                if p is not None and p.id not in members:
+                    out.append(Violation(
+                        "group_outsider",
+                        f"Матч {m.match_id} групи {g.name}: {p.name} не з цієї групи",
+                        [p.id],
+                        [m.match_id],
+                    ))
+        sub = DrawResult(matches=g.matches)
+        arr = draw_arrays(sub, g.participants)
+        group_out: list[Violation] = []
+        _check_round_robin(arr, num_rounds, group_out)
+        for v in group_out:
+            v.message = f"Група {g.name}: {v.message}"
+        out.extend(group_out)
+
+
+def _detect_schedule(arr: DrawArrays) -> str:
+    """Формат без груп і сітки: етап ліги — однаково матчів у всіх, але не всі пари зустрілися."""
+    np = _numpy()
+    t = len(arr.team_ids)
+    if t < 2:
+        return "round_robin"
+    degree = np.bincount(arr.home, minlength=t) + np.bincount(arr.away, minlength=t)
+    counts = _pair_counts(arr)
+    np.fill_diagonal(counts, 1)
+    if (degree == degree[0]).all() and (counts == 0).any():
+        return "league_phase"
+    return "round_robin"
+
+
+def validate_draw(
+    result: DrawResult,
+    kind: str = "auto",
+    participants: Optional[list[Participant]] = None,
+    num_rounds: int = 1,
+    teams_per_pot: Optional[int] = None,
+    check_home_away: bool = True,
+) -> ValidationReport:
+    """
+    Перевірити всі інваріанти формату.
+
+    kind: "round_robin", "league_phase", "knockout", "groups" або "auto"
+    (нокаут — якщо є winner_advances_to; групи — якщо є result.groups; інакше етап ліги, якщо
+    в усіх однаково матчів, але зустрілися не всі пари, і колова — якщо всі).
+    participants: для етапу ліги — список у порядку кошиків (як у draw_uefa_league_phase);
+    без нього квоти кошиків не перевіряються.
+    num_rounds: скільки разів зустрічається кожна пара в коловій/групах.
+    teams_per_pot: для етапу ліги; за замовчуванням кількість турів + 1.
+    """
+    out: list[Violation] = []
+    arr = draw_arrays(result, participants)
+    _check_common(arr, out)
+
+    if kind == "auto":
+        kinds = []
+        if result.groups:
+            kinds.append("groups")
+        if any(m.winner_advances_to for m in result._matches_by_id().values()):
+            kinds.append("knockout")
+        if not kinds:
+            kinds.append(_detect_schedule(arr))
+    else:
+        kinds = [kind]
+
+    for k in kinds:
+        if k == "round_robin":
+            _check_round_robin(arr, num_rounds, out)
+        elif k == "league_phase":
+            matches_per_team = len(result.rounds)
+            _check_league_phase(
+                arr, teams_per_pot or matches_per_team + 1, matches_per_team, check_home_away, out,
+                pots_known=participants is not None,
+            )
+        elif k == "knockout":
+            _check_knockout(result, out)
+        elif k == "groups":
+            _check_groups(result, num_rounds, out)
+        else:
+            raise ValueError(f"Невідомий тип перевірки: {k}")
+    return ValidationReport(violations=out)